@@ -0,0 +1,113 @@
+"""Add query activity and tag count aggregates.
+
+Revision ID: 2c1f1399060f
+Revises: 36deed6889f8
+Create Date: 2026-10-19 12:24:51.730416
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "2c1f1399060f"
+down_revision = "36deed6889f8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "query_activity",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("query_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_query_activity_user_id", "query_activity", ["user_id"], unique=False
+    )
+    op.create_index("ix_query_activity_day", "query_activity", ["day"], unique=False)
+    op.create_index(
+        "ix_query_activity_key",
+        "query_activity",
+        ["query_id", sa.text("coalesce(user_id, 0)"), "day"],
+        unique=True,
+    )
+
+    op.create_table(
+        "tag_counts",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("org_id", sa.Integer(), nullable=False),
+        sa.Column("object_type", sa.String(length=255), nullable=False),
+        sa.Column("data_source_id", sa.Integer(), nullable=True),
+        sa.Column("is_draft", sa.Boolean(), nullable=False),
+        sa.Column("tag", sa.Unicode(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["org_id"], ["organizations.id"]),
+        sa.ForeignKeyConstraint(
+            ["data_source_id"], ["data_sources.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_tag_counts_key",
+        "tag_counts",
+        [
+            "org_id",
+            "object_type",
+            sa.text("coalesce(data_source_id, 0)"),
+            "is_draft",
+            "tag",
+        ],
+        unique=True,
+    )
+
+    op.execute(
+        """
+        INSERT INTO query_activity (query_id, user_id, day, count)
+        SELECT object_id::integer, user_id, created_at::date, count(*)
+        FROM events
+        WHERE object_type = 'query'
+          AND action IN (
+            'edit', 'execute', 'edit_name', 'edit_description', 'view_source'
+          )
+          AND object_id ~ '^[0-9]+$'
+          AND created_at >= current_date - 7
+        GROUP BY object_id::integer, user_id, created_at::date
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO tag_counts
+          (org_id, object_type, data_source_id, is_draft, tag, count)
+        SELECT org_id, 'Query', data_source_id, coalesce(is_draft, false), tag, count(*)
+        FROM queries, unnest(tags) AS tag
+        WHERE NOT coalesce(is_archived, false)
+          AND data_source_id IS NOT NULL
+          AND tag IS NOT NULL
+        GROUP BY org_id, data_source_id, coalesce(is_draft, false), tag
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO tag_counts
+          (org_id, object_type, data_source_id, is_draft, tag, count)
+        SELECT org_id, 'Dashboard', NULL, coalesce(is_draft, false), tag, count(*)
+        FROM dashboards, unnest(tags) AS tag
+        WHERE NOT coalesce(is_archived, false) AND tag IS NOT NULL
+        GROUP BY org_id, coalesce(is_draft, false), tag
+        """
+    )
+
+
+def downgrade():
+    op.drop_index("ix_tag_counts_key", table_name="tag_counts")
+    op.drop_table("tag_counts")
+    op.drop_index("ix_query_activity_key", table_name="query_activity")
+    op.drop_index("ix_query_activity_day", table_name="query_activity")
+    op.drop_index("ix_query_activity_user_id", table_name="query_activity")
+    op.drop_table("query_activity")
@@ -0,0 +1,36 @@
+"""Add trigram indexes for multi-byte query search.
+
+Revision ID: 36deed6889f8
+Revises: a63d3f4f4ee0
+Create Date: 2026-10-19 11:02:17.604831
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "36deed6889f8"
+down_revision = "a63d3f4f4ee0"
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = ["name", "description", "query"]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in COLUMNS:
+        op.create_index(
+            "ix_queries_{}_trgm".format(column),
+            "queries",
+            [column],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade():
+    for column in COLUMNS:
+        op.drop_index("ix_queries_{}_trgm".format(column), table_name="queries")
@@ -0,0 +1,70 @@
+"""Add search vectors to dashboards and widgets for full text search.
+
+Revision ID: a63d3f4f4ee0
+Revises: e5c7a4e2df4d
+Create Date: 2026-10-19 10:12:41.218305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import sqlalchemy_utils as su
+import sqlalchemy_searchable as ss
+
+
+# revision identifiers, used by Alembic.
+revision = "a63d3f4f4ee0"
+down_revision = "e5c7a4e2df4d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    ss.vectorizer.clear()
+
+    conn = op.get_bind()
+
+    op.add_column("dashboards", sa.Column("search_vector", su.TSVectorType()))
+    op.create_index(
+        "ix_dashboards_search_vector",
+        "dashboards",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+    op.add_column("widgets", sa.Column("search_vector", su.TSVectorType()))
+    op.create_index(
+        "ix_widgets_search_vector",
+        "widgets",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    metadata = sa.MetaData(bind=conn)
+    dashboards = sa.Table("dashboards", metadata, autoload=True)
+
+    @ss.vectorizer(dashboards.c.tags)
+    def array_vectorizer(column):
+        return sa.func.array_to_string(column, " ")
+
+    ss.sync_trigger(
+        conn,
+        "dashboards",
+        "search_vector",
+        ["name", "tags"],
+        metadata=metadata,
+        options={"weights": {"name": "A", "tags": "B"}},
+    )
+    ss.sync_trigger(conn, "widgets", "search_vector", ["text"], metadata=metadata)
+
+
+def downgrade():
+    conn = op.get_bind()
+
+    ss.drop_trigger(conn, "widgets", "search_vector")
+    op.drop_index("ix_widgets_search_vector", table_name="widgets")
+    op.drop_column("widgets", "search_vector")
+
+    ss.drop_trigger(conn, "dashboards", "search_vector")
+    op.drop_index("ix_dashboards_search_vector", table_name="dashboards")
+    op.drop_column("dashboards", "search_vector")
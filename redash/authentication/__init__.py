@@ -6,11 +6,12 @@ from urllib.parse import urlsplit, urlunsplit
 
 from flask import jsonify, redirect, request, url_for
 from flask_login import LoginManager, login_user, logout_user, user_logged_in
-from redash import models, settings
+from redash import models, redis_connection, settings
 from redash.authentication import jwt_auth
 from redash.authentication.org_resolving import current_org
 from redash.settings.organization import settings as org_settings
-from redash.tasks import record_event
+from redash.tasks import buffer_event
+from redash.utils import json_dumps, json_loads
 from sqlalchemy.orm.exc import NoResultFound
 from werkzeug.exceptions import Unauthorized
 
@@ -109,14 +110,75 @@ def hmac_load_user_from_request(request):
     return None
 
 
+def _serialize_principal(user, query_id):
+    if isinstance(user, models.User):
+        return {"user_id": user.id, "org_id": user.org_id}
+
+    return {
+        "org_id": user.org_id,
+        "group_ids": user.group_ids,
+        "name": user.name,
+        "object_ref": user.object_ref,
+        # Query API keys are only valid for their own query.
+        "query_id": None if user.object_ref else query_id,
+    }
+
+
+def _load_cached_principal(api_key, query_id, org):
+    cached = redis_connection.get(models.api_key_principal_key(api_key))
+    if cached is None:
+        return None
+
+    principal = json_loads(cached)
+    if "user_id" in principal:
+        if principal["org_id"] != org.id:
+            return None
+        user = models.User.query.get(principal["user_id"])
+        if user is None or user.is_disabled or user.api_key != api_key:
+            return None
+        return user
+
+    if principal["query_id"] is not None and (
+        principal["org_id"] != org.id or str(principal["query_id"]) != str(query_id)
+    ):
+        return None
+
+    if principal["org_id"] != org.id:
+        org = models.Organization.query.get(principal["org_id"])
+    return models.ApiUser(
+        api_key,
+        org,
+        principal["group_ids"],
+        name=principal["name"],
+        object_ref=principal["object_ref"],
+    )
+
+
 def get_user_from_api_key(api_key, query_id):
     if not api_key:
         return None
 
+    org = current_org._get_current_object()
+    if org is None:
+        return _resolve_api_key(api_key, query_id, org)
+
+    user = _load_cached_principal(api_key, query_id, org)
+    if user is None:
+        user = _resolve_api_key(api_key, query_id, org)
+        if user is not None:
+            redis_connection.set(
+                models.api_key_principal_key(api_key),
+                json_dumps(_serialize_principal(user, query_id)),
+                ex=settings.API_KEY_PRINCIPAL_CACHE_TTL,
+            )
+
+    return user
+
+
+def _resolve_api_key(api_key, query_id, org):
     user = None
 
     # TODO: once we switch all api key storage into the ApiKey model, this code will be much simplified
-    org = current_org._get_current_object()
     try:
         user = models.User.get_by_api_key_and_org(api_key, org)
         if user.is_disabled:
@@ -210,7 +272,7 @@ def log_user_logged_in(app, user):
         "ip": request.remote_addr,
     }
 
-    record_event.delay(event)
+    buffer_event(event)
 
 
 @login_manager.unauthorized_handler
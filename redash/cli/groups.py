@@ -74,6 +74,7 @@ def change_permissions(group_id, permissions=None):
     try:
         models.db.session.add(group)
         models.db.session.commit()
+        models.invalidate_permissions()
     except Exception as e:
         print("Failed change permission: %s" % e)
         exit(1)
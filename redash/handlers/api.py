@@ -14,6 +14,7 @@ from redash.handlers.dashboards import (
     DashboardFavoriteListResource,
     DashboardListResource,
     DashboardResource,
+    DashboardResultsResource,
     DashboardShareResource,
     DashboardTagsResource,
     PublicDashboardResource,
@@ -139,6 +140,12 @@ api.add_org_resource(
     "/api/dashboards/<dashboard_id>/share",
     endpoint="dashboard_share",
 )
+api.add_org_resource(
+    DashboardResultsResource,
+    "/api/dashboards/<dashboard_id>/results",
+    "/api/dashboards/<dashboard_id>/results.<filetype>",
+    endpoint="dashboard_results",
+)
 
 api.add_org_resource(
     DataSourceTypeListResource, "/api/data_sources/types", endpoint="data_source_types"
@@ -1,17 +1,20 @@
+import hashlib
 import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
 
 from inspect import isclass
-from flask import Blueprint, current_app, request
+from flask import Blueprint, current_app, make_response, request
 
 from flask_login import current_user, login_required
 from flask_restful import Resource, abort
 from redash import settings
 from redash.authentication import current_org
 from redash.models import db
-from redash.tasks import record_event as record_event_task
-from redash.utils import json_dumps
+from redash.tasks import buffer_event
+from redash.utils import json_dumps, json_loads
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy import cast
+from sqlalchemy import cast, literal, tuple_
 from sqlalchemy.dialects import postgresql
 from sqlalchemy_utils import sort_query
 
@@ -60,7 +63,7 @@ def record_event(org, user, options):
     if "timestamp" not in options:
         options["timestamp"] = int(time.time())
 
-    record_event_task.delay(options)
+    buffer_event(options)
 
 
 def require_fields(req, fields):
@@ -79,29 +82,141 @@ def get_object_or_404(fn, *args, **kwargs):
     return rv
 
 
-def paginate(query_set, page, page_size, serializer, **kwargs):
-    count = query_set.count()
+def estimate_count(query_set):
+    """
+    Returns the number of rows the database planner expects `query_set` to
+    return, which is much cheaper to get than an exact count on large tables.
+    """
+    statement = query_set.order_by(None).statement
+    compiled = statement.compile(dialect=db.engine.dialect)
+    plan = (
+        db.session.connection()
+        .execute("EXPLAIN (FORMAT JSON) {}".format(compiled), compiled.params)
+        .scalar()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def count_results(query_set, count_mode=None):
+    """
+    Counts `query_set` exactly, or using the planner's estimate when
+    `count_mode` is "estimate".
+    """
+    if count_mode == "estimate":
+        return estimate_count(query_set)
+    return query_set.count()
+
+
+def serialize_items(items, serializer, **kwargs):
+    # support for old function based serializers
+    if isclass(serializer):
+        return serializer(items, **kwargs).serialize()
+    return [serializer(item) for item in items]
+
+
+def paginate(query_set, page, page_size, serializer, count_mode=None, **kwargs):
+    count = count_results(query_set, count_mode)
 
     if page < 1:
         abort(400, message="Page must be positive integer.")
 
-    if (page - 1) * page_size + 1 > count > 0:
+    if (page - 1) * page_size + 1 > count > 0 and count_mode != "estimate":
         abort(400, message="Page is out of range.")
 
     if page_size > 250 or page_size < 1:
         abort(400, message="Page size is out of range (1-250).")
 
-    results = query_set.paginate(page, page_size)
+    # Not using Query.paginate, as it counts the results once more.
+    results = query_set.limit(page_size).offset((page - 1) * page_size).all()
+    if not results and page != 1:
+        abort(404)
 
-    # support for old function based serializers
-    if isclass(serializer):
-        items = serializer(results.items, **kwargs).serialize()
-    else:
-        items = [serializer(result) for result in results.items]
+    items = serialize_items(results, serializer, **kwargs)
 
     return {"count": count, "page": page, "page_size": page_size, "results": items}
 
 
+def encode_cursor(values):
+    # json_dumps drops the microseconds of datetimes, which cursors need to keep.
+    values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    return urlsafe_b64encode(json_dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        return json_loads(urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        abort(400, message="Invalid cursor.")
+
+
+def paginate_by_cursor(
+    query_set, model, cursor, order, page_size, serializer, count_mode=None, **kwargs
+):
+    """
+    Keyset pagination: instead of skipping the rows of all previous pages, a
+    page continues from the creation time and id of the last item of the
+    previous one, encoded in that page's "next_cursor". Results are ordered by
+    creation time, and only counted if a `count_mode` is given.
+    """
+    order = order or "-created_at"
+    if order not in ("created_at", "-created_at"):
+        abort(400, message="Cursor pagination only supports ordering by created_at.")
+
+    if page_size > 250 or page_size < 1:
+        abort(400, message="Page size is out of range (1-250).")
+
+    response = {"page_size": page_size}
+    if count_mode:
+        response["count"] = count_results(query_set, count_mode)
+
+    columns = (model.created_at, model.id)
+    descending = order.startswith("-")
+
+    if cursor:
+        values = decode_cursor(cursor)
+        if not isinstance(values, list) or len(values) != len(columns):
+            abort(400, message="Invalid cursor.")
+
+        key = tuple_(*columns)
+        after = tuple_(
+            *[literal(value, column.type) for column, value in zip(columns, values)]
+        )
+        query_set = query_set.filter(key < after if descending else key > after)
+
+    ordering = [c.desc() if descending else c.asc() for c in columns]
+    items = query_set.order_by(None).order_by(*ordering).limit(page_size + 1).all()
+
+    response["next_cursor"] = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        response["next_cursor"] = encode_cursor(
+            [getattr(items[-1], column.key) for column in columns]
+        )
+
+    response["results"] = serialize_items(items, serializer, **kwargs)
+    return response
+
+
+def make_etag(*parts):
+    """Returns a strong ETag made of the given (JSON serializable) parts."""
+    # str() keeps the microseconds of datetimes, which JSONEncoder drops.
+    etag = json_dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(etag.encode("utf-8")).hexdigest()
+
+
+def not_modified(etag, headers=None):
+    """
+    Returns a 304 response when the request already holds the representation
+    the given ETag identifies (per If-None-Match), otherwise None.
+    """
+    if etag not in request.if_none_match:
+        return None
+
+    response = make_response("", 304, headers or {})
+    response.set_etag(etag)
+    return response
+
+
 def org_scoped_rule(rule):
     if settings.MULTI_ORG:
         return "/<org_slug>{}".format(rule)
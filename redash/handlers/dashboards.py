@@ -1,4 +1,4 @@
-from flask import request, url_for
+from flask import current_app, request, stream_with_context, url_for
 from funcy import project, partial
 
 from flask_restful import abort
@@ -6,7 +6,10 @@ from redash import models
 from redash.handlers.base import (
     BaseResource,
     get_object_or_404,
+    make_etag,
+    not_modified,
     paginate,
+    paginate_by_cursor,
     filter_by_tags,
     order_results as _order_results,
 )
@@ -20,8 +23,11 @@ from redash.security import csp_allows_embeding
 from redash.serializers import (
     DashboardSerializer,
     public_dashboard,
+    viewable_ids,
 )
+from redash.utils import json_dumps
 from sqlalchemy.orm.exc import StaleDataError
+from werkzeug.http import quote_etag
 
 
 # Ordering map for relationships
@@ -37,6 +43,30 @@ order_results = partial(
 )
 
 
+def dashboard_etag(dashboard, user, api_key, can_edit):
+    """
+    Returns the ETag of the dashboard as served to the user, which changes with
+    the dashboard, its widgets and their visualizations and queries, and with
+    what the user may see and do of them.
+    """
+    widgets = dashboard.widget_versions()
+    data_source_ids = {widget[-1] for widget in widgets} - {None}
+    return make_etag(
+        dashboard.id,
+        dashboard.version,
+        dashboard.updated_at,
+        dashboard.user_id,
+        widgets,
+        user.id,
+        sorted(user.group_ids),
+        sorted(user.permissions),
+        models.DataSource.groups_by_id(data_source_ids),
+        models.Favorite.is_favorite(user.id, dashboard),
+        api_key.api_key if api_key else None,
+        can_edit,
+    )
+
+
 class DashboardListResource(BaseResource):
     @require_permission("list_dashboards")
     def get(self):
@@ -47,6 +77,11 @@ class DashboardListResource(BaseResource):
         :qparam number page: Page number to retrieve
         :qparam number order: Name of column to order by
         :qparam number q: Full text search term
+        :qparam string cursor: Use keyset pagination, starting after the given
+                               cursor ("next_cursor" of the previous page, or
+                               empty for the first page)
+        :qparam string count: "estimate" to use an estimate of the number of
+                              dashboards rather than counting them
 
         Responds with an array of :ref:`dashboard <dashboard-response-label>`
         objects.
@@ -67,20 +102,37 @@ class DashboardListResource(BaseResource):
 
         results = filter_by_tags(results, models.Dashboard.tags)
 
-        # order results according to passed order parameter,
-        # special-casing search queries where the database
-        # provides an order by search rank
-        ordered_results = order_results(results, fallback=not bool(search_term))
-
-        page = request.args.get("page", 1, type=int)
         page_size = request.args.get("page_size", 25, type=int)
-
-        response = paginate(
-            ordered_results,
-            page=page,
-            page_size=page_size,
-            serializer=DashboardSerializer,
-        )
+        count_mode = request.args.get("count")
+
+        if "cursor" in request.args:
+            if search_term:
+                abort(400, message="Cursor pagination isn't supported for searches.")
+
+            response = paginate_by_cursor(
+                results,
+                models.Dashboard,
+                cursor=request.args["cursor"],
+                order=request.args.get("order"),
+                page_size=page_size,
+                serializer=DashboardSerializer,
+                count_mode=count_mode,
+            )
+        else:
+            # order results according to passed order parameter,
+            # special-casing search queries where the database
+            # provides an order by search rank
+            ordered_results = order_results(results, fallback=not bool(search_term))
+
+            page = request.args.get("page", 1, type=int)
+
+            response = paginate(
+                ordered_results,
+                page=page,
+                page_size=page_size,
+                serializer=DashboardSerializer,
+                count_mode=count_mode,
+            )
 
         if search_term:
             self.record_event(
@@ -152,11 +204,23 @@ class DashboardResource(BaseResource):
         dashboard = get_object_or_404(
             models.Dashboard.get_by_slug_and_org, dashboard_slug, self.current_org
         )
+        api_key = models.ApiKey.get_by_object(dashboard)
+        can_edit = can_modify(dashboard, self.current_user)
+
+        self.record_event(
+            {"action": "view", "object_id": dashboard.id, "object_type": "dashboard"}
+        )
+
+        # Checked before serializing, which loads every widget.
+        etag = dashboard_etag(dashboard, self.current_user, api_key, can_edit)
+        not_modified_response = not_modified(etag)
+        if not_modified_response is not None:
+            return not_modified_response
+
         response = DashboardSerializer(
             dashboard, with_widgets=True, user=self.current_user
         ).serialize()
 
-        api_key = models.ApiKey.get_by_object(dashboard)
         if api_key:
             response["public_url"] = url_for(
                 "redash.public_dashboard",
@@ -166,13 +230,9 @@ class DashboardResource(BaseResource):
             )
             response["api_key"] = api_key.api_key
 
-        response["can_edit"] = can_modify(dashboard, self.current_user)
+        response["can_edit"] = can_edit
 
-        self.record_event(
-            {"action": "view", "object_id": dashboard.id, "object_type": "dashboard"}
-        )
-
-        return response
+        return response, 200, {"ETag": quote_etag(etag)}
 
     @require_permission("edit_dashboard")
     def post(self, dashboard_slug):
@@ -257,6 +317,97 @@ class DashboardResource(BaseResource):
         return d
 
 
+class DashboardResultsResource(BaseResource):
+    @require_permission("view_query")
+    def get(self, dashboard_id, filetype="json"):
+        """
+        Retrieves the latest results of the queries of a dashboard's widgets,
+        in place of fetching those of each widget's query on its own.
+
+        :param dashboard_id: The numeric ID of the dashboard.
+        :param string filetype: 'json' (the default), or 'ndjson' to stream the
+            results one per line.
+
+        :>json array query_results: The latest result of each query the user
+            can view the result of, as objects of `query_id` and `query_result`.
+            Queries shared by several widgets are listed once.
+        """
+        if filetype not in ("json", "ndjson"):
+            abort(404)
+
+        if self.current_user.is_api_user():
+            # An API key only gives access to the dashboard it was created for.
+            dashboard = self.current_user.object
+            is_dashboard_key = isinstance(dashboard, models.Dashboard)
+            if not is_dashboard_key or str(dashboard.id) != dashboard_id:
+                abort(404)
+            self.record_event(
+                {
+                    "action": "api_get",
+                    "object_type": "dashboard",
+                    "object_id": dashboard.id,
+                    "file_type": filetype,
+                }
+            )
+        else:
+            dashboard = get_object_or_404(
+                models.Dashboard.get_by_id_and_org, dashboard_id, self.current_org
+            )
+
+        queries = {
+            widget.visualization.query_rel.id: widget.visualization.query_rel
+            for widget in dashboard.load_widgets()
+            if widget.visualization
+        }
+        result_ids = {query.latest_query_data_id for query in queries.values()}
+        query_results = {
+            query_result.id: query_result
+            for query_result in models.QueryResult.query.filter(
+                models.QueryResult.id.in_(result_ids - {None}),
+                models.QueryResult.org == self.current_org,
+            )
+        }
+        if self.current_user.is_api_user():
+            # The key was created for this dashboard, whose results it may view.
+            viewable_result_ids = set(query_results)
+        else:
+            # As for a single query's, access is to the data source of its result.
+            viewable_result_ids = viewable_ids(
+                query_results.values(), self.current_user
+            )
+
+        results = []
+        for query_id in sorted(queries):
+            query = queries[query_id]
+            query_result = query_results.get(query.latest_query_data_id)
+            if query_result is None or query_result.id not in viewable_result_ids:
+                continue
+            if (
+                self.current_user.is_api_user()
+                and query.query_hash != query_result.query_hash
+            ):
+                continue
+            results.append((query_id, query_result))
+
+        def serialize(query_id, query_result):
+            return {"query_id": query_id, "query_result": query_result.to_dict()}
+
+        if filetype == "ndjson":
+            lines = (
+                json_dumps(serialize(query_id, query_result)) + "\n"
+                for query_id, query_result in results
+            )
+            return current_app.response_class(
+                stream_with_context(lines), mimetype="application/x-ndjson"
+            )
+
+        return {
+            "query_results": [
+                serialize(query_id, query_result) for query_id, query_result in results
+            ]
+        }
+
+
 class PublicDashboardResource(BaseResource):
     decorators = BaseResource.decorators + [csp_allows_embeding]
 
@@ -322,6 +473,7 @@ class DashboardShareResource(BaseResource):
             api_key.active = False
             models.db.session.add(api_key)
             models.db.session.commit()
+            models.invalidate_api_key(api_key.api_key)
 
         self.record_event(
             {
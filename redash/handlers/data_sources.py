@@ -188,8 +188,25 @@ class DataSourceListResource(BaseResource):
         return datasource.to_dict(all=True)
 
 
+SCHEMA_SEARCH_ARGS = ("q", "page", "page_size")
+
+
 class DataSourceSchemaResource(BaseResource):
     def get(self, data_source_id):
+        """
+        Retrieve the schema of a data source.
+
+        :qparam refresh: Refresh the schema instead of using the cached one
+        :qparam string q: Only return tables whose name contains this term
+        :qparam prefix: Match tables whose name starts with `q` instead
+        :qparam columns: Also match tables that have a column matching `q`
+        :qparam number page: Page number to retrieve
+        :qparam number page_size: Number of tables to return per page
+
+        Without any of `q`, `page` or `page_size` the whole schema is returned.
+        Otherwise the response also includes the total `count` of matching
+        tables.
+        """
         data_source = get_object_or_404(
             models.DataSource.get_by_id_and_org, data_source_id, self.current_org
         )
@@ -197,15 +214,45 @@ class DataSourceSchemaResource(BaseResource):
         refresh = request.args.get("refresh") is not None
 
         if not refresh:
-            cached_schema = data_source.get_cached_schema()
+            if any(arg in request.args for arg in SCHEMA_SEARCH_ARGS):
+                response = self._search_schema(data_source)
+            else:
+                cached_schema = data_source.get_cached_schema()
+                response = (
+                    {"schema": cached_schema} if cached_schema is not None else None
+                )
 
-            if cached_schema is not None:
-                return {"schema": cached_schema}
+            if response is not None:
+                return response
 
         job = get_schema.delay(data_source.id, refresh)
 
         return serialize_job(job)
 
+    def _search_schema(self, data_source):
+        page = request.args.get("page", 1, type=int)
+        page_size = request.args.get("page_size", 50, type=int)
+
+        if page < 1:
+            abort(400, message="Page must be positive integer.")
+
+        if page_size > 1000 or page_size < 1:
+            abort(400, message="Page size is out of range (1-1000).")
+
+        result = data_source.search_cached_schema(
+            term=request.args.get("q", "").strip(),
+            prefix=request.args.get("prefix") is not None,
+            search_columns=request.args.get("columns") is not None,
+            page=page,
+            page_size=page_size,
+        )
+
+        if result is None:
+            return None
+
+        count, tables = result
+        return {"schema": tables, "count": count, "page": page, "page_size": page_size}
+
 
 class DataSourcePauseResource(BaseResource):
     @require_admin
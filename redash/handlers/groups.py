@@ -45,6 +45,7 @@ class GroupResource(BaseResource):
 
         group.name = request.json["name"]
         models.db.session.commit()
+        models.invalidate_permissions()
 
         self.record_event(
             {"action": "edit", "object_id": group.id, "object_type": "group"}
@@ -80,6 +81,7 @@ class GroupResource(BaseResource):
 
         models.db.session.delete(group)
         models.db.session.commit()
+        models.invalidate_permissions()
 
 
 class GroupMemberListResource(BaseResource):
@@ -90,6 +92,7 @@ class GroupMemberListResource(BaseResource):
         group = models.Group.get_by_id_and_org(group_id, self.current_org)
         user.group_ids.append(group.id)
         models.db.session.commit()
+        models.invalidate_permissions()
 
         self.record_event(
             {
@@ -119,6 +122,7 @@ class GroupMemberResource(BaseResource):
         user = models.User.get_by_id_and_org(user_id, self.current_org)
         user.group_ids.remove(int(group_id))
         models.db.session.commit()
+        models.invalidate_permissions()
 
         self.record_event(
             {
@@ -13,6 +13,7 @@ from redash.handlers.base import (
     get_object_or_404,
     org_scoped_rule,
     paginate,
+    paginate_by_cursor,
     routes,
     order_results as _order_results,
 )
@@ -142,6 +143,11 @@ class BaseQueryListResource(BaseResource):
         :qparam number page: Page number to retrieve
         :qparam number order: Name of column to order by
         :qparam number q: Full text search term
+        :qparam string cursor: Use keyset pagination, starting after the given
+                               cursor ("next_cursor" of the previous page, or
+                               empty for the first page)
+        :qparam string count: "estimate" to use an estimate of the number of
+                              queries rather than counting them
 
         Responds with an array of :ref:`query <query-response-label>` objects.
         """
@@ -152,22 +158,41 @@ class BaseQueryListResource(BaseResource):
 
         results = filter_by_tags(queries, models.Query.tags)
 
-        # order results according to passed order parameter,
-        # special-casing search queries where the database
-        # provides an order by search rank
-        ordered_results = order_results(results, fallback=not bool(search_term))
-
-        page = request.args.get("page", 1, type=int)
         page_size = request.args.get("page_size", 25, type=int)
-
-        response = paginate(
-            ordered_results,
-            page=page,
-            page_size=page_size,
-            serializer=QuerySerializer,
-            with_stats=True,
-            with_last_modified_by=False,
-        )
+        count_mode = request.args.get("count")
+
+        if "cursor" in request.args:
+            if search_term:
+                abort(400, message="Cursor pagination isn't supported for searches.")
+
+            response = paginate_by_cursor(
+                results,
+                models.Query,
+                cursor=request.args["cursor"],
+                order=request.args.get("order"),
+                page_size=page_size,
+                serializer=QuerySerializer,
+                count_mode=count_mode,
+                with_stats=True,
+                with_last_modified_by=False,
+            )
+        else:
+            # order results according to passed order parameter,
+            # special-casing search queries where the database
+            # provides an order by search rank
+            ordered_results = order_results(results, fallback=not bool(search_term))
+
+            page = request.args.get("page", 1, type=int)
+
+            response = paginate(
+                ordered_results,
+                page=page,
+                page_size=page_size,
+                serializer=QuerySerializer,
+                count_mode=count_mode,
+                with_stats=True,
+                with_last_modified_by=False,
+            )
 
         if search_term:
             self.record_event(
@@ -7,7 +7,13 @@ from flask_login import current_user
 from flask_restful import abort
 from werkzeug.urls import url_quote
 from redash import models, settings
-from redash.handlers.base import BaseResource, get_object_or_404, record_event
+from redash.handlers.base import (
+    BaseResource,
+    get_object_or_404,
+    make_etag,
+    not_modified,
+    record_event,
+)
 from redash.permissions import (
     has_access,
     not_view_only,
@@ -29,7 +35,7 @@ from redash.models.parameterized_query import (
     ParameterizedQuery,
     InvalidParameterError,
     QueryDetachedFromDataSourceError,
-    dropdown_values,
+    cached_dropdown_values,
 )
 from redash.serializers import (
     serialize_query_result,
@@ -207,7 +213,7 @@ class QueryResultDropdownResource(BaseResource):
         )
         require_access(query.data_source, current_user, view_only)
         try:
-            return dropdown_values(query_id, self.current_org)
+            return cached_dropdown_values(query_id, self.current_org)
         except QueryDetachedFromDataSourceError as e:
             abort(400, message=str(e))
 
@@ -228,7 +234,7 @@ class QueryDropdownsResource(BaseResource):
             )
             require_access(dropdown_query.data_source, current_user, view_only)
 
-        return dropdown_values(dropdown_query_id, self.current_org)
+        return cached_dropdown_values(dropdown_query_id, self.current_org)
 
 
 class QueryResultResource(BaseResource):
@@ -393,15 +399,24 @@ class QueryResultResource(BaseResource):
                 'csv': self.make_csv_response,
                 'tsv': self.make_tsv_response
             }
-            response = response_builders[filetype](query_result)
 
+            headers = {}
             if len(settings.ACCESS_CONTROL_ALLOW_ORIGIN) > 0:
-                self.add_cors_headers(response.headers)
+                self.add_cors_headers(headers)
 
             if should_cache:
-                response.headers.add_header(
-                    "Cache-Control", "private,max-age=%d" % ONE_YEAR
-                )
+                headers["Cache-Control"] = "private,max-age=%d" % ONE_YEAR
+
+            # A query result never changes, so its id and retrieval time identify
+            # the response without decoding its data.
+            etag = make_etag(query_result.id, query_result.retrieved_at, filetype)
+            response = not_modified(etag, headers)
+            if response is not None:
+                return response
+
+            response = response_builders[filetype](query_result)
+            response.headers.extend(headers)
+            response.set_etag(etag)
 
             filename = get_download_filename(query_result, query, filetype)
 
@@ -1,11 +1,24 @@
 import datetime
 import calendar
+import hashlib
 import logging
 import time
 import numbers
 import pytz
-
-from sqlalchemy import distinct, or_, and_, UniqueConstraint
+from collections import Counter
+from functools import partial
+
+from sqlalchemy import (
+    case,
+    distinct,
+    inspect,
+    literal_column,
+    or_,
+    and_,
+    select,
+    union_all,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.event import listens_for
 from sqlalchemy.ext.hybrid import hybrid_property
@@ -24,6 +37,7 @@ from redash.destinations import (
 )
 from redash.metrics import database  # noqa: F401
 from redash.query_runner import (
+    NotSupported,
     with_ssh_tunnel,
     get_configuration_schema_for_query_runner_type,
     get_query_runner,
@@ -42,7 +56,16 @@ from redash.utils import (
 from redash.utils.configuration import ConfigurationContainer
 from redash.models.parameterized_query import ParameterizedQuery
 
-from .base import db, gfk_type, Column, GFKBase, SearchBaseQuery, key_type, primary_key
+from .base import (
+    db,
+    gfk_type,
+    Column,
+    GFKBase,
+    SearchBaseQuery,
+    key_type,
+    prefix_search_query,
+    primary_key,
+)
 from .changes import ChangeTrackingMixin, Change  # noqa
 from .mixins import BelongsToOrgMixin, TimestampMixin
 from .organizations import Organization
@@ -54,7 +77,17 @@ from .types import (
     PseudoJSON,
     pseudo_json_cast_property
 )
-from .users import AccessPermission, AnonymousUser, ApiUser, Group, User  # noqa
+from .users import (  # noqa
+    AccessPermission,
+    AnonymousUser,
+    ApiUser,
+    Group,
+    User,
+    api_key_principal_key,
+    invalidate_api_key,
+    invalidate_api_key_on_commit,
+    invalidate_permissions,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -82,6 +115,61 @@ class ScheduledQueriesExecutions(object):
 scheduled_queries_executions = ScheduledQueriesExecutions()
 
 
+# Schema search index entries are "<lowercased term>\x00<table name>", so that
+# Redis' lexicographical ranges can be used for case insensitive prefix search.
+SCHEMA_INDEX_SEPARATOR = "\x00"
+# The largest code point, used as an upper bound for prefix ranges.
+SCHEMA_INDEX_MAX_CHAR = "\U0010ffff"
+# Number of index entries Redis looks at per ZSCAN call of a substring search.
+# Its default of 10 would take a round trip per ten columns of the schema.
+SCHEMA_INDEX_SCAN_COUNT = 10000
+
+
+def _schema_column_name(column):
+    return column["name"] if isinstance(column, dict) else str(column)
+
+
+def _schema_index_entry(term, table_name):
+    return "{}{}{}".format(term.lower(), SCHEMA_INDEX_SEPARATOR, table_name)
+
+
+def _schema_column_entries(table):
+    return [
+        _schema_index_entry(_schema_column_name(column), table["name"])
+        for column in table.get("columns", [])
+    ]
+
+
+def _escape_redis_pattern(term):
+    return "".join("\\" + c if c in "*?[]\\" else c for c in term)
+
+
+def _search_schema_index(key, term, prefix):
+    """Returns the names of tables whose index entry in `key` matches `term`."""
+    term = term.lower()
+    if prefix:
+        entries = redis_connection.zrangebylex(
+            key,
+            "[{}".format(term),
+            "[{}{}".format(term, SCHEMA_INDEX_MAX_CHAR),
+        )
+    else:
+        pattern = "*{}*{}*".format(_escape_redis_pattern(term), SCHEMA_INDEX_SEPARATOR)
+        entries = (
+            entry
+            for entry, _ in redis_connection.zscan_iter(
+                key, match=pattern, count=SCHEMA_INDEX_SCAN_COUNT
+            )
+        )
+
+    names = set()
+    for entry in entries:
+        indexed_term, _, table_name = entry.partition(SCHEMA_INDEX_SEPARATOR)
+        if indexed_term.startswith(term) if prefix else term in indexed_term:
+            names.add(table_name)
+    return names
+
+
 @generic_repr("id", "name", "type", "org_id", "created_at")
 class DataSource(BelongsToOrgMixin, db.Model):
     id = primary_key("DataSource")
@@ -179,13 +267,97 @@ class DataSource(BelongsToOrgMixin, db.Model):
         res = db.session.delete(self)
         db.session.commit()
 
+        redis_connection.delete(
+            self._legacy_schema_key,
+            self._schema_digests_key,
+            self._schema_meta_key,
+            self._schema_names_index_key,
+            self._schema_columns_index_key,
+            self._schema_sizes_key,
+        )
         redis_connection.delete(self._schema_key)
 
         return res
 
     def get_cached_schema(self):
-        cache = redis_connection.get(self._schema_key)
-        return json_loads(cache) if cache else None
+        return self._add_table_sizes(self._get_cached_tables())
+
+    def _get_cached_tables(self):
+        pipe = redis_connection.pipeline()
+        pipe.exists(self._schema_meta_key)
+        pipe.hvals(self._schema_key)
+        cached, tables = pipe.execute()
+
+        if not cached:
+            return self._migrate_legacy_schema()
+
+        return sorted(
+            (json_loads(table) for table in tables), key=lambda t: t["name"]
+        )
+
+    def _migrate_legacy_schema(self):
+        """Stores a schema cached before it was stored per table the current way,
+        so it isn't fetched again after an upgrade. Returns it, or None if there
+        is none."""
+        legacy_schema = redis_connection.get(self._legacy_schema_key)
+        if legacy_schema is None:
+            return None
+
+        schema = json_loads(legacy_schema)
+        self._store_schema(schema)
+        return sorted(schema, key=lambda t: t["name"])
+
+    def search_cached_schema(
+        self, term=None, prefix=False, search_columns=False, page=1, page_size=None
+    ):
+        """Searches the cached schema using the index built on refresh.
+
+        Tables match when their name (and with `search_columns`, any of their
+        column names) contains `term`, or starts with it when `prefix` is set.
+        Returns a tuple of the total number of matching tables and the
+        requested page of them (ordered by lowercased name), or None if there
+        is no cached schema.
+        """
+        if (
+            not redis_connection.exists(self._schema_meta_key)
+            and self._migrate_legacy_schema() is None
+        ):
+            return None
+
+        if term:
+            names = _search_schema_index(self._schema_names_index_key, term, prefix)
+            if search_columns:
+                names |= _search_schema_index(
+                    self._schema_columns_index_key, term, prefix
+                )
+            names = sorted(names, key=lambda name: (name.lower(), name))
+            count = len(names)
+            if page_size is not None:
+                offset = (page - 1) * page_size
+                names = names[offset : offset + page_size]
+        else:
+            # The index is already ordered, so only the requested page is read.
+            count = redis_connection.zcard(self._schema_names_index_key)
+            start, end = 0, -1
+            if page_size is not None:
+                start = (page - 1) * page_size
+                end = start + page_size - 1
+            names = [
+                entry.partition(SCHEMA_INDEX_SEPARATOR)[2]
+                for entry in redis_connection.zrange(
+                    self._schema_names_index_key, start, end
+                )
+            ]
+
+        tables = []
+        if names:
+            tables = [
+                json_loads(table)
+                for table in redis_connection.hmget(self._schema_key, names)
+                if table is not None
+            ]
+
+        return count, self._add_table_sizes(tables)
 
     def get_schema(self, refresh=False):
         out_schema = None
@@ -194,20 +366,188 @@ class DataSource(BelongsToOrgMixin, db.Model):
 
         if out_schema is None:
             query_runner = self.query_runner
-            schema = query_runner.get_schema(get_stats=refresh)
+            version = self._get_schema_version(query_runner)
+
+            if version is not None and version == self._cached_schema_version():
+                out_schema = self._get_cached_tables()
+                if out_schema is not None:
+                    logger.debug(
+                        "Schema of data_source %s unchanged (version %s).",
+                        self.id,
+                        version,
+                    )
 
-            try:
-                out_schema = self._sort_schema(schema)
-            except Exception:
-                logging.exception(
-                    "Error sorting schema columns for data_source {}".format(self.id)
-                )
-                out_schema = schema
-            finally:
-                redis_connection.set(self._schema_key, json_dumps(out_schema))
+            if out_schema is None:
+                schema = query_runner.get_schema()
+
+                try:
+                    out_schema = self._sort_schema(schema)
+                except Exception:
+                    logging.exception(
+                        "Error sorting schema columns for data_source {}".format(
+                            self.id
+                        )
+                    )
+                    out_schema = schema
+                finally:
+                    self._store_schema(out_schema, version)
+
+            if refresh and settings.SCHEMA_RUN_TABLE_SIZE_CALCULATIONS:
+                self._refresh_table_sizes(query_runner, out_schema)
+
+            self._add_table_sizes(out_schema)
 
         return out_schema
 
+    def _refresh_table_sizes(self, query_runner, schema):
+        """Table sizes are cached separately from the schema, as they're expensive
+        to calculate and change independently of it."""
+        updated_at = redis_connection.hget(self._schema_meta_key, "sizes_updated_at")
+        max_age = settings.SCHEMA_TABLE_SIZE_REFRESH_INTERVAL * 60
+        if updated_at is not None and time.time() - float(updated_at) < max_age:
+            return
+
+        try:
+            sizes = query_runner.get_table_sizes([table["name"] for table in schema])
+        except NotSupported:
+            return
+
+        pipe = redis_connection.pipeline()
+        pipe.delete(self._schema_sizes_key)
+        if sizes:
+            pipe.hmset(self._schema_sizes_key, sizes)
+        pipe.hset(self._schema_meta_key, "sizes_updated_at", time.time())
+        pipe.execute()
+
+    def _add_table_sizes(self, tables):
+        if not tables:
+            return tables
+
+        names = [table["name"] for table in tables]
+        sizes = redis_connection.hmget(self._schema_sizes_key, names)
+        for table, size in zip(tables, sizes):
+            if size is not None:
+                table["size"] = int(size)
+
+        return tables
+
+    def _get_schema_version(self, query_runner):
+        try:
+            version = query_runner.get_schema_version()
+        except Exception:
+            logger.warning(
+                "Failed getting schema version for data_source %s", self.id, exc_info=1
+            )
+            return None
+
+        return str(version) if version is not None else None
+
+    def _cached_schema_version(self):
+        return redis_connection.hget(self._schema_meta_key, "version")
+
+    def _store_schema(self, schema, version=None):
+        """Write the schema to Redis, one hash field per table.
+
+        Only tables whose definition changed since the last refresh are
+        written, and tables that no longer exist are removed. When nothing
+        changed only the schema metadata (version) is updated.
+        """
+        tables = {}
+        for table in schema:
+            serialized = json_dumps(table)
+            tables[table["name"]] = (
+                serialized,
+                hashlib.md5(serialized.encode("utf-8")).hexdigest(),
+            )
+
+        digests = {name: digest for name, (_, digest) in tables.items()}
+        content_hash = hashlib.md5(
+            json_dumps(sorted(digests.items())).encode("utf-8")
+        ).hexdigest()
+
+        pipe = redis_connection.pipeline()
+        pipe.hget(self._schema_meta_key, "hash")
+        pipe.hgetall(self._schema_digests_key)
+        pipe.exists(self._schema_names_index_key)
+        cached_hash, cached_digests, has_index = pipe.execute()
+
+        pipe = redis_connection.pipeline()
+        if content_hash != cached_hash or (tables and not has_index):
+            changed = {
+                name: serialized
+                for name, (serialized, digest) in tables.items()
+                if cached_digests.get(name) != digest
+            }
+            removed = [name for name in cached_digests if name not in tables]
+
+            if changed:
+                pipe.hmset(self._schema_key, changed)
+                pipe.hmset(
+                    self._schema_digests_key, {name: digests[name] for name in changed}
+                )
+            if removed:
+                pipe.hdel(self._schema_key, *removed)
+                pipe.hdel(self._schema_digests_key, *removed)
+            pipe.delete(self._legacy_schema_key)
+
+            self._update_schema_index(
+                pipe, tables, changed, removed, has_index, cached_digests
+            )
+
+        meta = {"hash": content_hash, "updated_at": time.time()}
+        if version is not None:
+            meta["version"] = version
+        else:
+            pipe.hdel(self._schema_meta_key, "version")
+        pipe.hmset(self._schema_meta_key, meta)
+        pipe.execute()
+
+    def _update_schema_index(
+        self, pipe, tables, changed, removed, has_index, cached_digests
+    ):
+        """Queues the updates of the table and column name indexes on `pipe`.
+
+        A missing index is built from all tables, otherwise only the entries
+        of the changed and removed tables are replaced.
+        """
+        if has_index:
+            outdated = [
+                name for name in list(changed) + removed if name in cached_digests
+            ]
+        else:
+            outdated = []
+            changed = {name: serialized for name, (serialized, _) in tables.items()}
+            pipe.delete(self._schema_names_index_key, self._schema_columns_index_key)
+
+        if outdated:
+            # The pipeline hasn't run yet, so these are the previous definitions.
+            previous = redis_connection.hmget(self._schema_key, outdated)
+            columns = [
+                entry
+                for table in previous
+                if table is not None
+                for entry in _schema_column_entries(json_loads(table))
+            ]
+            pipe.zrem(
+                self._schema_names_index_key,
+                *[_schema_index_entry(name, name) for name in outdated]
+            )
+            if columns:
+                pipe.zrem(self._schema_columns_index_key, *columns)
+
+        if changed:
+            pipe.zadd(
+                self._schema_names_index_key,
+                {_schema_index_entry(name, name): 0 for name in changed},
+            )
+            columns = {
+                entry: 0
+                for serialized in changed.values()
+                for entry in _schema_column_entries(json_loads(serialized))
+            }
+            if columns:
+                pipe.zadd(self._schema_columns_index_key, columns)
+
     def _sort_schema(self, schema):
         return [
             {"name": i["name"], "columns": sorted(i["columns"])}
@@ -215,9 +555,35 @@ class DataSource(BelongsToOrgMixin, db.Model):
         ]
 
     @property
-    def _schema_key(self):
+    def _legacy_schema_key(self):
+        # The whole schema as a single JSON string, from before it was stored
+        # per table.
         return "data_source:schema:{}".format(self.id)
 
+    @property
+    def _schema_key(self):
+        return "data_source:schema:{}:tables".format(self.id)
+
+    @property
+    def _schema_digests_key(self):
+        return "data_source:schema:{}:digests".format(self.id)
+
+    @property
+    def _schema_meta_key(self):
+        return "data_source:schema:{}:meta".format(self.id)
+
+    @property
+    def _schema_names_index_key(self):
+        return "data_source:schema:{}:index:names".format(self.id)
+
+    @property
+    def _schema_columns_index_key(self):
+        return "data_source:schema:{}:index:columns".format(self.id)
+
+    @property
+    def _schema_sizes_key(self):
+        return "data_source:schema:{}:sizes".format(self.id)
+
     @property
     def _pause_key(self):
         return "ds:{}:pause".format(self.id)
@@ -278,6 +644,20 @@ class DataSource(BelongsToOrgMixin, db.Model):
         groups = DataSourceGroup.query.filter(DataSourceGroup.data_source == self)
         return dict([(group.group_id, group.view_only) for group in groups])
 
+    @classmethod
+    def groups_by_id(cls, ids):
+        """Returns the same mapping as `groups` for each of the given data
+        sources, keyed by data source id, using a single query."""
+        groups = {id: {} for id in ids}
+        if not groups:
+            return groups
+
+        for group in DataSourceGroup.query.filter(
+            DataSourceGroup.data_source_id.in_(groups.keys())
+        ):
+            groups[group.data_source_id][group.group_id] = group.view_only
+        return groups
+
 
 @generic_repr("id", "data_source_id", "group_id", "view_only")
 class DataSourceGroup(db.Model):
@@ -510,6 +890,27 @@ class Query(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model):
     query_class = SearchBaseQuery
     __tablename__ = "queries"
     __mapper_args__ = {"version_id_col": version, "version_id_generator": False}
+    # Trigram indexes for the ILIKE based multi-byte search.
+    __table_args__ = (
+        db.Index(
+            "ix_queries_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        db.Index(
+            "ix_queries_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+        db.Index(
+            "ix_queries_query_trgm",
+            "query",
+            postgresql_using="gin",
+            postgresql_ops={"query": "gin_trgm_ops"},
+        ),
+    )
 
     def __str__(self):
         return str(self.id)
@@ -530,6 +931,7 @@ class Query(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model):
             self.record_changes(user)
 
     def regenerate_api_key(self):
+        invalidate_api_key_on_commit(self.api_key)
         self.api_key = generate_token(40)
 
     @classmethod
@@ -593,20 +995,26 @@ class Query(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model):
 
     @classmethod
     def all_tags(cls, user, include_drafts=False):
-        queries = cls.all_queries(
-            group_ids=user.group_ids, user_id=user.id, include_drafts=include_drafts
+        data_source_ids = db.session.query(DataSourceGroup.data_source_id).filter(
+            DataSourceGroup.group_id.in_(user.group_ids)
         )
-
-        tag_column = func.unnest(cls.tags).label("tag")
-        usage_count = func.count(1).label("usage_count")
-
-        query = (
-            db.session.query(tag_column, usage_count)
-            .group_by(tag_column)
-            .filter(Query.id.in_(queries.options(load_only("id"))))
-            .order_by(usage_count.desc())
+        counted = and_(
+            TagCount.object_type == "Query",
+            TagCount.data_source_id.in_(data_source_ids),
+        )
+        if include_drafts:
+            return TagCount.usage(counted)
+
+        return TagCount.usage(
+            and_(counted, TagCount.is_draft == False),
+            cls,
+            and_(
+                cls.data_source_id.in_(data_source_ids),
+                cls.user_id == user.id,
+                cls.is_draft == True,
+                cls.is_archived == False,
+            ),
         )
-        return query
 
     @classmethod
     def by_user(cls, user):
@@ -705,13 +1113,27 @@ class Query(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model):
         )
 
         if multi_byte_search:
-            # Since tsvector doesn't work well with CJK languages, use `ilike` too
+            # Since tsvector doesn't work well with CJK languages, use `ilike`
+            # instead, which the trigram indexes of these columns speed up.
             pattern = "%{}%".format(term)
+            rank = case(
+                [
+                    (func.lower(cls.name) == func.lower(term), 0),
+                    (cls.name.ilike("{}%".format(term)), 1),
+                    (cls.name.ilike(pattern), 2),
+                    (cls.description.ilike(pattern), 3),
+                ],
+                else_=4,
+            )
             return (
                 all_queries.filter(
-                    or_(cls.name.ilike(pattern), cls.description.ilike(pattern))
+                    or_(
+                        cls.name.ilike(pattern),
+                        cls.description.ilike(pattern),
+                        cls.query_text.ilike(pattern),
+                    )
                 )
-                .order_by(Query.id)
+                .order_by(rank, Query.id)
                 .limit(limit)
             )
 
@@ -725,27 +1147,22 @@ class Query(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model):
     @classmethod
     def recent(cls, group_ids, user_id=None, limit=20):
         query = (
-            cls.query.filter(Event.created_at > (db.func.current_date() - 7))
-            .join(Event, Query.id == Event.object_id.cast(db.Integer))
+            cls.query.join(QueryActivity, Query.id == QueryActivity.query_id)
             .join(
                 DataSourceGroup, Query.data_source_id == DataSourceGroup.data_source_id
             )
             .filter(
-                Event.action.in_(
-                    ["edit", "execute", "edit_name", "edit_description", "view_source"]
-                ),
-                Event.object_id != None,
-                Event.object_type == "query",
+                QueryActivity.day >= db.func.current_date() - 7,
                 DataSourceGroup.group_id.in_(group_ids),
                 or_(Query.is_draft == False, Query.user_id == user_id),
                 Query.is_archived == False,
             )
-            .group_by(Event.object_id, Query.id)
-            .order_by(db.desc(db.func.count(0)))
+            .group_by(Query.id)
+            .order_by(db.desc(db.func.sum(QueryActivity.count)))
         )
 
         if user_id:
-            query = query.filter(Event.user_id == user_id)
+            query = query.filter(QueryActivity.user_id == user_id)
 
         query = query.limit(limit)
 
@@ -864,6 +1281,11 @@ class Query(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model):
         return [api_key[0] for api_key in api_keys]
 
 
+@listens_for(Query.__table__, "before_create")
+def create_trigram_extension(target, connection, **kw):
+    connection.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
 @listens_for(Query.query_text, "set")
 def gen_query_hash(target, val, oldval, initiator):
     target.query_hash = utils.gen_query_hash(val)
@@ -1092,6 +1514,10 @@ class Dashboard(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model
     tags = Column(
         "tags", MutableList.as_mutable(postgresql.ARRAY(db.Unicode)), nullable=True
     )
+    search_vector = Column(
+        TSVectorType("name", "tags", weights={"name": "A", "tags": "B"}),
+        nullable=True,
+    )
 
     __tablename__ = "dashboards"
     __mapper_args__ = {"version_id_col": version}
@@ -1132,25 +1558,79 @@ class Dashboard(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model
 
     @classmethod
     def search(cls, org, groups_ids, user_id, search_term):
-        # TODO: switch to FTS
-        return cls.all(org, groups_ids, user_id).filter(
-            cls.name.ilike("%{}%".format(search_term))
+        """
+        Finds dashboards by their name, tags or the text of their widgets, most
+        relevant first. Words of the search term match by prefix.
+        """
+        search_query = prefix_search_query(search_term)
+        if search_query is None:
+            return cls.all(org, groups_ids, user_id).filter(
+                cls.name.ilike("%{}%".format(search_term))
+            )
+
+        # Matching against the ids of the accessible dashboards, rather than
+        # extending the query of cls.all, avoids ranking the duplicate rows it
+        # produces before they are removed by DISTINCT.
+        accessible = cls.all(org, groups_ids, user_id).subquery()
+        matching_widgets = db.session.query(Widget.dashboard_id).filter(
+            Widget.search_vector.op("@@")(search_query)
+        )
+        rank = func.ts_rank_cd(cls.search_vector, search_query)
+        return (
+            cls.query.options(
+                joinedload(Dashboard.user).load_only(
+                    "id", "name", "_profile_image_url", "email"
+                )
+            )
+            .filter(cls.id.in_(db.session.query(accessible.c.id)))
+            .filter(
+                or_(
+                    cls.search_vector.op("@@")(search_query),
+                    cls.id.in_(matching_widgets),
+                )
+            )
+            .order_by(rank.desc().nullslast(), cls.created_at.desc())
         )
 
     @classmethod
     def all_tags(cls, org, user):
-        dashboards = cls.all(org, user.group_ids, user.id)
-
-        tag_column = func.unnest(cls.tags).label("tag")
-        usage_count = func.count(1).label("usage_count")
-
-        query = (
-            db.session.query(tag_column, usage_count)
-            .group_by(tag_column)
-            .filter(Dashboard.id.in_(dashboards.options(load_only("id"))))
-            .order_by(usage_count.desc())
+        """
+        Counts the tags of the dashboards Dashboard.all lists for the user.
+
+        The counters hold the tags of all of the organization's published
+        dashboards, so the tags of those showing no query of the user's data
+        sources are subtracted, and those of the user's drafts added.
+        """
+        data_source_ids = db.session.query(DataSourceGroup.data_source_id).filter(
+            DataSourceGroup.group_id.in_(user.group_ids)
+        )
+        accessible = (
+            db.session.query(Widget.dashboard_id)
+            .join(Visualization, Widget.visualization_id == Visualization.id)
+            .join(Query, Visualization.query_id == Query.id)
+            .filter(Query.data_source_id.in_(data_source_ids))
+        )
+        return TagCount.usage(
+            and_(
+                TagCount.org == org,
+                TagCount.object_type == "Dashboard",
+                TagCount.is_draft == False,
+            ),
+            cls,
+            and_(
+                cls.org == org,
+                cls.user_id == user.id,
+                cls.is_draft == True,
+                cls.is_archived == False,
+            ),
+            hidden=and_(
+                cls.org == org,
+                cls.user_id != user.id,
+                cls.is_draft == False,
+                cls.is_archived == False,
+                ~cls.id.in_(accessible),
+            ),
         )
-        return query
 
     @classmethod
     def favorites(cls, user, base_query=None):
@@ -1170,6 +1650,39 @@ class Dashboard(ChangeTrackingMixin, TimestampMixin, BelongsToOrgMixin, db.Model
     def get_by_slug_and_org(cls, slug, org):
         return cls.query.filter(cls.slug == slug, cls.org == org).one()
 
+    def load_widgets(self):
+        """Returns the widgets of this dashboard together with their
+        visualizations, queries and query authors, in a single query."""
+        query_rel = joinedload(Widget.visualization).joinedload(Visualization.query_rel)
+        return self.widgets.options(
+            query_rel.joinedload(Query.user),
+            query_rel.joinedload(Query.last_modified_by),
+        ).all()
+
+    def widget_versions(self):
+        """Returns the id and last update of each widget of this dashboard, and
+        of the visualization and query it shows (including the query's latest
+        result and owner), without loading any of them. The query's data source
+        id comes last."""
+        return [
+            tuple(row)
+            for row in db.session.query(
+                Widget.id,
+                Widget.updated_at,
+                Visualization.updated_at,
+                Query.id,
+                Query.version,
+                Query.updated_at,
+                Query.latest_query_data_id,
+                Query.user_id,
+                Query.data_source_id,
+            )
+            .outerjoin(Visualization, Widget.visualization_id == Visualization.id)
+            .outerjoin(Query, Visualization.query_id == Query.id)
+            .filter(Widget.dashboard_id == self.id)
+            .order_by(Widget.id)
+        ]
+
     @hybrid_property
     def lowercase_name(self):
         "Optional property useful for sorting purposes."
@@ -1223,6 +1736,7 @@ class Widget(TimestampMixin, BelongsToOrgMixin, db.Model):
     width = Column(db.Integer)
     options = Column(db.Text)
     dashboard_id = Column(key_type("Dashboard"), db.ForeignKey("dashboards.id"), index=True)
+    search_vector = Column(TSVectorType("text"), nullable=True)
 
     __tablename__ = "widgets"
 
@@ -1272,8 +1786,8 @@ class Event(db.Model):
             "created_at": self.created_at.isoformat(),
         }
 
-    @classmethod
-    def record(cls, event):
+    @staticmethod
+    def _values(event):
         org_id = event.pop("org_id")
         user_id = event.pop("user_id", None)
         action = event.pop("action")
@@ -1282,7 +1796,7 @@ class Event(db.Model):
 
         created_at = datetime.datetime.utcfromtimestamp(event.pop("timestamp"))
 
-        event = cls(
+        return dict(
             org_id=org_id,
             user_id=user_id,
             action=action,
@@ -1291,9 +1805,305 @@ class Event(db.Model):
             additional_properties=event,
             created_at=created_at,
         )
+
+    @classmethod
+    def record(cls, event):
+        event = cls(**cls._values(event))
         db.session.add(event)
         return event
 
+    @classmethod
+    def record_many(cls, events):
+        """Inserts the given raw events with a single multi-row INSERT and returns
+        them, as stored, in (detached) Event objects."""
+        if not events:
+            return []
+
+        values = [cls._values(dict(event)) for event in events]
+        for value in values:
+            if value["object_id"] is not None:
+                value["object_id"] = str(value["object_id"])
+
+        statement = cls.__table__.insert().values(values).returning(cls.__table__)
+        events = [cls(**dict(row)) for row in db.session.execute(statement)]
+        QueryActivity.track(db.session.connection(), values)
+        return events
+
+
+RECENT_QUERY_ACTIONS = [
+    "edit",
+    "execute",
+    "edit_name",
+    "edit_description",
+    "view_source",
+]
+
+
+@generic_repr("id", "query_id", "user_id", "day", "count")
+class QueryActivity(db.Model):
+    """
+    Daily count of the events of each user on each query, which Query.recent
+    ranks queries by instead of aggregating the events table.
+    """
+
+    id = primary_key("QueryActivity")
+    # Not a foreign key, like Event.object_id, so events of deleted queries
+    # can still be recorded.
+    query_id = Column(key_type("Query"))
+    user_id = Column(
+        key_type("User"), db.ForeignKey("users.id"), nullable=True, index=True
+    )
+    day = Column(db.Date, index=True)
+    count = Column(db.Integer, default=0)
+
+    __tablename__ = "query_activity"
+
+    @classmethod
+    def track(cls, connection, events):
+        """Adds the given events, as dicts of Event column values, to the
+        counters of the queries they are about."""
+        counts = Counter()
+        for event in events:
+            object_id = event["object_id"]
+            if (
+                event["object_type"] != "query"
+                or event["action"] not in RECENT_QUERY_ACTIONS
+                or not str(object_id).isdigit()
+            ):
+                continue
+
+            created_at = event.get("created_at")
+            # created_at is left to the database when it isn't given.
+            if isinstance(created_at, datetime.datetime):
+                day = created_at.date()
+            else:
+                day = db.func.current_date()
+            counts[(int(object_id), event["user_id"], day)] += 1
+
+        if not counts:
+            return
+
+        statement = postgresql.insert(cls.__table__).values(
+            [
+                dict(query_id=query_id, user_id=user_id, day=day, count=count)
+                for (query_id, user_id, day), count in counts.items()
+            ]
+        )
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=_query_activity_key,
+                set_={"count": cls.__table__.c.count + statement.excluded.count},
+            )
+        )
+
+    @classmethod
+    def prune(cls):
+        """Deletes the counters that fell out of the window of Query.recent."""
+        outdated = cls.query.filter(cls.day < db.func.current_date() - 7)
+        return outdated.delete(synchronize_session=False)
+
+
+# Events without a user (those of API keys) share a counter per query and day.
+_query_activity_key = [
+    QueryActivity.__table__.c.query_id,
+    func.coalesce(QueryActivity.__table__.c.user_id, 0),
+    QueryActivity.__table__.c.day,
+]
+db.Index("ix_query_activity_key", *_query_activity_key, unique=True)
+
+
+@listens_for(Event, "after_insert")
+def track_query_activity(mapper, connection, target):
+    QueryActivity.track(
+        connection,
+        [
+            dict(
+                action=target.action,
+                object_type=target.object_type,
+                object_id=target.object_id,
+                user_id=target.user_id,
+                created_at=target.__dict__.get("created_at"),
+            )
+        ],
+    )
+
+
+@generic_repr("id", "org_id", "object_type", "data_source_id", "tag", "count")
+class TagCount(db.Model):
+    """
+    Number of the queries of each data source, and of the dashboards of each
+    organization, that carry each tag, kept up to date as those are written.
+    Archived queries and dashboards, and queries without a data source, are
+    not counted.
+    """
+
+    id = primary_key("TagCount")
+    org_id = Column(key_type("Organization"), db.ForeignKey("organizations.id"))
+    org = db.relationship(Organization)
+    object_type = Column(db.String(255))
+    data_source_id = Column(
+        key_type("DataSource"),
+        db.ForeignKey("data_sources.id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    is_draft = Column(db.Boolean)
+    tag = Column(db.Unicode)
+    count = Column(db.Integer, default=0)
+
+    __tablename__ = "tag_counts"
+
+    @classmethod
+    def usage(cls, counted, model=None, drafts=None, hidden=None):
+        """
+        Returns (tag, usage_count) rows, most used first, summing the counters
+        matching `counted` and the tags of the `model` drafts matching
+        `drafts`, which are counted on the fly. The tags of the `model` rows
+        matching `hidden`, which the counters include but the user may not
+        see, are subtracted.
+        """
+        tags = [select([cls.tag, cls.count]).where(and_(counted, cls.count > 0))]
+        if drafts is not None:
+            tags.append(
+                select([func.unnest(model.tags), literal_column("1")]).where(drafts)
+            )
+        if hidden is not None:
+            tags.append(
+                select([func.unnest(model.tags), literal_column("-1")]).where(hidden)
+            )
+        tags = (union_all(*tags) if len(tags) > 1 else tags[0]).alias("tags")
+
+        usage_count = func.sum(tags.c.count).label("usage_count")
+        return (
+            db.session.query(tags.c.tag, usage_count)
+            .group_by(tags.c.tag)
+            .having(usage_count > 0)
+            .order_by(usage_count.desc())
+        )
+
+    @staticmethod
+    def _key(target, value):
+        if value("is_archived"):
+            return None
+
+        if isinstance(target, Query):
+            if value("data_source_id") is None:
+                return None
+            data_source_id = value("data_source_id")
+        else:
+            data_source_id = None
+
+        return (
+            value("org_id"),
+            target.__class__.__name__,
+            data_source_id,
+            bool(value("is_draft")),
+        )
+
+    @classmethod
+    def track(cls, connection, target, previous=None, current=None):
+        """
+        Moves the tags of the given query or dashboard from the counters its
+        `previous` values counted towards to those of its `current` ones. Both
+        are functions returning the value of the given attribute, or None.
+        """
+        counts = Counter()
+        for value, change in ((previous, -1), (current, 1)):
+            key = value and cls._key(target, value)
+            if key:
+                for tag in value("tags") or []:
+                    counts[key + (tag,)] += change
+
+        values = [
+            dict(
+                org_id=org_id,
+                object_type=object_type,
+                data_source_id=data_source_id,
+                is_draft=is_draft,
+                tag=tag,
+                count=count,
+            )
+            for (org_id, object_type, data_source_id, is_draft, tag), count in (
+                counts.items()
+            )
+            if count
+        ]
+        if not values:
+            return
+
+        statement = postgresql.insert(cls.__table__).values(values)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=_tag_count_key,
+                set_={"count": cls.__table__.c.count + statement.excluded.count},
+            )
+        )
+
+
+_tag_count_key = [
+    TagCount.__table__.c.org_id,
+    TagCount.__table__.c.object_type,
+    func.coalesce(TagCount.__table__.c.data_source_id, 0),
+    TagCount.__table__.c.is_draft,
+    TagCount.__table__.c.tag,
+]
+db.Index("ix_tag_counts_key", *_tag_count_key, unique=True)
+
+
+def _previous_value(target, key):
+    # Tags changed in place by MutableList leave no deleted value in the history,
+    # so the tags last loaded or flushed are kept aside.
+    if key == "tags" and "_counted_tags" in target.__dict__:
+        return target.__dict__["_counted_tags"]
+    added, unchanged, deleted = inspect(target).attrs[key].history
+    if added or deleted:
+        return deleted[0] if deleted else None
+    return getattr(target, key)
+
+
+def _remember_counted_tags(target):
+    if "tags" in target.__dict__:
+        target.__dict__["_counted_tags"] = list(target.tags or [])
+
+
+@listens_for(Query, "load")
+@listens_for(Dashboard, "load")
+def remember_loaded_tags(target, context):
+    _remember_counted_tags(target)
+
+
+@listens_for(Query, "refresh")
+@listens_for(Dashboard, "refresh")
+def remember_refreshed_tags(target, context, attrs):
+    _remember_counted_tags(target)
+
+
+@listens_for(Query, "after_insert")
+@listens_for(Dashboard, "after_insert")
+def count_inserted_tags(mapper, connection, target):
+    TagCount.track(connection, target, current=partial(getattr, target))
+    _remember_counted_tags(target)
+
+
+@listens_for(Query, "after_update")
+@listens_for(Dashboard, "after_update")
+def count_updated_tags(mapper, connection, target):
+    attrs = inspect(target).attrs
+    keys = ["org_id", "data_source_id", "is_archived", "is_draft", "tags"]
+    if any(attrs[key].history.has_changes() for key in keys if key in attrs):
+        TagCount.track(
+            connection,
+            target,
+            previous=partial(_previous_value, target),
+            current=partial(getattr, target),
+        )
+        _remember_counted_tags(target)
+
+
+@listens_for(Query, "after_delete")
+@listens_for(Dashboard, "after_delete")
+def count_deleted_tags(mapper, connection, target):
+    TagCount.track(connection, target, previous=partial(_previous_value, target))
+
 
 @generic_repr("id", "created_by_id", "org_id", "active")
 class ApiKey(TimestampMixin, GFKBase, db.Model):
@@ -1,6 +1,8 @@
 import functools
+import re
 
 from flask_sqlalchemy import BaseQuery, SQLAlchemy
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import object_session
 from sqlalchemy.pool import NullPool
 from sqlalchemy_searchable import make_searchable, vectorizer, SearchQueryMixin
@@ -32,9 +34,11 @@ db = RedashSQLAlchemy(session_options={"expire_on_commit": False})
 # on the configuration phase of models.
 db.configure_mappers()
 
+SEARCH_REGCONFIG = "pg_catalog.simple"
+
 # listen to a few database events to set up functions, trigger updates
 # and indexes for the full text search
-make_searchable(options={"regconfig": "pg_catalog.simple"})
+make_searchable(options={"regconfig": SEARCH_REGCONFIG})
 
 
 class SearchBaseQuery(BaseQuery, SearchQueryMixin):
@@ -48,6 +52,25 @@ def integer_vectorizer(column):
     return db.func.cast(column, db.Text)
 
 
+@vectorizer(postgresql.ARRAY)
+def array_vectorizer(column):
+    return db.func.array_to_string(column, " ")
+
+
+def prefix_search_query(term):
+    """
+    Returns a text search query matching all the words of `term` by prefix, or
+    None if it has no words.
+    """
+    words = re.findall(r"\w+", term)
+    if not words:
+        return None
+
+    return db.func.to_tsquery(
+        SEARCH_REGCONFIG, " & ".join("{}:*".format(word) for word in words)
+    )
+
+
 Column = functools.partial(db.Column, nullable=False)
 
 # AccessPermission and Change use a 'generic foreign key' approach to refer to
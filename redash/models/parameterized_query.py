@@ -1,12 +1,17 @@
 import pystache
-from functools import partial
+from functools import lru_cache, partial
 from numbers import Number
-from redash.utils import mustache_render, json_loads
+from redash import redis_connection, settings
+from redash.utils import mustache_render, json_dumps, json_loads
 from redash.permissions import require_access, view_only
 from funcy import distinct
 from dateutil.parser import parse
 
 
+# Number of distinct query templates to keep parsed in memory (per process).
+TEMPLATE_CACHE_SIZE = 1024
+
+
 def _pluck_name_and_value(default_column, row):
     row = {k.lower(): v for k, v in row.items()}
     name_column = "name" if "name" in row.keys() else default_column.lower()
@@ -15,34 +20,139 @@ def _pluck_name_and_value(default_column, row):
     return {"name": row[name_column], "value": str(row[value_column])}
 
 
-def _load_result(query_id, org):
+def _load_query(query_id, org):
     from redash import models
 
     query = models.Query.get_by_id_and_org(query_id, org)
 
-    if query.data_source:
-        query_result = models.QueryResult.get_by_id_and_org(
-            query.latest_query_data_id, org
-        )
-        return query_result.data
-    else:
+    if not query.data_source:
         raise QueryDetachedFromDataSourceError(query_id)
 
+    return query
 
-def dropdown_values(query_id, org):
-    data = _load_result(query_id, org)
+
+def _load_result(query_id, org):
+    from redash import models
+
+    query = _load_query(query_id, org)
+    query_result = models.QueryResult.get_by_id_and_org(
+        query.latest_query_data_id, org
+    )
+    return query_result.data
+
+
+def _build_dropdown_values(data):
     first_column = data["columns"][0]["name"]
     pluck = partial(_pluck_name_and_value, first_column)
     return list(map(pluck, data["rows"]))
 
 
+def dropdown_values(query_id, org):
+    return _build_dropdown_values(_load_result(query_id, org))
+
+
+class DropdownValuesCache(object):
+    """Option sets of query-backed dropdown parameters, cached in Redis.
+
+    Entries are keyed by the id of the dropdown query's latest result. Query
+    results are immutable, so a new result for the dropdown query invalidates
+    the cached options simply by changing the key; stale entries expire after
+    PARAMETER_DROPDOWN_CACHE_TTL.
+
+    For every result two keys are kept: the serialized list of options (what
+    the dropdown endpoints return) and a Redis set of the option values, which
+    parameter validation checks with SISMEMBER without decoding anything.
+    """
+
+    KEY_PREFIX = "query_result:{}:dropdown"
+
+    def __init__(self, query_result_id):
+        prefix = self.KEY_PREFIX.format(query_result_id)
+        self.query_result_id = query_result_id
+        self.options_key = "{}:options".format(prefix)
+        self.values_key = "{}:values".format(prefix)
+
+    @classmethod
+    def for_query(cls, query_id, org):
+        query = _load_query(query_id, org)
+        return cls(query.latest_query_data_id)
+
+    def _load(self, org):
+        from redash import models
+
+        query_result = models.QueryResult.get_by_id_and_org(
+            self.query_result_id, org
+        )
+        return self.store(_build_dropdown_values(query_result.data))
+
+    def store(self, options):
+        ttl = settings.PARAMETER_DROPDOWN_CACHE_TTL
+        values = set(option["value"] for option in options)
+
+        pipe = redis_connection.pipeline()
+        pipe.delete(self.values_key)
+        if values:
+            pipe.sadd(self.values_key, *values)
+            pipe.expire(self.values_key, ttl)
+        # The options key is written last: its presence marks the entry as complete.
+        pipe.set(self.options_key, json_dumps(options), ex=ttl)
+        pipe.execute()
+
+        return options
+
+    def options(self, org):
+        cached = redis_connection.get(self.options_key)
+        if cached is not None:
+            return json_loads(cached)
+
+        return self._load(org)
+
+    def contains(self, values, org):
+        pipe = redis_connection.pipeline()
+        pipe.exists(self.options_key)
+        for value in values:
+            pipe.sismember(self.values_key, str(value))
+        cached, *members = pipe.execute()
+
+        if cached:
+            return all(members)
+
+        options = set(option["value"] for option in self._load(org))
+        return all(str(value) in options for value in values)
+
+
+def cached_dropdown_values(query_id, org):
+    """Same as dropdown_values, but served from DropdownValuesCache when possible."""
+    cache = DropdownValuesCache.for_query(query_id, org)
+    return cache.options(org)
+
+
+def _is_within_dropdown_values(value, query_id, org, allow_list=False):
+    if isinstance(value, list):
+        if not allow_list:
+            return False
+        values = value
+    else:
+        values = [value]
+
+    cache = DropdownValuesCache.for_query(query_id, org)
+    return cache.contains(values, org)
+
+
+def _index_schema(schema):
+    # Keep the first definition for a name, matching the previous linear lookup.
+    definitions = {}
+    for definition in schema:
+        definitions.setdefault(definition["name"], definition)
+    return definitions
+
+
 def join_parameter_list_values(parameters, schema):
     updated_parameters = {}
+    definitions = schema if isinstance(schema, dict) else _index_schema(schema)
     for (key, value) in parameters.items():
         if isinstance(value, list):
-            definition = next(
-                (definition for definition in schema if definition["name"] == key), {}
-            )
+            definition = definitions.get(key, {})
             multi_values_options = definition.get("multiValuesOptions", {})
             separator = str(multi_values_options.get("separator", ","))
             prefix = str(multi_values_options.get("prefix", ""))
@@ -67,10 +177,20 @@ def _collect_key_names(nodes):
     return distinct(keys)
 
 
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _parse_template(template):
+    """Parse a query template once and reuse the parse tree for subsequent renders.
+
+    Parsed templates are immutable, so they are safe to share between
+    ParameterizedQuery instances (and threads).
+    """
+    return pystache.parse(template)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
 def _collect_query_parameters(query):
-    nodes = pystache.parse(query)
-    keys = _collect_key_names(nodes)
-    return keys
+    keys = _collect_key_names(_parse_template(query))
+    return frozenset(keys)
 
 
 def _parameter_names(parameter_values):
@@ -120,6 +240,7 @@ def _is_value_within_options(value, dropdown_options, allow_list=False):
 class ParameterizedQuery(object):
     def __init__(self, template, schema=None, org=None):
         self.schema = schema or []
+        self._definitions = _index_schema(self.schema)
         self.org = org
         self.template = template
         self.query = template
@@ -134,7 +255,8 @@ class ParameterizedQuery(object):
         else:
             self.parameters.update(parameters)
             self.query = mustache_render(
-                self.template, join_parameter_list_values(parameters, self.schema)
+                _parse_template(self.template),
+                join_parameter_list_values(parameters, self._definitions),
             )
 
         return self
@@ -143,10 +265,7 @@ class ParameterizedQuery(object):
         if not self.schema:
             return True
 
-        definition = next(
-            (definition for definition in self.schema if definition["name"] == name),
-            None,
-        )
+        definition = self._definitions.get(name)
 
         if not definition:
             return False
@@ -164,10 +283,8 @@ class ParameterizedQuery(object):
             "enum": lambda value: _is_value_within_options(
                 value, enum_options, allow_multiple_values
             ),
-            "query": lambda value: _is_value_within_options(
-                value,
-                [v["value"] for v in dropdown_values(query_id, self.org)],
-                allow_multiple_values,
+            "query": lambda value: _is_within_dropdown_values(
+                value, query_id, self.org, allow_multiple_values
             ),
             "date": _is_date,
             "datetime-local": _is_date,
@@ -188,7 +305,7 @@ class ParameterizedQuery(object):
 
     @property
     def missing_params(self):
-        query_parameters = set(_collect_query_parameters(self.template))
+        query_parameters = _collect_query_parameters(self.template)
         return set(query_parameters) - set(_parameter_names(self.parameters))
 
     @property
@@ -5,19 +5,26 @@ import time
 from functools import reduce
 from operator import or_
 
-from flask import current_app as app, url_for, request_started
+from flask import current_app as app, g, has_request_context, url_for, request_started
 from flask_login import current_user, AnonymousUserMixin, UserMixin
 from passlib.apps import custom_app_context as pwd_context
 from sqlalchemy.exc import DBAPIError
 from sqlalchemy.dialects import postgresql
+from sqlalchemy.event import listens_for
 
 from sqlalchemy_utils import EmailType
 from sqlalchemy_utils.models import generic_repr
 
-from redash import redis_connection
-from redash.utils import generate_token, utcnow, dt_from_timestamp
+from redash import redis_connection, settings
+from redash.utils import (
+    generate_token,
+    utcnow,
+    dt_from_timestamp,
+    json_dumps,
+    json_loads,
+)
 
-from .base import db, Column, GFKBase, key_type, primary_key
+from .base import db, Column, GFKBase, key_type, primary_key, _gfk_types
 from .mixins import TimestampMixin, BelongsToOrgMixin
 from .types import json_cast_property, MutableDict, MutableList
 
@@ -25,6 +32,7 @@ logger = logging.getLogger(__name__)
 
 
 LAST_ACTIVE_KEY = "users:last_active_at"
+GROUPS_VERSION_KEY = "groups:version"
 
 
 def sync_last_active_at():
@@ -62,6 +70,92 @@ def init_app(app):
     request_started.connect(update_user_active_at, app)
 
 
+def api_key_principal_key(api_key):
+    """
+    Redis key the authentication layer caches the principal (user, dashboard
+    or query) an API key resolves to under.
+    """
+    digest = hashlib.sha256(api_key.encode()).hexdigest()
+    return "api_key:{}:principal".format(digest)
+
+
+def invalidate_api_key(api_key):
+    """
+    Drop the cached principal of an API key. Needs to be called whenever a key
+    is regenerated or deactivated, or its owner is disabled.
+    """
+    if api_key:
+        redis_connection.delete(api_key_principal_key(api_key))
+
+
+def invalidate_api_key_on_commit(api_key):
+    """
+    Drop the cached principal of an API key once the current transaction
+    commits. Until then the key is still valid in the database, so a request
+    resolving it in between would cache its principal again.
+    """
+    if api_key:
+        db.session.info.setdefault("invalidated_api_keys", set()).add(api_key)
+
+
+@listens_for(db.session, "after_commit")
+def invalidate_committed_api_keys(session):
+    for api_key in session.info.pop("invalidated_api_keys", ()):
+        invalidate_api_key(api_key)
+
+
+@listens_for(db.session, "after_rollback")
+def forget_invalidated_api_keys(session):
+    session.info.pop("invalidated_api_keys", None)
+
+
+def invalidate_permissions():
+    """
+    Drop the cached permissions of all users, by moving to a new version of
+    the groups. Needs to be called whenever group permissions or memberships
+    change.
+    """
+    redis_connection.incr(GROUPS_VERSION_KEY)
+    if has_request_context():
+        g.pop("user_permissions", None)
+
+
+def _load_permissions(group_ids):
+    groups = Group.query.filter(Group.id.in_(group_ids))
+    return list(itertools.chain(*[group.permissions for group in groups]))
+
+
+def resolve_permissions(user_id, group_ids):
+    """
+    Returns the permissions granted to a user by its groups. These are resolved
+    at most once per request and kept in Redis across requests, keyed by the
+    user, its groups and the current version of the groups.
+    """
+    group_ids = tuple(sorted(group_ids or []))
+    if has_request_context():
+        resolved = g.setdefault("user_permissions", {})
+        if (user_id, group_ids) in resolved:
+            return list(resolved[(user_id, group_ids)])
+
+    key = "user:{}:permissions:{}:{}".format(
+        user_id,
+        redis_connection.get(GROUPS_VERSION_KEY) or 0,
+        ",".join(map(str, group_ids)),
+    )
+    cached = redis_connection.get(key)
+    if cached is not None:
+        permissions = json_loads(cached)
+    else:
+        permissions = _load_permissions(group_ids)
+        redis_connection.set(
+            key, json_dumps(permissions), ex=settings.USER_PERMISSIONS_CACHE_TTL
+        )
+
+    if has_request_context():
+        g.user_permissions[(user_id, group_ids)] = permissions
+    return list(permissions)
+
+
 class PermissionsCheckMixin(object):
     def has_permission(self, permission):
         return self.has_permissions((permission,))
@@ -126,11 +220,13 @@ class User(
 
     def disable(self):
         self.disabled_at = db.func.now()
+        invalidate_api_key_on_commit(self.api_key)
 
     def enable(self):
         self.disabled_at = None
 
     def regenerate_api_key(self):
+        invalidate_api_key_on_commit(self.api_key)
         self.api_key = generate_token(40)
 
     def to_dict(self, with_api_key=False):
@@ -178,15 +274,7 @@ class User(
 
     @property
     def permissions(self):
-        # TODO: this should be cached.
-        return list(
-            itertools.chain(
-                *[
-                    g.permissions
-                    for g in Group.query.filter(Group.id.in_(self.group_ids))
-                ]
-            )
-        )
+        return resolve_permissions(self.id, self.group_ids)
 
     @classmethod
     def get_by_org(cls, org):
@@ -402,21 +490,34 @@ class AnonymousUser(AnonymousUserMixin, PermissionsCheckMixin):
 
 
 class ApiUser(UserMixin, PermissionsCheckMixin):
-    def __init__(self, api_key, org, groups, name=None):
-        self.object = None
+    def __init__(self, api_key, org, groups, name=None, object_ref=None):
+        self._object = None
+        # (object_type, object_id) of the object the key was created for, which
+        # is only loaded when needed.
+        self.object_ref = object_ref
         if isinstance(api_key, str):
             self.id = api_key
             self.name = name
         else:
             self.id = api_key.api_key
             self.name = "ApiKey: {}".format(api_key.id)
-            self.object = api_key.object
+            self.object_ref = (api_key.object_type, api_key.object_id)
         self.group_ids = groups
         self.org = org
 
     def __repr__(self):
         return "<{}>".format(self.name)
 
+    @property
+    def object(self):
+        if self._object is None and self.object_ref:
+            object_type, object_id = self.object_ref
+            object_class = _gfk_types[object_type]
+            self._object = object_class.query.filter(
+                object_class.id == object_id
+            ).first()
+        return self._object
+
     def is_api_user(self):
         return True
 
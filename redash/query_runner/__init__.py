@@ -1,9 +1,10 @@
 import logging
+import time
 
+from concurrent.futures import ThreadPoolExecutor, wait
 from contextlib import ExitStack
 from dateutil import parser
 from functools import wraps
-import socket
 import ipaddress
 from urllib.parse import urlparse
 
@@ -13,7 +14,12 @@ from redash import settings
 from redash.utils import json_loads
 from rq.timeouts import JobTimeoutException
 
-from redash.utils.requests_session import requests, requests_session
+from redash.utils.requests_session import (
+    ConfiguredSession,
+    get_session,
+    requests,
+    resolve_hostname,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -171,9 +177,70 @@ class BaseQueryRunner(object):
 
         return new_columns
 
+    def fetch_result(self, cursor, columns, batch_size=None, max_rows=None):
+        """Reads the rows of a DB-API cursor, see fetch_rows, into the data of a
+        query result."""
+        rows, truncated = self.fetch_rows(cursor, columns, batch_size, max_rows)
+        return self.result_data(columns, rows, truncated)
+
+    def fetch_rows(self, cursor, columns, batch_size=None, max_rows=None):
+        """Reads the rows of a DB-API cursor with fetchmany, converting each batch
+        to dicts as it's read. Returns them and whether they were truncated.
+
+        `batch_size` defaults to QUERY_RESULTS_FETCH_BATCH_SIZE. Reading stops
+        after `max_rows` rows, QUERY_RESULTS_MAX_ROWS by default (0 for no limit).
+        """
+        batch_size = batch_size or settings.QUERY_RESULTS_FETCH_BATCH_SIZE
+        if max_rows is None:
+            max_rows = settings.QUERY_RESULTS_MAX_ROWS
+
+        column_names = [column["name"] for column in columns]
+        rows = []
+        truncated = False
+
+        while True:
+            size = min(batch_size, max_rows - len(rows)) if max_rows else batch_size
+            if size <= 0:
+                if cursor.fetchmany(1):
+                    logger.warning("Query result truncated to %d rows.", max_rows)
+                    truncated = True
+                break
+
+            batch = cursor.fetchmany(size)
+            if not batch:
+                break
+            rows.extend(dict(zip(column_names, row)) for row in batch)
+
+        return rows, truncated
+
+    @staticmethod
+    def result_data(columns, rows, truncated=False):
+        """The data of a query result. A truncated one says so in its log, which
+        is shown along with the result."""
+        data = {"columns": columns, "rows": rows}
+        if truncated:
+            data["log"] = ["Result truncated to {} rows.".format(len(rows))]
+        return data
+
     def get_schema(self, get_stats=False):
         raise NotSupported()
 
+    def get_schema_version(self):
+        """Returns a token that changes whenever the data source's catalog changes.
+
+        Used to skip schema refreshes when nothing changed. Query runners that can
+        cheaply tell (e.g. from a catalog version or last DDL time) should override
+        this; returning None makes Redash fetch the full schema and diff it instead.
+        """
+        return None
+
+    def get_table_sizes(self, table_names):
+        """Returns a dict of table name to (estimated) number of rows.
+
+        Tables that couldn't be measured are left out.
+        """
+        raise NotSupported()
+
     def _run_query_internal(self, query):
         results, error = self.run_query(query, None)
 
@@ -192,6 +259,10 @@ class BaseQueryRunner(object):
 
 
 class BaseSQLQueryRunner(BaseQueryRunner):
+    # A query returning a single row and column that changes whenever the catalog
+    # changes. See BaseQueryRunner.get_schema_version.
+    schema_version_query = None
+
     def get_schema(self, get_stats=False):
         schema_dict = {}
         self._get_tables(schema_dict)
@@ -199,19 +270,98 @@ class BaseSQLQueryRunner(BaseQueryRunner):
             self._get_tables_stats(schema_dict)
         return list(schema_dict.values())
 
+    def get_schema_version(self):
+        if self.schema_version_query is None:
+            return None
+
+        rows = self._run_query_internal(self.schema_version_query)
+        return list(rows[0].values())[0] if rows else None
+
     def _get_tables(self, schema_dict):
         return []
 
     def _get_tables_stats(self, tables_dict):
-        for t in tables_dict.keys():
-            if type(tables_dict[t]) == dict:
-                res = self._run_query_internal("select count(*) as cnt from %s" % t)
-                tables_dict[t]["size"] = res[0]["cnt"]
+        tables = [t for t in tables_dict.keys() if type(tables_dict[t]) == dict]
+        for table, size in self.get_table_sizes(tables).items():
+            tables_dict[table]["size"] = size
+
+    def get_table_sizes(self, table_names):
+        """Uses catalog estimates where available and falls back to counting rows.
+
+        Exact counts run concurrently (SCHEMA_TABLE_SIZE_CALCULATIONS_CONCURRENCY)
+        and stop being collected once SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT
+        seconds have passed; tables that weren't counted by then are left out.
+        """
+        try:
+            estimates = self._get_table_size_estimates()
+        except Exception:
+            logger.warning("Failed getting table size estimates.", exc_info=1)
+            estimates = {}
+
+        sizes = {t: estimates[t] for t in table_names if t in estimates}
+        missing = [t for t in table_names if t not in sizes]
+        if missing:
+            sizes.update(self._count_table_rows(missing))
+
+        return sizes
+
+    def _get_table_size_estimates(self):
+        """Returns estimated row counts from the catalog, keyed by table name as
+        used in the schema. Query runners without such statistics return {}."""
+        return {}
+
+    def _count_table_row(self, table, timeout):
+        """Counts the rows of `table`. Query runners that can have the database
+        abort a statement override this to give up after `timeout` seconds."""
+        res = self._run_query_internal("select count(*) as cnt from %s" % table)
+        return res[0]["cnt"]
+
+    def _count_table_rows(self, tables):
+        deadline = time.time() + settings.SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT
+        concurrency = settings.SCHEMA_TABLE_SIZE_CALCULATIONS_CONCURRENCY
+        # SSH tunnels swap the runner's host and port for the duration of a query,
+        # so tunnelled queries can't run concurrently on the same runner.
+        if "ssh_tunnel" in self.configuration:
+            concurrency = 1
+
+        def count(table):
+            # Counts that start late only get what's left of the time budget.
+            return self._count_table_row(table, max(deadline - time.time(), 0.001))
+
+        executor = ThreadPoolExecutor(max_workers=max(concurrency, 1))
+        futures = {executor.submit(count, t): t for t in tables}
+
+        try:
+            done, not_done = wait(futures, timeout=max(deadline - time.time(), 0))
+        finally:
+            # Don't wait for counts that exceeded the time budget; the ones still
+            # running are aborted by the database when the runner supports it.
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+        if not_done:
+            logger.warning(
+                "Table size calculation timed out, skipped %d of %d tables.",
+                len(not_done),
+                len(tables),
+            )
+
+        sizes = {}
+        for future in done:
+            try:
+                sizes[futures[future]] = future.result()
+            except Exception:
+                logger.warning(
+                    "Failed counting rows of %s.", futures[future], exc_info=1
+                )
+
+        return sizes
 
 
 def is_private_address(url):
     hostname = urlparse(url).hostname
-    ip_address = socket.gethostbyname(hostname)
+    ip_address = resolve_hostname(hostname)
     return ipaddress.ip_address(text_type(ip_address)).is_private
 
 
@@ -257,6 +407,11 @@ class BaseHTTPQueryRunner(BaseQueryRunner):
         else:
             return None
 
+    @staticmethod
+    def _session_key(url):
+        parsed = urlparse(url)
+        return "{}://{}".format(parsed.scheme, parsed.netloc)
+
     def get_response(self, url, auth=None, http_method="get", **kwargs):
         if is_private_address(url) and settings.ENFORCE_PRIVATE_ADDRESS_BLOCK:
             raise Exception("Can't query private addresses.")
@@ -270,7 +425,8 @@ class BaseHTTPQueryRunner(BaseQueryRunner):
         error = None
         response = None
         try:
-            response = requests_session.request(http_method, url, auth=auth, **kwargs)
+            session = get_session(self._session_key(url), ConfiguredSession)
+            response = session.request(http_method, url, auth=auth, **kwargs)
             # Raise a requests HTTP exception with the appropriate reason
             # for 4xx and 5xx response status codes which is later caught
             # and passed back.
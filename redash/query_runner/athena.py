@@ -231,10 +231,7 @@ class Athena(BaseQueryRunner):
                 (i[0], _TYPE_MAPPINGS.get(i[1], None)) for i in cursor.description
             ]
             columns = self.fetch_columns(column_tuples)
-            rows = [
-                dict(zip(([c["name"] for c in columns]), r))
-                for i, r in enumerate(cursor.fetchall())
-            ]
+            rows, truncated = self.fetch_rows(cursor, columns)
             qbytes = None
             athena_query_id = None
             try:
@@ -247,14 +244,11 @@ class Athena(BaseQueryRunner):
                 logger.debug("Athena Upstream can't get query_id: %s", e)
 
             price = self.configuration.get("cost_per_tb", 5)
-            data = {
-                "columns": columns,
-                "rows": rows,
-                "metadata": {
-                    "data_scanned": qbytes,
-                    "athena_query_id": athena_query_id,
-                    "query_cost": price * qbytes * 10e-12,
-                },
+            data = self.result_data(columns, rows, truncated)
+            data["metadata"] = {
+                "data_scanned": qbytes,
+                "athena_query_id": athena_query_id,
+                "query_cost": price * qbytes * 10e-12,
             }
 
             json_data = json_dumps(data, ignore_nan=True)
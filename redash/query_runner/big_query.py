@@ -1,8 +1,11 @@
 import datetime
 import logging
 import sys
+import threading
 import time
 from base64 import b64decode
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import httplib2
 import requests
@@ -46,6 +49,48 @@ def transform_cell(field_type, cell_value):
     return cell_value
 
 
+def _parse_boolean(value):
+    return value.lower() == "true"
+
+
+def _parse_timestamp(value):
+    return datetime.datetime.fromtimestamp(float(value))
+
+
+CELL_CONVERTERS = {
+    "INTEGER": int,
+    "FLOAT": float,
+    "BOOLEAN": _parse_boolean,
+    "TIMESTAMP": _parse_timestamp,
+}
+
+
+def transform_column(field, cells):
+    """Transforms the cells of one column, resolving its converter only once."""
+    if field.get("mode") == "REPEATED":
+        item_field = {"type": field["type"]}
+        return [transform_column(item_field, cell["v"]) for cell in cells]
+
+    convert = CELL_CONVERTERS.get(field["type"])
+    if convert is None:
+        return [cell["v"] for cell in cells]
+
+    return [None if cell["v"] is None else convert(cell["v"]) for cell in cells]
+
+
+def transform_rows(rows, fields):
+    """Transforms a page of rows column by column, which is equivalent to, but
+    much faster than, calling transform_row on each of them."""
+    if not fields:
+        return [{} for _ in rows]
+
+    names = [field["name"] for field in fields]
+    columns = zip(*(row["f"] for row in rows))
+    values = [transform_column(field, cells) for field, cells in zip(fields, columns)]
+
+    return [dict(zip(names, row_values)) for row_values in zip(*values)]
+
+
 def transform_row(row, fields):
     row_data = {}
 
@@ -132,7 +177,7 @@ class BigQuery(BaseQueryRunner):
             "secret": ["jsonKeyFile"],
         }
 
-    def _get_bigquery_service(self):
+    def _get_http(self):
         scope = [
             "https://www.googleapis.com/auth/bigquery",
             "https://www.googleapis.com/auth/drive",
@@ -142,9 +187,10 @@ class BigQuery(BaseQueryRunner):
 
         creds = ServiceAccountCredentials.from_json_keyfile_dict(key, scope)
         http = httplib2.Http(timeout=settings.BIGQUERY_HTTP_TIMEOUT)
-        http = creds.authorize(http)
+        return creds.authorize(http)
 
-        return build("bigquery", "v2", http=http)
+    def _get_bigquery_service(self):
+        return build("bigquery", "v2", http=self._get_http())
 
     def _get_project_id(self):
         return self.configuration["projectId"]
@@ -193,35 +239,20 @@ class BigQuery(BaseQueryRunner):
         job_data = self._get_job_data(query)
         insert_response = jobs.insert(projectId=project_id, body=job_data).execute()
         self.current_job_id = insert_response["jobReference"]["jobId"]
-        current_row = 0
         query_reply = _get_query_results(
             jobs,
             project_id=project_id,
             location=self._get_location(),
             job_id=self.current_job_id,
-            start_index=current_row,
+            start_index=0,
         )
 
         logger.debug("bigquery replied: %s", query_reply)
 
+        fields = query_reply["schema"]["fields"]
         rows = []
-
-        while ("rows" in query_reply) and current_row < int(query_reply["totalRows"]):
-            for row in query_reply["rows"]:
-                rows.append(transform_row(row, query_reply["schema"]["fields"]))
-
-            current_row += len(query_reply["rows"])
-
-            query_result_request = {
-                "projectId": project_id,
-                "jobId": query_reply["jobReference"]["jobId"],
-                "startIndex": current_row,
-            }
-
-            if self._get_location():
-                query_result_request["location"] = self._get_location()
-
-            query_reply = jobs.getQueryResults(**query_result_request).execute()
+        for page in self._fetch_pages(jobs, query_reply):
+            rows.extend(transform_rows(page, fields))
 
         columns = [
             {
@@ -231,7 +262,7 @@ class BigQuery(BaseQueryRunner):
                 if f.get("mode") == "REPEATED"
                 else types_map.get(f["type"], "string"),
             }
-            for f in query_reply["schema"]["fields"]
+            for f in fields
         ]
 
         data = {
@@ -242,6 +273,66 @@ class BigQuery(BaseQueryRunner):
 
         return data
 
+    def _fetch_pages(self, jobs, query_reply):
+        """Yields the pages of rows of a completed query, in order.
+
+        The first page tells the page size and the total number of rows, so the
+        remaining pages are downloaded concurrently, each over its own HTTP
+        connection as httplib2 isn't thread safe. At most twice as many pages as
+        there are workers are held in memory at a time.
+        """
+        first_page = query_reply.get("rows", [])
+        total_rows = int(query_reply.get("totalRows", 0))
+        yield first_page
+
+        page_size = len(first_page)
+        if not page_size or page_size >= total_rows:
+            return
+
+        request = {"projectId": self._get_project_id(), "jobId": self.current_job_id}
+        if self._get_location():
+            request["location"] = self._get_location()
+
+        local = threading.local()
+
+        def fetch(start, end):
+            if not hasattr(local, "http"):
+                local.http = self._get_http()
+
+            # A page can come back short when it exceeds the maximum response
+            # size, in which case the rest of it is requested again.
+            page = []
+            while start + len(page) < end:
+                reply = jobs.getQueryResults(
+                    startIndex=start + len(page),
+                    maxResults=end - start - len(page),
+                    **request
+                ).execute(http=local.http)
+                if not reply.get("rows"):
+                    break
+                page.extend(reply["rows"])
+
+            return page
+
+        ranges = deque(
+            (start, min(start + page_size, total_rows))
+            for start in range(page_size, total_rows, page_size)
+        )
+        concurrency = max(settings.BIGQUERY_RESULT_FETCH_CONCURRENCY, 1)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        pending = deque()
+
+        try:
+            while ranges or pending:
+                while ranges and len(pending) < concurrency * 2:
+                    pending.append(executor.submit(fetch, *ranges.popleft()))
+
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+
     def _get_columns_schema(self, table_data):
         columns = []
         for column in table_data.get("schema", {}).get("fields", []):
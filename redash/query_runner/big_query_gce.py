@@ -2,7 +2,6 @@ import requests
 import httplib2
 
 try:
-    from apiclient.discovery import build
     from oauth2client.contrib import gce
 
     enabled = True
@@ -64,14 +63,12 @@ class BigQueryGCE(BigQuery):
             headers={"Metadata-Flavor": "Google"},
         ).content
 
-    def _get_bigquery_service(self):
+    def _get_http(self):
         credentials = gce.AppAssertionCredentials(
             scope="https://www.googleapis.com/auth/bigquery"
         )
         http = httplib2.Http()
-        http = credentials.authorize(http)
-
-        return build("bigquery", "v2", http=http)
+        return credentials.authorize(http)
 
 
 register(BigQueryGCE)
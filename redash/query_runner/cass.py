@@ -12,6 +12,7 @@ logger = logging.getLogger(__name__)
 try:
     from cassandra.cluster import Cluster
     from cassandra.auth import PlainTextAuthProvider
+    from cassandra.query import SimpleStatement
     from cassandra.util import sortedset
 
     enabled = True
@@ -59,6 +60,11 @@ class Cassandra(BaseQueryRunner):
                     "default": 3,
                 },
                 "timeout": {"type": "number", "title": "Timeout", "default": 10},
+                "fetchSize": {
+                    "type": "number",
+                    "title": "Page Size (rows fetched at a time)",
+                    "default": 1000,
+                },
                 "useSsl": {"type": "boolean", "title": "Use SSL", "default": False},
                 "sslCertificateFile": {
                     "type": "string",
@@ -124,8 +130,7 @@ class Cassandra(BaseQueryRunner):
 
         return list(schema.values())
 
-    def run_query(self, query, user):
-        connection = None
+    def _connect(self):
         cert_path = self._generate_cert_file()
         if self.configuration.get("username", "") and self.configuration.get(
             "password", ""
@@ -148,19 +153,40 @@ class Cassandra(BaseQueryRunner):
                 protocol_version=self.configuration.get("protocol", 3),
                 ssl_options=self._get_ssl_options(cert_path),
             )
-        session = connection.connect()
-        session.set_keyspace(self.configuration["keyspace"])
-        session.default_timeout = self.configuration.get("timeout", 10)
+
+        try:
+            session = connection.connect()
+            session.set_keyspace(self.configuration["keyspace"])
+            session.default_timeout = self.configuration.get("timeout", 10)
+        except Exception:
+            connection.shutdown()
+            self._cleanup_cert_file(cert_path)
+            raise
+
+        return connection, session, cert_path
+
+    def run_query(self, query, user):
+        connection, session, cert_path = self._connect()
+        statement = SimpleStatement(
+            query, fetch_size=int(self.configuration.get("fetchSize", 1000))
+        )
         logger.debug("Cassandra running query: %s", query)
-        result = session.execute(query)
-        self._cleanup_cert_file(cert_path)
 
-        column_names = result.column_names
+        try:
+            # Pages beyond the first one are fetched while iterating the result.
+            result = session.execute(statement)
+            column_names = result.column_names
+            rows = [dict(zip(column_names, row)) for row in result]
+        finally:
+            # Workers exit without running atexit handlers, so nothing is kept
+            # between queries: the cluster and its certificate go right away.
+            try:
+                connection.shutdown()
+            finally:
+                self._cleanup_cert_file(cert_path)
 
         columns = self.fetch_columns([(c, "string") for c in column_names])
 
-        rows = [dict(zip(column_names, row)) for row in result]
-
         data = {"columns": columns, "rows": rows}
         json_data = json_dumps(data, cls=CassandraJSONEncoder)
 
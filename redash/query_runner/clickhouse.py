@@ -1,3 +1,4 @@
+import itertools
 import logging
 import re
 from urllib.parse import urlparse
@@ -6,6 +7,7 @@ import requests
 
 from redash.query_runner import *
 from redash.utils import json_dumps, json_loads
+from redash.utils.requests_session import get_session
 
 logger = logging.getLogger(__name__)
 
@@ -32,10 +34,15 @@ class ClickHouse(BaseSQLQueryRunner):
                     "title": "Verify SSL certificate",
                     "default": True,
                 },
+                "streaming": {
+                    "type": "boolean",
+                    "title": "Stream Results (ClickHouse 20.x+, no totals)",
+                    "default": False,
+                },
             },
             "order": ["url", "user", "password", "dbname"],
             "required": ["dbname"],
-            "extra_options": ["timeout", "verify"],
+            "extra_options": ["timeout", "verify", "streaming"],
             "secret": ["password"],
         }
 
@@ -91,20 +98,23 @@ class ClickHouse(BaseSQLQueryRunner):
         url = self.configuration.get("url", "http://127.0.0.1:8123")
         try:
             verify = self.configuration.get("verify", True)
-            r = requests.post(
+            params = {
+                "user": self.configuration.get("user", "default"),
+                "password": self.configuration.get("password", ""),
+                "database": self.configuration["dbname"],
+            }
+            r = get_session(url).post(
                 url,
                 data=data.encode("utf-8","ignore"),
                 stream=stream,
                 timeout=self.configuration.get("timeout", 30),
-                params={
-                    "user": self.configuration.get("user", "default"),
-                    "password": self.configuration.get("password", ""),
-                    "database": self.configuration["dbname"],
-                },
+                params=params,
                 verify=verify,
             )
             if r.status_code != 200:
                 raise Exception(r.text)
+            if stream:
+                return r
             # logging.warning(r.json())
             return r.json()
         except requests.RequestException as e:
@@ -171,6 +181,72 @@ class ClickHouse(BaseSQLQueryRunner):
 
         return {"columns": columns, "rows": rows}
 
+    @staticmethod
+    def _define_column_converter(column):
+        c = column.lower()
+        f = re.search(r"^nullable\((.*)\)$", c)
+        if f is not None:
+            c = f.group(1)
+        # 64-bit integers are quoted by default (as JSON numbers can't hold them
+        # exactly in every client), but may come unquoted if the user changed
+        # output_format_json_quote_64bit_integers.
+        if c in ("int64", "uint64"):
+            return lambda value: int(value) if value is not None else None
+        return None
+
+    def _clickhouse_query_streaming(self, query):
+        """Runs the query using the JSONCompactEachRowWithNamesAndTypes format.
+
+        Every row is a JSON array on its own line (after a line with the column
+        names and one with their types), so the response is parsed line by line
+        as it's read instead of being buffered and decoded as a whole, and types
+        are mapped once per column rather than checked for every row.
+        """
+        query += "\nFORMAT JSONCompactEachRowWithNamesAndTypes"
+        response = self._send_query(query, stream=True)
+
+        try:
+            lines = (line for line in response.iter_lines() if line)
+            header = [
+                self._parse_streamed_line(line) for line in itertools.islice(lines, 2)
+            ]
+            if len(header) < 2:
+                return {"columns": [], "rows": []}
+
+            names, types = header
+            columns = [
+                {
+                    "name": name,
+                    "friendly_name": name,
+                    "type": self._define_column_type(column_type),
+                }
+                for name, column_type in zip(names, types)
+            ]
+            converters = [
+                (i, converter)
+                for i, converter in enumerate(map(self._define_column_converter, types))
+                if converter is not None
+            ]
+
+            rows = []
+            for line in lines:
+                values = self._parse_streamed_line(line)
+                for i, converter in converters:
+                    values[i] = converter(values[i])
+                rows.append(dict(zip(names, values)))
+        finally:
+            response.close()
+
+        return {"columns": columns, "rows": rows}
+
+    @staticmethod
+    def _parse_streamed_line(line):
+        try:
+            return json_loads(line)
+        except ValueError:
+            # Errors that happen after the response started are appended to it as text.
+            raise Exception(line.decode("utf-8", "replace"))
+
     def run_query(self, query, user):
         logger.debug("Clickhouse is about to execute query: %s", query)
         if query == "":
@@ -178,7 +254,10 @@ class ClickHouse(BaseSQLQueryRunner):
             error = "Query is empty"
             return json_data, error
         try:
-            q = self._clickhouse_query(query)
+            if self.configuration.get("streaming", False):
+                q = self._clickhouse_query_streaming(query)
+            else:
+                q = self._clickhouse_query(query)
             data = json_dumps(q)
             error = None
         except Exception as e:
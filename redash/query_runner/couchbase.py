@@ -4,6 +4,7 @@ import logging
 from dateutil.parser import parse
 
 from redash.query_runner import *
+from redash.query_runner.flatten import flatten_documents
 from redash.utils import JSONEncoder, json_dumps, json_loads, parse_human_time
 import json
 
@@ -26,50 +27,8 @@ TYPES_MAP = {
 }
 
 
-def _get_column_by_name(columns, column_name):
-    for c in columns:
-        if "name" in c and c["name"] == column_name:
-            return c
-    return None
-
-
 def parse_results(results):
-    rows = []
-    columns = []
-
-    for row in results:
-        parsed_row = {}
-        for key in row:
-            if isinstance(row[key], dict):
-                for inner_key in row[key]:
-                    column_name = "{}.{}".format(key, inner_key)
-                    if _get_column_by_name(columns, column_name) is None:
-                        columns.append(
-                            {
-                                "name": column_name,
-                                "friendly_name": column_name,
-                                "type": TYPES_MAP.get(
-                                    type(row[key][inner_key]), TYPE_STRING
-                                ),
-                            }
-                        )
-
-                    parsed_row[column_name] = row[key][inner_key]
-
-            else:
-                if _get_column_by_name(columns, key) is None:
-                    columns.append(
-                        {
-                            "name": key,
-                            "friendly_name": key,
-                            "type": TYPES_MAP.get(type(row[key]), TYPE_STRING),
-                        }
-                    )
-
-                parsed_row[key] = row[key]
-
-        rows.append(parsed_row)
-    return rows, columns
+    return flatten_documents(results, types_map=TYPES_MAP)
 
 
 class Couchbase(BaseQueryRunner):
@@ -94,7 +94,6 @@ class Databricks(BaseSQLQueryRunner):
             cursor.execute(query)
 
             if cursor.description is not None:
-                data = cursor.fetchall()
                 columns = self.fetch_columns(
                     [
                         (i[0], TYPES_MAP.get(i[1], TYPE_STRING))
@@ -102,12 +101,7 @@ class Databricks(BaseSQLQueryRunner):
                     ]
                 )
 
-                rows = [
-                    dict(zip((column["name"] for column in columns), row))
-                    for row in data
-                ]
-
-                data = {"columns": columns, "rows": rows}
+                data = self.fetch_result(cursor, columns)
                 json_data = json_dumps(data)
                 error = None
             else:
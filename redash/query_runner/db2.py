@@ -117,12 +117,7 @@ class DB2(BaseSQLQueryRunner):
                 columns = self.fetch_columns(
                     [(i[0], types_map.get(i[1], None)) for i in cursor.description]
                 )
-                rows = [
-                    dict(zip((column["name"] for column in columns), row))
-                    for row in cursor
-                ]
-
-                data = {"columns": columns, "rows": rows}
+                data = self.fetch_result(cursor, columns)
                 error = None
                 json_data = json_dumps(data)
             else:
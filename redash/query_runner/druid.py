@@ -52,11 +52,7 @@ class Druid(BaseQueryRunner):
             columns = self.fetch_columns(
                 [(i[0], TYPES_MAP.get(i[1], None)) for i in cursor.description]
             )
-            rows = [
-                dict(zip((column["name"] for column in columns), row)) for row in cursor
-            ]
-
-            data = {"columns": columns, "rows": rows}
+            data = self.fetch_result(cursor, columns)
             error = None
             json_data = json_dumps(data)
             print(json_data)
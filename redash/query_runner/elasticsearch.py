@@ -1,14 +1,16 @@
 import logging
 import sys
+import threading
+import time
 import urllib.request
 import urllib.parse
-import urllib.error
 
 import requests
 from requests.auth import HTTPBasicAuth
 
 from redash.query_runner import *
 from redash.utils import json_dumps, json_loads
+from redash.utils.requests_session import get_session
 
 try:
     import http.client as http_client
@@ -32,6 +34,17 @@ ELASTICSEARCH_TYPES_MAPPING = {
 
 ELASTICSEARCH_BUILTIN_FIELDS_MAPPING = {"_id": "Id", "_score": "Score"}
 
+# How long the mappings of an index are reused before being fetched again.
+MAPPINGS_CACHE_TTL = 300
+
+# How long Elasticsearch keeps a scroll context alive between two pages.
+SCROLL_KEEP_ALIVE = "1m"
+
+DEFAULT_PAGE_SIZE = 1000
+
+_mappings_cache = {}
+_mappings_cache_lock = threading.Lock()
+
 PYTHON_TYPES_MAPPING = {
     str: TYPE_STRING,
     bytes: TYPE_STRING,
@@ -86,6 +99,8 @@ class BaseElasticSearch(BaseQueryRunner):
         if self.server_url[-1] == "/":
             self.server_url = self.server_url[:-1]
 
+        self.session = get_session(self.server_url)
+
         basic_auth_user = self.configuration.get("basic_auth_user", None)
         basic_auth_password = self.configuration.get("basic_auth_password", None)
         self.auth = None
@@ -96,7 +111,7 @@ class BaseElasticSearch(BaseQueryRunner):
         mappings = {}
         error = None
         try:
-            r = requests.get(url, auth=self.auth)
+            r = self.session.get(url, auth=self.auth)
             r.raise_for_status()
 
             mappings = r.json()
@@ -114,6 +129,31 @@ class BaseElasticSearch(BaseQueryRunner):
         return mappings, error
 
     def _get_query_mappings(self, url):
+        """Returns the field types of the mapping at `url`, cached for
+        MAPPINGS_CACHE_TTL seconds. A copy is returned as `_parse_results` adds
+        the types of aggregated values to it."""
+        # Users of different credentials may not see the same indexes.
+        key = (
+            url,
+            self.configuration.get("basic_auth_user"),
+            self.configuration.get("basic_auth_password"),
+        )
+        with _mappings_cache_lock:
+            cached = _mappings_cache.get(key)
+
+        if cached is not None and cached[0] > time.time():
+            return dict(cached[1]), None
+
+        mappings, error = self._fetch_query_mappings(url)
+        if error:
+            return mappings, error
+
+        with _mappings_cache_lock:
+            _mappings_cache[key] = (time.time() + MAPPINGS_CACHE_TTL, mappings)
+
+        return dict(mappings), None
+
+    def _fetch_query_mappings(self, url):
         mappings_data, error = self._get_mappings(url)
         if error:
             return mappings_data, error
@@ -339,9 +379,132 @@ class BaseElasticSearch(BaseQueryRunner):
                 "Redash failed to parse the results it got from Elasticsearch."
             )
 
+    def _search(self, url, body=None, params=None):
+        r = self.session.get(url, params=params, json=body, auth=self.auth)
+        r.raise_for_status()
+        return r.json()
+
+    def _single_page(self, url, body):
+        yield self._search(url, body)
+
+    def _scroll(self, url, params, body, limit):
+        """Yields pages of search results from the scroll API until `limit` hits
+        were returned, so the cost of a page doesn't grow with its depth."""
+        scroll_url = "{0}/_search/scroll".format(self.server_url)
+        params = dict(params or {}, scroll=SCROLL_KEEP_ALIVE)
+        raw_result = self._search(url, body, params)
+        scroll_id = raw_result.get("_scroll_id")
+        returned = 0
+
+        try:
+            while True:
+                hits = raw_result.get("hits", {}).get("hits", [])
+                yield raw_result
+
+                returned += len(hits)
+                if not hits or not scroll_id or returned >= limit:
+                    break
+
+                r = self.session.post(
+                    scroll_url,
+                    json={"scroll": SCROLL_KEEP_ALIVE, "scroll_id": scroll_id},
+                    auth=self.auth,
+                )
+                r.raise_for_status()
+                raw_result = r.json()
+                scroll_id = raw_result.get("_scroll_id", scroll_id)
+        finally:
+            if scroll_id:
+                self._clear_scroll(scroll_url, scroll_id)
+
+    def _clear_scroll(self, scroll_url, scroll_id):
+        try:
+            self.session.delete(
+                scroll_url, json={"scroll_id": [scroll_id]}, auth=self.auth
+            )
+        except requests.exceptions.RequestException as e:
+            # The scroll context expires by itself after SCROLL_KEEP_ALIVE.
+            logger.warning("Failed to clear scroll: %s", e)
+
+    def _open_point_in_time(self, index_name):
+        """Opens a point in time of the index, or returns None when the server
+        doesn't support them (before Elasticsearch 7.10)."""
+        try:
+            r = self.session.post(
+                "{0}/{1}/_pit".format(self.server_url, index_name),
+                params={"keep_alive": SCROLL_KEEP_ALIVE},
+                auth=self.auth,
+            )
+            r.raise_for_status()
+        except requests.HTTPError as e:
+            logger.info("Point in time not available, scrolling instead: %s", e)
+            return None
+        return r.json()["id"]
+
+    def _close_point_in_time(self, pit_id):
+        try:
+            self.session.delete(
+                "{0}/_pit".format(self.server_url), json={"id": pit_id}, auth=self.auth
+            )
+        except requests.exceptions.RequestException as e:
+            # The point in time expires by itself after SCROLL_KEEP_ALIVE.
+            logger.warning("Failed to close point in time: %s", e)
+
+    def _search_after(self, url, body, limit, pit_id=None):
+        """Yields pages of results of a sorted search, each page continuing after
+        the sort values of the last hit of the previous one.
+
+        With a point in time, every page searches the same view of the index,
+        and Elasticsearch breaks ties between hits with its _shard_doc sort,
+        so hits with equal sort values aren't skipped or repeated."""
+        page_size = int(body.get("size", DEFAULT_PAGE_SIZE))
+        search_after = body.get("search_after")
+        returned = 0
+
+        try:
+            while returned < limit:
+                page = dict(body, size=min(page_size, limit - returned))
+                if search_after is not None:
+                    page["search_after"] = search_after
+                if pit_id is not None:
+                    page["pit"] = {"id": pit_id, "keep_alive": SCROLL_KEEP_ALIVE}
+
+                raw_result = self._search(url, page)
+                pit_id = raw_result.get("pit_id", pit_id)
+                hits = raw_result.get("hits", {}).get("hits", [])
+                yield raw_result
+
+                returned += len(hits)
+                if len(hits) < page["size"]:
+                    break
+                search_after = hits[-1]["sort"]
+        finally:
+            if pit_id is not None:
+                self._close_point_in_time(pit_id)
+
+    def _parse_pages(self, pages, mappings, result_fields, limit=None):
+        """Converts each page of results to rows as it arrives, so only one raw
+        page is held in memory at a time."""
+        result_columns = []
+        result_rows = []
+
+        try:
+            for raw_result in pages:
+                hits = raw_result.get("hits", {}).get("hits")
+                if limit is not None and hits is not None:
+                    del hits[max(limit - len(result_rows), 0) :]
+
+                self._parse_results(
+                    mappings, result_fields, raw_result, result_columns, result_rows
+                )
+        finally:
+            pages.close()
+
+        return result_columns, result_rows
+
     def test_connection(self):
         try:
-            r = requests.get(
+            r = self.session.get(
                 "{0}/_cluster/health".format(self.server_url), auth=self.auth
             )
             r.raise_for_status()
@@ -362,25 +525,6 @@ class Kibana(BaseElasticSearch):
     def enabled(cls):
         return True
 
-    def _execute_simple_query(
-        self, url, auth, _from, mappings, result_fields, result_columns, result_rows
-    ):
-        url += "&from={0}".format(_from)
-        r = requests.get(url, auth=self.auth)
-        r.raise_for_status()
-
-        raw_result = r.json()
-
-        self._parse_results(
-            mappings, result_fields, raw_result, result_columns, result_rows
-        )
-
-        total = raw_result["hits"]["total"]
-        result_size = len(raw_result["hits"]["hits"])
-        logger.debug("Result Size: {0}  Total: {1}".format(result_size, total))
-
-        return raw_result["hits"]["total"]
-
     def run_query(self, query, user):
         try:
             error = None
@@ -399,48 +543,36 @@ class Kibana(BaseElasticSearch):
                 error = "Missing configuration key 'server'"
                 return None, error
 
-            url = "{0}/{1}/_search?".format(self.server_url, index_name)
+            url = "{0}/{1}/_search".format(self.server_url, index_name)
             mapping_url = "{0}/{1}/_mapping".format(self.server_url, index_name)
 
             mappings, error = self._get_query_mappings(mapping_url)
             if error:
                 return None, error
 
-            if sort:
-                url += "&sort={0}".format(urllib.parse.quote_plus(sort))
+            if not isinstance(query_data, str):
+                # TODO: Handle complete ElasticSearch queries (JSON based sent over HTTP POST)
+                raise Exception("Advanced queries are not supported")
 
-            url += "&q={0}".format(urllib.parse.quote_plus(query_data))
+            params = {"q": query_data, "size": min(size, limit)}
+            if sort:
+                params["sort"] = sort
 
             logger.debug("Using URL: {0}".format(url))
             logger.debug("Using Query: {0}".format(query_data))
 
-            result_columns = []
-            result_rows = []
-            if isinstance(query_data, str):
-                _from = 0
-                while True:
-                    query_size = size if limit >= (_from + size) else (limit - _from)
-                    total = self._execute_simple_query(
-                        url + "&size={0}".format(query_size),
-                        self.auth,
-                        _from,
-                        mappings,
-                        result_fields,
-                        result_columns,
-                        result_rows,
-                    )
-                    _from += size
-                    if _from >= limit:
-                        break
-            else:
-                # TODO: Handle complete ElasticSearch queries (JSON based sent over HTTP POST)
-                raise Exception("Advanced queries are not supported")
+            result_columns, result_rows = self._parse_pages(
+                self._scroll(url, params, None, limit),
+                mappings,
+                result_fields,
+                limit,
+            )
 
             json_data = json_dumps({"columns": result_columns, "rows": result_rows})
         except requests.HTTPError as e:
             logger.exception(e)
             error = "Failed to execute query. Return Code: {0}   Reason: {1}".format(
-                r.status_code, r.text
+                e.response.status_code, e.response.text
             )
             json_data = None
         except requests.exceptions.RequestException as e:
@@ -469,6 +601,7 @@ class ElasticSearch(BaseElasticSearch):
 
             index_name = query_dict.pop("index", "")
             result_fields = query_dict.pop("result_fields", None)
+            limit = query_dict.pop("limit", None)
 
             if not self.server_url:
                 error = "Missing configuration key 'server'"
@@ -483,14 +616,29 @@ class ElasticSearch(BaseElasticSearch):
 
             logger.debug("Using URL: %s", url)
             logger.debug("Using query: %s", query_dict)
-            r = requests.get(url, json=query_dict, auth=self.auth)
-            r.raise_for_status()
-            logger.debug("Result: %s", r.json())
 
-            result_columns = []
-            result_rows = []
-            self._parse_results(
-                mappings, result_fields, r.json(), result_columns, result_rows
+            # With a "limit", hits are paged past the size of a single search:
+            # after the last sort values of a point in time when the query is
+            # sorted and the server supports them, through the scroll API
+            # otherwise. Queries continuing from their own search_after are
+            # paged from there.
+            if limit is None or self._is_single_page_query(query_dict):
+                pages = self._single_page(url, query_dict)
+                limit = None
+            elif "search_after" in query_dict:
+                limit = int(limit)
+                pages = self._search_after(url, query_dict, limit)
+            else:
+                limit = int(limit)
+                pit_id = "sort" in query_dict and self._open_point_in_time(index_name)
+                if pit_id:
+                    pit_url = "{0}/_search".format(self.server_url)
+                    pages = self._search_after(pit_url, query_dict, limit, pit_id)
+                else:
+                    pages = self._scroll(url, None, query_dict, limit)
+
+            result_columns, result_rows = self._parse_pages(
+                pages, mappings, result_fields, limit
             )
 
             json_data = json_dumps({"columns": result_columns, "rows": result_rows})
@@ -500,7 +648,7 @@ class ElasticSearch(BaseElasticSearch):
         except requests.HTTPError as e:
             logger.exception(e)
             error = "Failed to execute query. Return Code: {0}   Reason: {1}".format(
-                r.status_code, r.text
+                e.response.status_code, e.response.text
             )
             json_data = None
         except requests.exceptions.RequestException as e:
@@ -510,6 +658,14 @@ class ElasticSearch(BaseElasticSearch):
 
         return json_data, error
 
+    @staticmethod
+    def _is_single_page_query(query_dict):
+        # Aggregations come back whole with the first page, and neither paging
+        # method can be combined with an explicit offset.
+        return any(
+            key in query_dict for key in ("aggs", "aggregations", "from", "scroll")
+        )
+
 
 register(Kibana)
 register(ElasticSearch)
@@ -0,0 +1,81 @@
+import datetime
+
+from redash.query_runner import (
+    TYPE_BOOLEAN,
+    TYPE_DATETIME,
+    TYPE_FLOAT,
+    TYPE_INTEGER,
+    TYPE_STRING,
+)
+
+TYPES_MAP = {
+    str: TYPE_STRING,
+    bytes: TYPE_STRING,
+    int: TYPE_INTEGER,
+    float: TYPE_FLOAT,
+    bool: TYPE_BOOLEAN,
+    datetime.datetime: TYPE_DATETIME,
+}
+
+
+class DocumentFlattener(object):
+    """Flattens nested documents (dicts) into rows with dotted column names.
+
+    Nested dicts are flattened up to `max_depth` levels: with the default of 1,
+    `{"a": {"b": {"c": 1}}}` becomes `{"a.b": {"c": 1}}`, with 2 it becomes
+    `{"a.b.c": 1}` and with 0 documents are returned as they are.
+
+    Columns are kept in the order they were first seen, and their type is
+    guessed from the first value seen. They are indexed by name, so flattening
+    is linear in the total number of values regardless of how many columns
+    there are.
+
+    When `fields` is given only those are returned; a field also selects
+    everything nested under it (e.g. "a" selects "a.b" and "a.c").
+    """
+
+    def __init__(self, max_depth=1, fields=None, types_map=None):
+        self.max_depth = max_depth
+        self.fields = set(fields) if fields else None
+        self.types_map = types_map or TYPES_MAP
+        self.columns = []
+        self._columns_by_name = {}
+
+    def get_column(self, name):
+        return self._columns_by_name.get(name)
+
+    def add_column(self, name, value):
+        if name not in self._columns_by_name:
+            column = {
+                "name": name,
+                "friendly_name": name,
+                "type": self.types_map.get(type(value), TYPE_STRING),
+            }
+            self._columns_by_name[name] = column
+            self.columns.append(column)
+
+    def flatten(self, document):
+        row = {}
+        self._flatten(document, None, 0, self.fields is None, row)
+        return row
+
+    def flatten_all(self, documents):
+        return [self.flatten(document) for document in documents]
+
+    def _flatten(self, document, prefix, depth, selected, row):
+        for key, value in document.items():
+            name = key if prefix is None else "{}.{}".format(prefix, key)
+            is_selected = selected or name in self.fields
+
+            if isinstance(value, dict) and depth < self.max_depth:
+                self._flatten(value, name, depth + 1, is_selected, row)
+            elif is_selected:
+                self.add_column(name, value)
+                row[name] = value
+
+
+def flatten_documents(documents, max_depth=1, fields=None, types_map=None):
+    """Returns the rows and columns of the given documents, see DocumentFlattener."""
+    flattener = DocumentFlattener(max_depth, fields, types_map)
+    rows = flattener.flatten_all(documents)
+    return rows, flattener.columns
@@ -122,13 +122,10 @@ class Hive(BaseSQLQueryRunner):
 
             cursor.execute(query)
 
-            column_names = []
             columns = []
 
             for column in cursor.description:
                 column_name = column[COLUMN_NAME]
-                column_names.append(column_name)
-
                 columns.append(
                     {
                         "name": column_name,
@@ -137,9 +134,7 @@ class Hive(BaseSQLQueryRunner):
                     }
                 )
 
-            rows = [dict(zip(column_names, row)) for row in cursor]
-
-            data = {"columns": columns, "rows": rows}
+            data = self.fetch_result(cursor, columns)
             json_data = json_dumps(data)
             error = None
         except (KeyboardInterrupt, JobTimeoutException):
@@ -101,13 +101,10 @@ class Impala(BaseSQLQueryRunner):
 
             cursor.execute(query)
 
-            column_names = []
             columns = []
 
             for column in cursor.description:
                 column_name = column[COLUMN_NAME]
-                column_names.append(column_name)
-
                 columns.append(
                     {
                         "name": column_name,
@@ -116,9 +113,7 @@ class Impala(BaseSQLQueryRunner):
                     }
                 )
 
-            rows = [dict(zip(column_names, row)) for row in cursor]
-
-            data = {"columns": columns, "rows": rows}
+            data = self.fetch_result(cursor, columns)
             json_data = json_dumps(data)
             error = None
             cursor.close()
@@ -1,19 +1,10 @@
 import logging
 import yaml
-import datetime
 from funcy import compact, project
 from redash import settings
 from redash.utils import json_dumps
-from redash.query_runner import (
-    BaseHTTPQueryRunner,
-    register,
-    TYPE_BOOLEAN,
-    TYPE_DATETIME,
-    TYPE_FLOAT,
-    TYPE_INTEGER,
-    TYPE_STRING,
-    is_private_address,
-)
+from redash.query_runner import BaseHTTPQueryRunner, register, is_private_address
+from redash.query_runner.flatten import flatten_documents
 
 
 class QueryParseError(Exception):
@@ -34,35 +25,6 @@ def parse_query(query):
         raise QueryParseError(error)
 
 
-TYPES_MAP = {
-    str: TYPE_STRING,
-    bytes: TYPE_STRING,
-    int: TYPE_INTEGER,
-    float: TYPE_FLOAT,
-    bool: TYPE_BOOLEAN,
-    datetime.datetime: TYPE_DATETIME,
-}
-
-
-def _get_column_by_name(columns, column_name):
-    for c in columns:
-        if "name" in c and c["name"] == column_name:
-            return c
-
-    return None
-
-
-def _get_type(value):
-    return TYPES_MAP.get(type(value), TYPE_STRING)
-
-
-def add_column(columns, column_name, column_type):
-    if _get_column_by_name(columns, column_name) is None:
-        columns.append(
-            {"name": column_name, "friendly_name": column_name, "type": column_type}
-        )
-
-
 def _apply_path_search(response, path):
     if path is None:
         return response
@@ -90,41 +52,16 @@ def _normalize_json(data, path):
 
 def _sort_columns_with_fields(columns, fields):
     if fields:
-        columns = compact([_get_column_by_name(columns, field) for field in fields])
+        columns_by_name = {column["name"]: column for column in columns}
+        columns = compact([columns_by_name.get(field) for field in fields])
 
     return columns
 
 
-# TODO: merge the logic here with the one in MongoDB's queyr runner
-def parse_json(data, path, fields):
+def parse_json(data, path, fields, max_depth=1):
     data = _normalize_json(data, path)
 
-    rows = []
-    columns = []
-
-    for row in data:
-        parsed_row = {}
-
-        for key in row:
-            if isinstance(row[key], dict):
-                for inner_key in row[key]:
-                    column_name = "{}.{}".format(key, inner_key)
-                    if fields and key not in fields and column_name not in fields:
-                        continue
-
-                    value = row[key][inner_key]
-                    add_column(columns, column_name, _get_type(value))
-                    parsed_row[column_name] = value
-            else:
-                if fields and key not in fields:
-                    continue
-
-                value = row[key]
-                add_column(columns, key, _get_type(value))
-                parsed_row[key] = row[key]
-
-        rows.append(parsed_row)
-
+    rows, columns = flatten_documents(data, max_depth=max_depth, fields=fields)
     columns = _sort_columns_with_fields(columns, fields)
 
     return {"rows": rows, "columns": columns}
@@ -171,6 +108,7 @@ class JSON(BaseHTTPQueryRunner):
 
         fields = query.get("fields")
         path = query.get("path")
+        flatten_depth = query.get("flatten_depth", 1)
 
         if isinstance(request_options.get("auth", None), list):
             request_options["auth"] = tuple(request_options["auth"])
@@ -193,7 +131,7 @@ class JSON(BaseHTTPQueryRunner):
         if error is not None:
             return None, error
 
-        data = json_dumps(parse_json(response.json(), path, fields))
+        data = json_dumps(parse_json(response.json(), path, fields, flatten_depth))
 
         if data:
             return data, None
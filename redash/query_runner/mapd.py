@@ -73,10 +73,7 @@ class Mapd(BaseSQLQueryRunner):
             columns = self.fetch_columns(
                 [(i[0], TYPES_MAP.get(i[1], None)) for i in cursor.description]
             )
-            rows = [
-                dict(zip((column["name"] for column in columns), row)) for row in cursor
-            ]
-            data = {"columns": columns, "rows": rows}
+            data = self.fetch_result(cursor, columns)
             error = None
             json_data = json_dumps(data)
         finally:
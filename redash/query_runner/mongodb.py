@@ -1,10 +1,12 @@
 import datetime
+import itertools
 import logging
 import re
 
 from dateutil.parser import parse
 
 from redash.query_runner import *
+from redash.query_runner.flatten import flatten_documents
 from redash.utils import JSONEncoder, json_dumps, json_loads, parse_human_time
 
 logger = logging.getLogger(__name__)
@@ -75,53 +77,8 @@ def parse_query_json(query):
     return query_data
 
 
-def _get_column_by_name(columns, column_name):
-    for c in columns:
-        if "name" in c and c["name"] == column_name:
-            return c
-
-    return None
-
-
-def parse_results(results):
-    rows = []
-    columns = []
-
-    for row in results:
-        parsed_row = {}
-
-        for key in row:
-            if isinstance(row[key], dict):
-                for inner_key in row[key]:
-                    column_name = "{}.{}".format(key, inner_key)
-                    if _get_column_by_name(columns, column_name) is None:
-                        columns.append(
-                            {
-                                "name": column_name,
-                                "friendly_name": column_name,
-                                "type": TYPES_MAP.get(
-                                    type(row[key][inner_key]), TYPE_STRING
-                                ),
-                            }
-                        )
-
-                    parsed_row[column_name] = row[key][inner_key]
-
-            else:
-                if _get_column_by_name(columns, key) is None:
-                    columns.append(
-                        {
-                            "name": key,
-                            "friendly_name": key,
-                            "type": TYPES_MAP.get(type(row[key]), TYPE_STRING),
-                        }
-                    )
-
-                parsed_row[key] = row[key]
-
-        rows.append(parsed_row)
-
-    return rows, columns
+def parse_results(results, max_depth=1):
+    return flatten_documents(results, max_depth=max_depth, types_map=TYPES_MAP)
 
 
 class MongoDB(BaseQueryRunner):
@@ -146,8 +103,22 @@ class MongoDB(BaseQueryRunner):
                     ],
                     "title": "Replica Set Read Preference",
                 },
+                "batchSize": {
+                    "type": "number",
+                    "title": "Cursor Batch Size",
+                    "default": 1000,
+                },
+                "maxTimeMS": {
+                    "type": "number",
+                    "title": "Server-side Query Timeout (ms)",
+                },
+                "maxRows": {
+                    "type": "number",
+                    "title": "Maximum Number of Rows to Read",
+                },
             },
             "required": ["connectionString", "dbName"],
+            "extra_options": ["batchSize", "maxTimeMS", "maxRows"],
         }
 
     @classmethod
@@ -182,12 +153,33 @@ class MongoDB(BaseQueryRunner):
 
         return db_connection[self.db_name]
 
+    def _cursor_options(self, query_data):
+        """batchSize, maxTimeMS and maxRows of a query. The query's own batchSize
+        and maxTimeMS take precedence over the data source's, while its maxRows
+        can only lower the data source's."""
+        options = {}
+        for option in ("batchSize", "maxTimeMS"):
+            value = query_data.get(option, self.configuration.get(option))
+            if value:
+                options[option] = int(value)
+
+        max_rows = [
+            int(value)
+            for value in (query_data.get("maxRows"), self.configuration.get("maxRows"))
+            if value and int(value) > 0
+        ]
+        if max_rows:
+            options["maxRows"] = min(max_rows)
+
+        return options
+
     def test_connection(self):
         db = self._get_db()
-        if not db.command("connectionStatus")["ok"]:
-            raise Exception("MongoDB connection error")
-
-        return db
+        try:
+            if not db.command("connectionStatus")["ok"]:
+                raise Exception("MongoDB connection error")
+        finally:
+            db.client.close()
 
     def _merge_property_names(self, columns, document):
         for property in document:
@@ -229,20 +221,30 @@ class MongoDB(BaseQueryRunner):
     def get_schema(self, get_stats=False):
         schema = {}
         db = self._get_db()
-        for collection_name in db.collection_names():
-            if collection_name.startswith("system."):
-                continue
-            columns = self._get_collection_fields(db, collection_name)
-            schema[collection_name] = {
-                "name": collection_name,
-                "columns": sorted(columns),
-            }
+        try:
+            for collection_name in db.collection_names():
+                if collection_name.startswith("system."):
+                    continue
+                columns = self._get_collection_fields(db, collection_name)
+                schema[collection_name] = {
+                    "name": collection_name,
+                    "columns": sorted(columns),
+                }
+        finally:
+            db.client.close()
 
         return list(schema.values())
 
     def run_query(self, query, user):
+        # Each query runs in its own forked work horse, so the client's
+        # connection pool is of no use past it.
         db = self._get_db()
+        try:
+            return self._run_query(db, query)
+        finally:
+            db.client.close()
 
+    def _run_query(self, db, query):
         logger.debug(
             "mongodb connection string: %s", self.configuration["connectionString"]
         )
@@ -282,60 +284,98 @@ class MongoDB(BaseQueryRunner):
 
         columns = []
         rows = []
+        truncated = False
 
-        cursor = None
-        if q or (not q and not aggregate):
-            if s:
-                cursor = db[collection].find(q, f).sort(s)
-            else:
-                cursor = db[collection].find(q, f)
+        cursor_options = self._cursor_options(query_data)
+        batch_size = cursor_options.get("batchSize")
+        max_time_ms = cursor_options.get("maxTimeMS")
+        max_rows = cursor_options.get("maxRows")
 
-            if "skip" in query_data:
-                cursor = cursor.skip(query_data["skip"])
-
-            if "limit" in query_data:
-                cursor = cursor.limit(query_data["limit"])
+        cursor = None
+        try:
+            if q or (not q and not aggregate):
+                if s:
+                    cursor = db[collection].find(q, f).sort(s)
+                else:
+                    cursor = db[collection].find(q, f)
+
+                if "skip" in query_data:
+                    cursor = cursor.skip(query_data["skip"])
+
+                limit = query_data.get("limit")
+                if max_rows and (not limit or limit > max_rows):
+                    # One document past maxRows tells whether it truncated the result.
+                    limit = max_rows + 1
+
+                if limit:
+                    cursor = cursor.limit(limit)
+
+                if batch_size:
+                    cursor = cursor.batch_size(batch_size)
+
+                if max_time_ms:
+                    cursor = cursor.max_time_ms(max_time_ms)
+
+                if "count" in query_data:
+                    cursor = cursor.count()
+
+            elif aggregate:
+                kwargs = {"allowDiskUse": query_data.get("allowDiskUse", False)}
+                if batch_size:
+                    kwargs["batchSize"] = batch_size
+                if max_time_ms:
+                    kwargs["maxTimeMS"] = max_time_ms
+
+                r = db[collection].aggregate(aggregate, **kwargs)
+
+                # Backwards compatibility with older pymongo versions.
+                #
+                # Older pymongo version would return a dictionary from an aggregate command.
+                # The dict would contain a "result" key which would hold the cursor.
+                # Newer ones return pymongo.command_cursor.CommandCursor.
+                if isinstance(r, dict):
+                    cursor = r["result"]
+                else:
+                    cursor = r
 
             if "count" in query_data:
-                cursor = cursor.count()
-
-        elif aggregate:
-            allow_disk_use = query_data.get("allowDiskUse", False)
-            r = db[collection].aggregate(aggregate, allowDiskUse=allow_disk_use)
-
-            # Backwards compatibility with older pymongo versions.
-            #
-            # Older pymongo version would return a dictionary from an aggregate command.
-            # The dict would contain a "result" key which would hold the cursor.
-            # Newer ones return pymongo.command_cursor.CommandCursor.
-            if isinstance(r, dict):
-                cursor = r["result"]
-            else:
-                cursor = r
+                columns.append(
+                    {"name": "count", "friendly_name": "count", "type": TYPE_INTEGER}
+                )
 
-        if "count" in query_data:
-            columns.append(
-                {"name": "count", "friendly_name": "count", "type": TYPE_INTEGER}
-            )
-
-            rows.append({"count": cursor})
-        else:
-            rows, columns = parse_results(cursor)
+                rows.append({"count": cursor})
+            else:
+                # Documents are flattened as the cursor fetches them batch by batch;
+                # with maxRows set, reading stops (and the cursor is closed) once
+                # that many documents were read, and one more if there's any.
+                documents = iter(cursor)
+                rows, columns = parse_results(
+                    itertools.islice(documents, max_rows) if max_rows else documents,
+                    max_depth=query_data.get("flattenDepth", 1),
+                )
+
+                if max_rows and next(documents, None) is not None:
+                    logger.warning(
+                        "MongoDB query result was truncated to %d rows.", max_rows
+                    )
+                    truncated = True
+        except pymongo.errors.ExecutionTimeout:
+            return None, "Query exceeded the server-side time limit (maxTimeMS)."
+        finally:
+            if hasattr(cursor, "close"):
+                cursor.close()
 
         if f:
-            ordered_columns = []
-            for k in sorted(f, key=f.get):
-                column = _get_column_by_name(columns, k)
-                if column:
-                    ordered_columns.append(column)
-
-            columns = ordered_columns
+            columns_by_name = {column["name"]: column for column in columns}
+            columns = [
+                columns_by_name[k] for k in sorted(f, key=f.get) if k in columns_by_name
+            ]
 
         if query_data.get("sortColumns"):
             reverse = query_data["sortColumns"] == "desc"
             columns = sorted(columns, key=lambda col: col["name"], reverse=reverse)
 
-        data = {"columns": columns, "rows": rows}
+        data = self.result_data(columns, rows, truncated)
         error = None
         json_data = json_dumps(data, cls=MongoDBJSONEncoder)
 
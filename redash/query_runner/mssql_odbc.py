@@ -125,18 +125,12 @@ class SQLServerODBC(BaseSQLQueryRunner):
             cursor = connection.cursor()
             logger.debug("SQLServerODBC running query: %s", query)
             cursor.execute(query)
-            data = cursor.fetchall()
 
             if cursor.description is not None:
                 columns = self.fetch_columns(
                     [(i[0], types_map.get(i[1], None)) for i in cursor.description]
                 )
-                rows = [
-                    dict(zip((column["name"] for column in columns), row))
-                    for row in data
-                ]
-
-                data = {"columns": columns, "rows": rows}
+                data = self.fetch_result(cursor, columns)
                 json_data = json_dumps(data)
                 error = None
             else:
@@ -18,12 +18,14 @@ from redash.utils import json_dumps, json_loads
 
 try:
     import MySQLdb
+    import MySQLdb.cursors
 
     enabled = True
 except ImportError:
     enabled = False
 
 logger = logging.getLogger(__name__)
+
 types_map = {
     0: TYPE_FLOAT,
     1: TYPE_INTEGER,
@@ -66,6 +68,10 @@ class Mysql(BaseSQLQueryRunner):
                 "passwd": {"type": "string", "title": "Password"},
                 "db": {"type": "string", "title": "Database name"},
                 "port": {"type": "number", "default": 3306},
+                "streaming": {
+                    "type": "boolean",
+                    "title": "Stream results from the server (unbuffered cursor)",
+                },
             },
             "order": ["host", "port", "user", "passwd", "db"],
             "required": ["db"],
@@ -151,6 +157,35 @@ class Mysql(BaseSQLQueryRunner):
 
         return list(schema.values())
 
+    def _get_table_size_estimates(self):
+        # table_rows is exact for MyISAM and an estimate for InnoDB; it's NULL for views.
+        query = """
+        SELECT t.table_schema as table_schema,
+               t.table_name as table_name,
+               t.table_rows as size
+        FROM `information_schema`.`tables` t
+        WHERE t.table_schema NOT IN ('information_schema', 'performance_schema', 'mysql', 'sys')
+        AND t.table_rows IS NOT NULL;
+        """
+
+        estimates = {}
+        for row in self._run_query_internal(query):
+            if row["table_schema"] != self.configuration["db"]:
+                table_name = "{}.{}".format(row["table_schema"], row["table_name"])
+            else:
+                table_name = row["table_name"]
+
+            estimates[table_name] = row["size"]
+
+        return estimates
+
+    def _count_table_row(self, table, timeout):
+        # MAX_EXECUTION_TIME is ignored by servers that don't support it.
+        res = self._run_query_internal(
+            "select /*+ MAX_EXECUTION_TIME(%d) */ count(*) as cnt from %s"
+            % (max(int(timeout * 1000), 1), table)
+        )
+        return res[0]["cnt"]
 
     def run_query(self, query, user):
         ev = threading.Event()
@@ -174,38 +209,61 @@ class Mysql(BaseSQLQueryRunner):
 
         return r.json_data, r.error
 
+    def _cursor(self, connection):
+        # An unbuffered cursor leaves the result on the server and reads it as
+        # it's fetched, instead of loading all of it in memory on execute.
+        if self.configuration.get("streaming"):
+            return connection.cursor(MySQLdb.cursors.SSCursor)
+
+        return connection.cursor()
+
+    def _fetch_result(self, cursor):
+        """Reads the current result set of the cursor, see fetch_rows. Returns
+        it and whether it was truncated."""
+        columns = self.fetch_columns(
+            [(i[0], types_map.get(i[1], None)) for i in cursor.description]
+        )
+        rows, truncated = self.fetch_rows(cursor, columns)
+        return self.result_data(columns, rows, truncated), truncated
+
     def _run_query(self, query, user, connection, r, ev):
+        cursor = None
         try:
-            cursor = connection.cursor()
+            cursor = self._cursor(connection)
             logger.debug("MySQL running query: %s", query)
             cursor.execute(query)
 
-            data = cursor.fetchall()
-            desc = cursor.description
+            # Only the last result set is returned, but each one has to be read
+            # before moving to the next with an unbuffered cursor. Moving on
+            # from a truncated one would read the rest of it, so reading stops
+            # there.
+            data = None
+            truncated = False
+            if cursor.description is not None:
+                data, truncated = self._fetch_result(cursor)
 
-            while cursor.nextset():
+            while not truncated and cursor.nextset():
                 if cursor.description is not None:
-                    data = cursor.fetchall()
-                    desc = cursor.description
+                    data, truncated = self._fetch_result(cursor)
 
             # TODO - very similar to pg.py
-            if desc is not None:
-                columns = self.fetch_columns(
-                    [(i[0], types_map.get(i[1], None)) for i in desc]
-                )
-                rows = [
-                    dict(zip((column["name"] for column in columns), row))
-                    for row in data
-                ]
-
-                data = {"columns": columns, "rows": rows}
+            if data is not None:
                 r.json_data = json_dumps(data)
                 r.error = None
             else:
                 r.json_data = None
                 r.error = "No data was returned."
 
-            cursor.close()
+            if truncated:
+                # Closing the cursor reads the rest of the results as well, so
+                # the server is told to drop them first.
+                self._cancel(connection.thread_id())
+                try:
+                    cursor.close()
+                except MySQLdb.Error:
+                    pass
+            else:
+                cursor.close()
         except MySQLdb.Error as e:
             if cursor:
                 cursor.close()
@@ -273,6 +331,10 @@ class RDSMySQL(Mysql):
                 "db": {"type": "string", "title": "Database name"},
                 "port": {"type": "number", "default": 3306},
                 "use_ssl": {"type": "boolean", "title": "Use SSL"},
+                "streaming": {
+                    "type": "boolean",
+                    "title": "Stream results from the server (unbuffered cursor)",
+                },
             },
             "order": ["host", "port", "user", "passwd", "db"],
             "required": ["db", "user", "passwd", "host"],
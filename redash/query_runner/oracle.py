@@ -152,8 +152,7 @@ class Oracle(BaseSQLQueryRunner):
                         for i in cursor.description
                     ]
                 )
-                rows = [dict(zip((c["name"] for c in columns), row)) for row in cursor]
-                data = {"columns": columns, "rows": rows}
+                data = self.fetch_result(cursor, columns)
                 error = None
                 json_data = json_dumps(data)
             else:
@@ -135,6 +135,27 @@ def _get_ssl_config(configuration):
 
 class PostgreSQL(BaseSQLQueryRunner):
     noop_query = "SELECT 1"
+    # Any DDL statement (create/alter/drop/rename of a table or column) writes new
+    # row versions to pg_class or pg_attribute, which changes their xmin values.
+    schema_version_query = """
+    SELECT (SELECT count(*) || ':' || sum(xmin::text::bigint) FROM pg_catalog.pg_class)
+           || '/' ||
+           (SELECT count(*) || ':' || sum(xmin::text::bigint) FROM pg_catalog.pg_attribute)
+           AS version
+    """
+    # reltuples is maintained by VACUUM/ANALYZE; it's -1 (PostgreSQL 14+) or 0 for
+    # tables that were never analyzed, so those are counted instead.
+    table_size_estimates_query = """
+    SELECT s.nspname as table_schema,
+           c.relname as table_name,
+           c.reltuples::bigint as size
+    FROM pg_class c
+    JOIN pg_namespace s
+    ON c.relnamespace = s.oid
+    AND s.nspname NOT IN ('pg_catalog', 'information_schema')
+    WHERE c.relkind IN ('r', 'm', 'p', 'f')
+    AND c.reltuples > 0
+    """
 
     @classmethod
     def configuration_schema(cls):
@@ -234,6 +255,29 @@ class PostgreSQL(BaseSQLQueryRunner):
 
         return list(schema.values())
 
+    def _get_table_size_estimates(self):
+        if self.table_size_estimates_query is None:
+            return {}
+
+        estimates = {}
+        for row in self._run_query_internal(self.table_size_estimates_query):
+            full_name = full_table_name(row["table_schema"], row["table_name"])
+            estimates[full_name] = row["size"]
+            # Tables in the public schema appear without the schema name.
+            if row["table_schema"] == "public":
+                estimates.setdefault(row["table_name"], row["size"])
+
+        return estimates
+
+    def _count_table_row(self, table, timeout):
+        # The connection is only used for this count, so the session setting
+        # doesn't leak into other queries.
+        res = self._run_query_internal(
+            "SET statement_timeout = %d; select count(*) as cnt from %s"
+            % (max(int(timeout * 1000), 1), table)
+        )
+        return res[0]["cnt"]
+
     def _get_connection(self):
         self.ssl_config = _get_ssl_config(self.configuration)
         connection = psycopg2.connect(
@@ -290,6 +334,15 @@ class PostgreSQL(BaseSQLQueryRunner):
 
 
 class Redshift(PostgreSQL):
+    # Redshift's catalog doesn't cover external (Spectrum) tables.
+    schema_version_query = None
+    table_size_estimates_query = """
+    SELECT "schema" as table_schema,
+           "table" as table_name,
+           estimated_visible_rows as size
+    FROM svv_table_info
+    WHERE estimated_visible_rows IS NOT NULL
+    """
 
     @classmethod
     def type(cls):
@@ -529,6 +582,9 @@ class RedshiftIAM(Redshift):
 
 
 class CockroachDB(PostgreSQL):
+    schema_version_query = None
+    table_size_estimates_query = None
+
     @classmethod
     def type(cls):
         return "cockroach"
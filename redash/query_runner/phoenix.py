@@ -99,11 +99,7 @@ class Phoenix(BaseQueryRunner):
                 (i[0], TYPES_MAPPING.get(i[1], None)) for i in cursor.description
             ]
             columns = self.fetch_columns(column_tuples)
-            rows = [
-                dict(zip(([column["name"] for column in columns]), r))
-                for i, r in enumerate(cursor.fetchall())
-            ]
-            data = {"columns": columns, "rows": rows}
+            data = self.fetch_result(cursor, columns)
             json_data = json_dumps(data)
             error = None
             cursor.close()
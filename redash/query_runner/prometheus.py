@@ -5,6 +5,7 @@ from dateutil import parser
 from urllib.parse import parse_qs
 from redash.query_runner import BaseQueryRunner, register, TYPE_DATETIME, TYPE_STRING
 from redash.utils import json_dumps
+from redash.utils.requests_session import get_session
 
 
 def get_instant_rows(metrics_data):
@@ -74,14 +75,17 @@ class Prometheus(BaseQueryRunner):
             "required": ["url"],
         }
 
+    def _get_session(self):
+        return get_session(self.configuration["url"])
+
     def test_connection(self):
-        resp = requests.get(self.configuration.get("url", None))
+        resp = self._get_session().get(self.configuration.get("url", None))
         return resp.ok
 
     def get_schema(self, get_stats=False):
         base_url = self.configuration["url"]
         metrics_path = "/api/v1/label/__name__/values"
-        response = requests.get(base_url + metrics_path)
+        response = self._get_session().get(base_url + metrics_path)
         response.raise_for_status()
         data = response.json()["data"]
 
@@ -136,7 +140,7 @@ class Prometheus(BaseQueryRunner):
 
             api_endpoint = base_url + "/api/v1/{}".format(query_type)
 
-            response = requests.get(api_endpoint, params=payload)
+            response = self._get_session().get(api_endpoint, params=payload)
             response.raise_for_status()
 
             metrics = response.json()["data"]["result"]
@@ -2,6 +2,7 @@ import datetime
 import importlib
 import logging
 import sys
+import time
 
 from redash.query_runner import *
 from redash.utils import json_dumps, json_loads
@@ -12,7 +13,6 @@ from RestrictedPython.Guards import safe_builtins, guarded_iter_unpack_sequence,
 
 logger = logging.getLogger(__name__)
 
-
 class CustomPrint(object):
     """CustomPrint redirect "print" calls to be sent as "log" on the result object."""
 
@@ -21,12 +21,14 @@ class CustomPrint(object):
         self.lines = []
 
     def write(self, text):
-        if self.enabled:
-            if text and text.strip():
-                log_line = "[{0}] {1}".format(
-                    datetime.datetime.utcnow().isoformat(), text
-                )
-                self.lines.append(log_line)
+        if text and text.strip():
+            self.log(text)
+
+    def log(self, text):
+        if not self.enabled:
+            return
+        log_line = "[{0}] {1}".format(datetime.datetime.utcnow().isoformat(), text)
+        self.lines.append(log_line)
 
     def enable(self):
         self.enabled = True
@@ -99,6 +101,7 @@ class Python(BaseQueryRunner):
         self._script_locals = {"result": {"rows": [], "columns": [], "log": []}}
         self._enable_print_log = True
         self._custom_print = CustomPrint()
+        self._calls = {}
 
         if self.configuration.get("allowedImportModules", None):
             for item in self.configuration["allowedImportModules"].split(","):
@@ -242,16 +245,57 @@ class Python(BaseQueryRunner):
     def get_current_user(self):
         return self._current_user.to_dict()
 
+    def _timed(self, name, func, memoize=False):
+        """Wraps a helper exposed to scripts to log how long each call took. With
+        `memoize`, repeated calls with the same (hashable) arguments during one
+        execution reuse the first call's result."""
+
+        def wrapper(*args, **kwargs):
+            started = time.time()
+            key = (name, args, tuple(sorted(kwargs.items())))
+            cacheable = memoize
+            try:
+                cached = cacheable and key in self._calls
+            except TypeError:
+                cacheable = cached = False
+
+            if cached:
+                result = self._calls[key]
+            else:
+                result = func(*args, **kwargs)
+                if cacheable:
+                    self._calls[key] = result
+
+            arguments = [repr(arg) for arg in args] + [
+                "{}={!r}".format(k, v) for k, v in sorted(kwargs.items())
+            ]
+            self._custom_print.log(
+                "{}({}) took {:.3f}s{}".format(
+                    name,
+                    ", ".join(arguments),
+                    time.time() - started,
+                    " (cached)" if cached else "",
+                )
+            )
+            return result
+
+        return wrapper
+
     def test_connection(self):
         pass
 
     def run_query(self, query, user):
         self._current_user = user
+        self._calls = {}
 
         try:
             error = None
 
+            started = time.time()
             code = compile_restricted(query, "<string>", "exec")
+            self._custom_print.log(
+                "Compiled script in {:.3f}s".format(time.time() - started)
+            )
 
             builtins = safe_builtins.copy()
             builtins["_write_"] = self.custom_write
@@ -272,10 +316,16 @@ class Python(BaseQueryRunner):
                 builtins[key] = __builtins__[key]
 
             restricted_globals = dict(__builtins__=builtins)
-            restricted_globals["get_query_result"] = self.get_query_result
+            restricted_globals["get_query_result"] = self._timed(
+                "get_query_result", self.get_query_result, memoize=True
+            )
             restricted_globals["get_source_schema"] = self.get_source_schema
             restricted_globals["get_current_user"] = self.get_current_user
-            restricted_globals["execute_query"] = self.execute_query
+            # Queries may have side effects or see the script's own writes, so
+            # each execute_query call runs the query again.
+            restricted_globals["execute_query"] = self._timed(
+                "execute_query", self.execute_query
+            )
             restricted_globals["add_result_column"] = self.add_result_column
             restricted_globals["add_result_row"] = self.add_result_row
             restricted_globals["disable_print_log"] = self._custom_print.disable
@@ -293,7 +343,11 @@ class Python(BaseQueryRunner):
             #       One option is to use ETA with Celery + timeouts on workers
             #       And replacement of worker process every X requests handled.
 
+            started = time.time()
             exec(code, restricted_globals, self._script_locals)
+            self._custom_print.log(
+                "Executed script in {:.3f}s".format(time.time() - started)
+            )
 
             result = self._script_locals["result"]
             result["log"] = self._custom_print.lines
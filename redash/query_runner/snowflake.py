@@ -82,12 +82,7 @@ class Snowflake(BaseQueryRunner):
         columns = self.fetch_columns(
             [(i[0], self.determine_type(i[1], i[5])) for i in cursor.description]
         )
-        rows = [
-            dict(zip((column["name"] for column in columns), row)) for row in cursor
-        ]
-
-        data = {"columns": columns, "rows": rows}
-        return data
+        return self.fetch_result(cursor, columns)
 
     def run_query(self, query, user):
         connection = self._get_connection()
@@ -100,13 +100,9 @@ class TreasureData(BaseQueryRunner):
             columns = self.fetch_columns(columns_tuples)
 
             if cursor.rowcount == 0:
-                rows = []
+                data = self.result_data(columns, [])
             else:
-                rows = [
-                    dict(zip(([column["name"] for column in columns]), r))
-                    for r in cursor.fetchall()
-                ]
-            data = {"columns": columns, "rows": rows}
+                data = self.fetch_result(cursor, columns)
             json_data = json_dumps(data)
             error = None
         except errors.InternalError as e:
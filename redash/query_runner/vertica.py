@@ -124,12 +124,7 @@ class Vertica(BaseSQLQueryRunner):
                 ]
 
                 columns = self.fetch_columns(columns_data)
-                rows = [
-                    dict(zip(([c["name"] for c in columns]), r))
-                    for r in cursor.fetchall()
-                ]
-
-                data = {"columns": columns, "rows": rows}
+                data = self.fetch_result(cursor, columns)
                 json_data = json_dumps(data)
                 error = None
             else:
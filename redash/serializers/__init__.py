@@ -8,6 +8,7 @@ from funcy import project
 from flask_login import current_user
 from rq.job import JobStatus
 from rq.timeouts import JobTimeoutException
+from sqlalchemy.orm import joinedload
 
 from redash import models
 from redash.permissions import has_access, view_only
@@ -58,10 +59,12 @@ def public_dashboard(dashboard):
         ("name", "layout", "dashboard_filters_enabled", "updated_at", "created_at"),
     )
 
-    widget_list = (
-        models.Widget.query.filter(models.Widget.dashboard_id == dashboard.id)
-        .outerjoin(models.Visualization)
-        .outerjoin(models.Query)
+    widget_list = models.Widget.query.filter(
+        models.Widget.dashboard_id == dashboard.id
+    ).options(
+        joinedload(models.Widget.visualization).joinedload(
+            models.Visualization.query_rel
+        )
     )
 
     dashboard_dict["widgets"] = [public_widget(w) for w in widget_list]
@@ -215,16 +218,42 @@ def serialize_alert(alert, full=True):
     return d
 
 
+def viewable_ids(objects, user):
+    """Returns the ids of the queries or query results `user` can view, checking
+    each data source only once and loading the groups of all of them in a
+    single query."""
+    objects = {obj.id: obj for obj in objects}
+    if user.is_api_user():
+        return {id for id, obj in objects.items() if has_access(obj, user, view_only)}
+
+    data_source_ids = {obj.data_source_id for obj in objects.values()} - {None}
+    groups = models.DataSource.groups_by_id(data_source_ids)
+    groups[None] = {}
+    access = {
+        data_source_id: has_access(data_source_groups, user, view_only)
+        for data_source_id, data_source_groups in groups.items()
+    }
+    return {id for id, obj in objects.items() if access[obj.data_source_id]}
+
+
 def serialize_dashboard(obj, with_widgets=False, user=None, with_favorite_state=True):
     layout = json_loads(obj.layout)
 
     widgets = []
 
     if with_widgets:
-        for w in obj.widgets:
+        dashboard_widgets = obj.load_widgets()
+        viewable_query_ids = set()
+        if user:
+            queries = [
+                w.visualization.query_rel for w in dashboard_widgets if w.visualization
+            ]
+            viewable_query_ids = viewable_ids(queries, user)
+
+        for w in dashboard_widgets:
             if w.visualization_id is None:
                 widgets.append(serialize_widget(w))
-            elif user and has_access(w.visualization.query_rel, user, view_only):
+            elif w.visualization.query_id in viewable_query_ids:
                 widgets.append(serialize_widget(w))
             else:
                 widget = project(
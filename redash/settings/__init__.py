@@ -54,13 +54,34 @@ QUERY_RESULTS_CLEANUP_COUNT = int(
 QUERY_RESULTS_CLEANUP_MAX_AGE = int(
     os.environ.get("REDASH_QUERY_RESULTS_CLEANUP_MAX_AGE", "7")
 )
+# Number of rows query runners read from a database cursor at a time.
+QUERY_RESULTS_FETCH_BATCH_SIZE = int(
+    os.environ.get("REDASH_QUERY_RESULTS_FETCH_BATCH_SIZE", "1000")
+)
+# Maximum number of rows query runners read from a cursor; 0 for no limit.
+QUERY_RESULTS_MAX_ROWS = int(os.environ.get("REDASH_QUERY_RESULTS_MAX_ROWS", "0"))
 
 SCHEMAS_REFRESH_SCHEDULE = int(os.environ.get("REDASH_SCHEMAS_REFRESH_SCHEDULE", 30))
 
+# How long (in seconds) to keep the option sets of query-backed dropdown parameters cached.
+# Entries are keyed by query result id, so a new result for the dropdown query is picked up immediately.
+PARAMETER_DROPDOWN_CACHE_TTL = int(
+    os.environ.get("REDASH_PARAMETER_DROPDOWN_CACHE_TTL", 60 * 60)
+)
+
 AUTH_TYPE = os.environ.get("REDASH_AUTH_TYPE", "api_key")
 INVITATION_TOKEN_MAX_AGE = int(
     os.environ.get("REDASH_INVITATION_TOKEN_MAX_AGE", 60 * 60 * 24 * 7)
 )
+# How long (in seconds) to keep the resolved permissions of a user in Redis. Entries are
+# keyed by the user's groups and dropped whenever groups change.
+USER_PERMISSIONS_CACHE_TTL = int(
+    os.environ.get("REDASH_USER_PERMISSIONS_CACHE_TTL", 60 * 60)
+)
+# How long (in seconds) to remember the user, dashboard or query an API key belongs to.
+API_KEY_PRINCIPAL_CACHE_TTL = int(
+    os.environ.get("REDASH_API_KEY_PRINCIPAL_CACHE_TTL", 60)
+)
 
 # The secret key to use in the Flask app for various cryptographic features
 SECRET_KEY = os.environ.get("REDASH_COOKIE_SECRET", "c292a0a3aa32397cdb050e233733900f")
@@ -409,6 +430,19 @@ DESTINATIONS = distinct(enabled_destinations + additional_destinations)
 EVENT_REPORTING_WEBHOOKS = array_from_string(
     os.environ.get("REDASH_EVENT_REPORTING_WEBHOOKS", "")
 )
+# Post all events of a flush to each webhook in a single request, with the
+# events listed in "data", instead of one request per event.
+EVENT_REPORTING_WEBHOOKS_BATCH = parse_boolean(
+    os.environ.get("REDASH_EVENT_REPORTING_WEBHOOKS_BATCH", "false")
+)
+# Events are buffered in Redis and written every EVENTS_FLUSH_INTERVAL seconds,
+# EVENTS_BATCH_SIZE at a time.
+EVENTS_FLUSH_INTERVAL = int(os.environ.get("REDASH_EVENTS_FLUSH_INTERVAL", "10"))
+EVENTS_BATCH_SIZE = int(os.environ.get("REDASH_EVENTS_BATCH_SIZE", "1000"))
+# Batches written by a single flush; whatever is left is written by the next one.
+EVENTS_MAX_BATCHES_PER_FLUSH = int(
+    os.environ.get("REDASH_EVENTS_MAX_BATCHES_PER_FLUSH", "20")
+)
 
 # Support for Sentry (https://getsentry.com/). Just set your Sentry DSN to enable it:
 SENTRY_DSN = os.environ.get("REDASH_SENTRY_DSN", "")
@@ -468,6 +502,10 @@ FEATURE_EXTENDED_ALERT_OPTIONS = parse_boolean(
 
 # BigQuery
 BIGQUERY_HTTP_TIMEOUT = int(os.environ.get("REDASH_BIGQUERY_HTTP_TIMEOUT", "600"))
+# How many pages of a BigQuery result are downloaded at the same time.
+BIGQUERY_RESULT_FETCH_CONCURRENCY = int(
+    os.environ.get("REDASH_BIGQUERY_RESULT_FETCH_CONCURRENCY", "4")
+)
 
 # Allow Parameters in Embeds
 # WARNING: Deprecated!
@@ -480,6 +518,23 @@ ALLOW_PARAMETERS_IN_EMBEDS = parse_boolean(
 SCHEMA_RUN_TABLE_SIZE_CALCULATIONS = parse_boolean(
     os.environ.get("REDASH_SCHEMA_RUN_TABLE_SIZE_CALCULATIONS", "false")
 )
+# Table sizes are cached separately from the schema and refreshed at most every
+# this many minutes.
+SCHEMA_TABLE_SIZE_REFRESH_INTERVAL = int(
+    os.environ.get("REDASH_SCHEMA_TABLE_SIZE_REFRESH_INTERVAL", 6 * 60)
+)
+# Number of exact `count(*)` queries to run in parallel for tables without a
+# catalog estimate, and the total time (in seconds) to spend on them.
+SCHEMA_TABLE_SIZE_CALCULATIONS_CONCURRENCY = int(
+    os.environ.get("REDASH_SCHEMA_TABLE_SIZE_CALCULATIONS_CONCURRENCY", 4)
+)
+SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT = int(
+    os.environ.get("REDASH_SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT", 300)
+)
+# Time (in seconds) a schema refresh job gets to fetch the schema. Its timeout is
+# this plus SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT, so the job isn't killed before
+# the table sizes it counted are stored.
+SCHEMA_REFRESH_TIMEOUT = int(os.environ.get("REDASH_SCHEMA_REFRESH_TIMEOUT", 180))
 
 # kylin
 KYLIN_OFFSET = int(os.environ.get("REDASH_KYLIN_OFFSET", 0))
@@ -498,3 +553,19 @@ SQLPARSE_FORMAT_OPTIONS = {
 REQUESTS_ALLOW_REDIRECTS = parse_boolean(
     os.environ.get("REDASH_REQUESTS_ALLOW_REDIRECTS", "false")
 )
+# Number of HTTP sessions (one per data source URL) each process keeps, the least
+# recently used one being dropped when there are more.
+REQUESTS_SESSIONS_CACHE_SIZE = int(
+    os.environ.get("REDASH_REQUESTS_SESSIONS_CACHE_SIZE", "100")
+)
+# Number of keep-alive connections each data source's HTTP session keeps per host.
+REQUESTS_POOL_MAXSIZE = int(os.environ.get("REDASH_REQUESTS_POOL_MAXSIZE", "10"))
+# Retries of failed connections, and of idempotent requests answered with 502, 503
+# or 504, waiting REQUESTS_RETRY_BACKOFF_FACTOR * 2 ** (retry - 1) seconds between
+# them.
+REQUESTS_MAX_RETRIES = int(os.environ.get("REDASH_REQUESTS_MAX_RETRIES", "2"))
+REQUESTS_RETRY_BACKOFF_FACTOR = float(
+    os.environ.get("REDASH_REQUESTS_RETRY_BACKOFF_FACTOR", "0.3")
+)
+# How long (in seconds) hostnames resolved for the private address check are cached.
+REQUESTS_DNS_CACHE_TTL = int(os.environ.get("REDASH_REQUESTS_DNS_CACHE_TTL", "60"))
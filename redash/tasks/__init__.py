@@ -1,4 +1,7 @@
 from .general import (
+    buffer_event,
+    flush_events,
+    cleanup_query_activity,
     record_event,
     version_check,
     send_mail,
@@ -2,36 +2,156 @@ import requests
 from datetime import datetime
 
 from flask_mail import Message
+from redis.exceptions import LockError
+from sqlalchemy.exc import OperationalError
 from rq import Connection, Queue
 from rq.registry import FailedJobRegistry
 from rq.job import Job
-from redash import mail, models, settings, rq_redis_connection
+from redash import mail, models, settings, redis_connection, rq_redis_connection
 from redash.models import users
 from redash.version_check import run_version_check
 from redash.worker import job, get_job_logger, default_operational_queues
 from redash.tasks.worker import Queue
 from redash.query_runner import NotSupported
+from redash.utils import json_dumps, json_loads
+from redash.utils.requests_session import get_session
 
 logger = get_job_logger(__name__)
 
 
-@job("default")
-def record_event(raw_event):
-    event = models.Event.record(raw_event)
-    models.db.session.commit()
+EVENTS_BUFFER_KEY = "events:buffer"
+# The batch being recorded; anything left in it is from a flush that crashed.
+EVENTS_PROCESSING_KEY = "events:processing"
+# Events that couldn't be recorded even on their own.
+EVENTS_DEAD_LETTER_KEY = "events:dead_letter"
+EVENTS_FLUSH_LOCK_KEY = "events:flush_lock"
+EVENTS_FLUSH_LOCK_TIMEOUT = 600
 
-    for hook in settings.EVENT_REPORTING_WEBHOOKS:
-        logger.debug("Forwarding event to: %s", hook)
+
+def buffer_event(raw_event):
+    """Queues an event to be recorded by the next flush_events."""
+    redis_connection.rpush(EVENTS_BUFFER_KEY, json_dumps(raw_event))
+
+
+def _claim_events(count):
+    """Moves up to `count` events from the buffer to the processing list."""
+    pipe = redis_connection.pipeline(transaction=False)
+    for _ in range(count):
+        pipe.rpoplpush(EVENTS_BUFFER_KEY, EVENTS_PROCESSING_KEY)
+    return [raw_event for raw_event in pipe.execute() if raw_event is not None]
+
+
+def _record_events(raw_events):
+    events = [json_loads(raw_event) for raw_event in raw_events]
+    try:
+        recorded = models.Event.record_many(events)
+        models.db.session.commit()
+        return recorded
+    except OperationalError:
+        # The database is unavailable, so leave the batch for the next flush.
+        models.db.session.rollback()
+        raise
+    except Exception:
+        models.db.session.rollback()
+        logger.warning(
+            "Failed recording %d events, retrying one by one.",
+            len(events),
+            exc_info=1,
+        )
+
+    recorded = []
+    for raw_event, event in zip(raw_events, events):
         try:
+            recorded.extend(models.Event.record_many([event]))
+            models.db.session.commit()
+        except Exception:
+            models.db.session.rollback()
+            logger.exception("Failed recording event: %s", raw_event)
+            redis_connection.rpush(EVENTS_DEAD_LETTER_KEY, raw_event)
+
+    return recorded
+
+
+def flush_events():
+    """Records up to EVENTS_MAX_BATCHES_PER_FLUSH batches of EVENTS_BATCH_SIZE
+    buffered events, and queues a job per batch forwarding them to the
+    EVENT_REPORTING_WEBHOOKS.
+
+    Each batch is kept in a processing list until it's recorded, so events
+    aren't lost if the flush crashes; the next flush records them first.
+    """
+    lock = redis_connection.lock(
+        EVENTS_FLUSH_LOCK_KEY, timeout=EVENTS_FLUSH_LOCK_TIMEOUT
+    )
+    if not lock.acquire(blocking=False):
+        logger.info("Events are already being flushed.")
+        return
+
+    try:
+        raw_events = redis_connection.lrange(EVENTS_PROCESSING_KEY, 0, -1)
+        for _ in range(settings.EVENTS_MAX_BATCHES_PER_FLUSH):
+            raw_events = raw_events or _claim_events(settings.EVENTS_BATCH_SIZE)
+            if not raw_events:
+                break
+
+            events = _record_events(raw_events)
+            redis_connection.delete(EVENTS_PROCESSING_KEY)
+            raw_events = None
+
+            logger.info("Recorded %d events.", len(events))
+            if settings.EVENT_REPORTING_WEBHOOKS:
+                forward_events.delay([event.to_dict() for event in events])
+    finally:
+        try:
+            lock.release()
+        except LockError:
+            # The lock expired and another flush may hold it by now.
+            logger.warning("Events flush outlasted its lock.")
+
+
+def _post_to_webhook(hook, data):
+    logger.debug("Forwarding event to: %s", hook)
+    try:
+        response = get_session(hook).post(hook, json=data)
+        if response.status_code != 200:
+            logger.error("Failed posting to %s: %s", hook, response.content)
+    except Exception:
+        logger.exception("Failed posting to %s", hook)
+
+
+@job("default")
+def forward_events(events):
+    """Posts the given events, as dicts, to the EVENT_REPORTING_WEBHOOKS."""
+    for hook in settings.EVENT_REPORTING_WEBHOOKS:
+        if settings.EVENT_REPORTING_WEBHOOKS_BATCH:
+            data = {
+                "schema": "iglu:io.redash.webhooks/events/jsonschema/1-0-0",
+                "data": events,
+            }
+            _post_to_webhook(hook, data)
+            continue
+
+        for event in events:
             data = {
                 "schema": "iglu:io.redash.webhooks/event/jsonschema/1-0-0",
-                "data": event.to_dict(),
+                "data": event,
             }
-            response = requests.post(hook, json=data)
-            if response.status_code != 200:
-                logger.error("Failed posting to %s: %s", hook, response.content)
-        except Exception:
-            logger.exception("Failed posting to %s", hook)
+            _post_to_webhook(hook, data)
+
+
+def cleanup_query_activity():
+    """Deletes the query activity counters that Query.recent no longer uses."""
+    deleted_count = models.QueryActivity.prune()
+    models.db.session.commit()
+    logger.info("Deleted %d outdated query activity counters.", deleted_count)
+
+
+@job("default")
+def record_event(raw_event):
+    event = models.Event.record(raw_event)
+    models.db.session.commit()
+
+    forward_events([event.to_dict()])
 
 
 def version_check():
@@ -134,7 +134,11 @@ def cleanup_query_results():
     logger.info("Deleted %d unused query results.", deleted_count)
 
 
-@job("schemas")
+@job(
+    "schemas",
+    timeout=settings.SCHEMA_REFRESH_TIMEOUT
+    + settings.SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT,
+)
 def refresh_schema(data_source_id):
     ds = models.DataSource.get_by_id(data_source_id)
     logger.info(u"task=refresh_schema state=start ds_id=%s", ds.id)
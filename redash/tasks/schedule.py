@@ -9,6 +9,8 @@ from rq_scheduler import Scheduler
 
 from redash import extensions, settings, rq_redis_connection, statsd_client
 from redash.tasks import (
+    flush_events,
+    cleanup_query_activity,
     sync_user_details,
     refresh_queries,
     empty_schedules,
@@ -68,6 +70,8 @@ def periodic_job_definitions():
         },
         {"func": sync_user_details, "timeout": 60, "interval": timedelta(minutes=1),},
         {"func": purge_failed_jobs, "timeout": 3600, "interval": timedelta(days=1)},
+        {"func": flush_events, "interval": settings.EVENTS_FLUSH_INTERVAL},
+        {"func": cleanup_query_activity, "interval": timedelta(days=1)},
         {
             "func": send_aggregated_errors,
             "interval": timedelta(minutes=settings.SEND_FAILURE_EMAIL_INTERVAL),
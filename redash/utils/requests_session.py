@@ -1,4 +1,14 @@
+import os
+import socket
+import threading
+import time
+from collections import OrderedDict
+from http.cookiejar import DefaultCookiePolicy
+
 import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+
 from redash import settings
 
 
@@ -9,4 +19,111 @@ class ConfiguredSession(requests.Session):
         return super().request(*args, **kwargs)
 
 
+class PooledAdapter(HTTPAdapter):
+    """Keeps REQUESTS_POOL_MAXSIZE keep-alive connections per host, retries
+    failed connections and 502/503/504 answers with a backoff, and counts how
+    often a connection was reused.
+
+    Read errors and timeouts aren't retried, as the server may still be running
+    the (possibly expensive) request."""
+
+    def __init__(self):
+        super(PooledAdapter, self).__init__(
+            pool_maxsize=settings.REQUESTS_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=settings.REQUESTS_MAX_RETRIES,
+                read=0,
+                backoff_factor=settings.REQUESTS_RETRY_BACKOFF_FACTOR,
+                status_forcelist=(502, 503, 504),
+                raise_on_status=False,
+            ),
+        )
+        self.new_connections = 0
+        self.reused_connections = 0
+
+    def send(self, request, **kwargs):
+        pool = self.get_connection(request.url, kwargs.get("proxies"))
+        connections = pool.num_connections
+        try:
+            return super(PooledAdapter, self).send(request, **kwargs)
+        finally:
+            self._count_connection(pool.num_connections > connections)
+
+    def _count_connection(self, new):
+        # Imported here as redash imports the query runners before creating it.
+        from redash import statsd_client
+
+        if new:
+            self.new_connections += 1
+            statsd_client.incr("http_client.connections.new")
+        else:
+            self.reused_connections += 1
+            statsd_client.incr("http_client.connections.reused")
+
+
 requests_session = ConfiguredSession()
+
+# {(pid, session class, key): session}, least recently used first.
+_sessions = OrderedDict()
+_sessions_lock = threading.Lock()
+
+
+def get_session(key, session_class=requests.Session):
+    """Returns the HTTP session of `key` (usually a data source's base URL) in this
+    process, so its connections are pooled and kept alive between queries.
+
+    Pass ConfiguredSession as `session_class` for URLs given by users, so
+    redirects follow REQUESTS_ALLOW_REDIRECTS.
+    """
+    key = (os.getpid(), session_class, key)
+    with _sessions_lock:
+        if key in _sessions:
+            _sessions.move_to_end(key)
+        else:
+            session = session_class()
+            # A session is shared by every data source and user with the same
+            # URL, so cookies set for one set of credentials must not be sent
+            # with another's requests.
+            session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+            adapter = PooledAdapter()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _sessions[key] = session
+            # Dropped sessions may still be in use, so their connections are
+            # left to be closed once they're garbage collected.
+            while len(_sessions) > settings.REQUESTS_SESSIONS_CACHE_SIZE:
+                _sessions.popitem(last=False)
+
+        return _sessions[key]
+
+
+def connection_stats():
+    """Returns the number of new and reused connections of each session."""
+    return {
+        key: {
+            "new": session.get_adapter("http://").new_connections,
+            "reused": session.get_adapter("http://").reused_connections,
+        }
+        for (pid, _, key), session in list(_sessions.items())
+        if pid == os.getpid()
+    }
+
+
+# {hostname: (expires_at, ip_address)}
+_addresses = {}
+_addresses_lock = threading.Lock()
+
+
+def resolve_hostname(hostname):
+    """socket.gethostbyname, cached for REQUESTS_DNS_CACHE_TTL seconds."""
+    now = time.time()
+    with _addresses_lock:
+        cached = _addresses.get(hostname)
+    if cached is not None and cached[0] > now:
+        return cached[1]
+
+    ip_address = socket.gethostbyname(hostname)
+    with _addresses_lock:
+        _addresses[hostname] = (now + settings.REQUESTS_DNS_CACHE_TTL, ip_address)
+
+    return ip_address
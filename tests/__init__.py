@@ -75,6 +75,7 @@ class BaseTestCase(TestCase):
         data=None,
         is_json=True,
         follow_redirects=False,
+        headers=None,
     ):
         if user is None:
             user = self.factory.user
@@ -89,7 +90,7 @@ class BaseTestCase(TestCase):
             authenticate_request(self.client, user)
 
         method_fn = getattr(self.client, method.lower())
-        headers = {}
+        headers = dict(headers or {})
 
         if data and is_json:
             data = json_dumps(data)
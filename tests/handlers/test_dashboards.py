@@ -1,6 +1,8 @@
+from flask import g
+
 from tests import BaseTestCase
 
-from redash.models import ApiKey, Dashboard, AccessPermission, db
+from redash.models import ApiKey, Dashboard, AccessPermission, Query, db
 from redash.permissions import ACCESS_TYPE_MODIFY
 from redash.serializers import serialize_dashboard
 from redash.utils import json_loads
@@ -49,6 +51,25 @@ class TestDashboardListGetResource(BaseTestCase):
             [d1.id, d2.id]
         )
 
+    def test_paginates_with_cursor(self):
+        d1 = self.factory.create_dashboard()
+        d2 = self.factory.create_dashboard()
+        d3 = self.factory.create_dashboard()
+
+        rv = self.make_request(
+            "get", "/api/dashboards?cursor=&page_size=2&order=created_at"
+        )
+        self.assertEqual([d1.id, d2.id], [d["id"] for d in rv.json["results"]])
+
+        rv = self.make_request(
+            "get",
+            "/api/dashboards?page_size=2&order=created_at&cursor={}".format(
+                rv.json["next_cursor"]
+            ),
+        )
+        self.assertEqual([d3.id], [d["id"] for d in rv.json["results"]])
+        self.assertIsNone(rv.json["next_cursor"])
+
 
 class TestDashboardResourceGet(BaseTestCase):
     def test_get_dashboard(self):
@@ -81,11 +102,166 @@ class TestDashboardResourceGet(BaseTestCase):
         self.assertTrue(rv.json["widgets"][0]["restricted"])
         self.assertNotIn("restricted", rv.json["widgets"][1])
 
+    def serialization_queries_count(self, dashboard):
+        db.session.expire_all()
+        with self.app.test_request_context("/"):
+            g.queries_count = 0
+            serialize_dashboard(
+                dashboard,
+                with_widgets=True,
+                user=self.factory.user,
+                with_favorite_state=False,
+            )
+            return g.queries_count
+
+    def test_get_dashboard_queries_count_does_not_grow_with_widgets(self):
+        dashboard = self.factory.create_dashboard()
+        other_ds = self.factory.create_data_source(group=self.factory.create_group())
+        for data_source in [self.factory.data_source, other_ds]:
+            query = self.factory.create_query(data_source=data_source)
+            self.factory.create_widget(
+                dashboard=dashboard,
+                visualization=self.factory.create_visualization(query_rel=query),
+            )
+        db.session.commit()
+
+        queries_count = self.serialization_queries_count(dashboard)
+
+        for data_source in [self.factory.data_source, other_ds] * 10:
+            query = self.factory.create_query(
+                data_source=data_source, user=self.factory.create_user()
+            )
+            self.factory.create_widget(
+                dashboard=dashboard,
+                visualization=self.factory.create_visualization(query_rel=query),
+            )
+            self.factory.create_widget(dashboard=dashboard, visualization=None)
+        db.session.commit()
+
+        self.assertEqual(queries_count, self.serialization_queries_count(dashboard))
+
+    def test_get_dashboard_returns_not_modified_for_matching_etag(self):
+        dashboard = self.factory.create_dashboard()
+        widget = self.factory.create_widget(dashboard=dashboard)
+        path = "/api/dashboards/{}".format(dashboard.slug)
+
+        rv = self.make_request("get", path)
+        etag = rv.headers["ETag"]
+
+        rv = self.make_request("get", path, headers={"If-None-Match": etag})
+        self.assertEqual(304, rv.status_code)
+
+        rv = self.make_request(
+            "get",
+            path,
+            user=self.factory.create_user(),
+            headers={"If-None-Match": etag},
+        )
+        self.assertEqual(200, rv.status_code)
+
+        widget.width = 2
+        db.session.commit()
+
+        rv = self.make_request("get", path, headers={"If-None-Match": etag})
+        self.assertEqual(200, rv.status_code)
+        self.assertNotEqual(etag, rv.headers["ETag"])
+
+    def test_get_dashboard_etag_changes_with_new_query_results(self):
+        dashboard = self.factory.create_dashboard()
+        query = self.factory.create_query()
+        self.factory.create_widget(
+            dashboard=dashboard,
+            visualization=self.factory.create_visualization(query_rel=query),
+        )
+        db.session.commit()
+        path = "/api/dashboards/{}".format(dashboard.slug)
+
+        rv = self.make_request("get", path)
+        etag = rv.headers["ETag"]
+
+        query_result = self.factory.create_query_result(
+            query_text=query.query_text, query_hash=query.query_hash
+        )
+        Query.update_latest_result(query_result)
+        db.session.commit()
+
+        rv = self.make_request("get", path, headers={"If-None-Match": etag})
+        self.assertEqual(200, rv.status_code)
+        self.assertNotEqual(etag, rv.headers["ETag"])
+
     def test_get_non_existing_dashboard(self):
         rv = self.make_request("get", "/api/dashboards/not_existing")
         self.assertEqual(rv.status_code, 404)
 
 
+class TestDashboardResultsResource(BaseTestCase):
+    def create_dashboard_with_results(self):
+        dashboard = self.factory.create_dashboard()
+        query_result = self.factory.create_query_result()
+        query = self.factory.create_query(latest_query_data=query_result)
+        restricted_ds = self.factory.create_data_source(
+            group=self.factory.create_group()
+        )
+        restricted_query = self.factory.create_query(
+            data_source=restricted_ds,
+            latest_query_data=self.factory.create_query_result(
+                data_source=restricted_ds
+            ),
+        )
+        for q in [query, query, restricted_query]:
+            self.factory.create_widget(
+                dashboard=dashboard,
+                visualization=self.factory.create_visualization(query_rel=q),
+            )
+        self.factory.create_widget(dashboard=dashboard, visualization=None)
+        db.session.commit()
+        return dashboard, query, query_result
+
+    def test_returns_latest_results_of_viewable_queries_once(self):
+        dashboard, query, query_result = self.create_dashboard_with_results()
+
+        rv = self.make_request("get", "/api/dashboards/{}/results".format(dashboard.id))
+
+        self.assertEqual(200, rv.status_code)
+        results = rv.json["query_results"]
+        self.assertEqual(
+            [(query.id, query_result.id)],
+            [(r["query_id"], r["query_result"]["id"]) for r in results],
+        )
+
+    def test_streams_results_as_ndjson(self):
+        dashboard, query, query_result = self.create_dashboard_with_results()
+
+        rv = self.make_request(
+            "get", "/api/dashboards/{}/results.ndjson".format(dashboard.id)
+        )
+
+        self.assertEqual("application/x-ndjson", rv.mimetype)
+        lines = [json_loads(line) for line in rv.data.decode().splitlines()]
+        self.assertEqual([query.id], [line["query_id"] for line in lines])
+        self.assertEqual(query_result.id, lines[0]["query_result"]["id"])
+
+    def test_api_key_only_gives_access_to_its_dashboard(self):
+        dashboard, query, query_result = self.create_dashboard_with_results()
+        other_dashboard = self.factory.create_dashboard()
+        api_keys = [
+            ApiKey.create_for_object(d, self.factory.user)
+            for d in [dashboard, other_dashboard]
+        ]
+        db.session.commit()
+        path = "/api/dashboards/{}/results?api_key={}"
+
+        rv = self.make_request(
+            "get", path.format(dashboard.id, api_keys[0].api_key), user=False
+        )
+        self.assertEqual(2, len(rv.json["query_results"]))
+
+        rv = self.make_request(
+            "get", path.format(dashboard.id, api_keys[1].api_key), user=False
+        )
+        self.assertEqual(404, rv.status_code)
+
+
 class TestDashboardResourcePost(BaseTestCase):
     def test_update_dashboard(self):
         d = self.factory.create_dashboard()
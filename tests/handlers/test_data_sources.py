@@ -25,6 +25,79 @@ class TestDataSourceGetSchema(BaseTestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class TestDataSourceSchemaSearch(BaseTestCase):
+    def setUp(self):
+        super(TestDataSourceSchemaSearch, self).setUp()
+        self.factory.data_source._store_schema(
+            [
+                {"name": "public.orders", "columns": ["id", "customer_id"]},
+                {"name": "public.customers", "columns": ["id", "name"]},
+                {"name": "sales.Order_items", "columns": ["order_id", "price"]},
+            ]
+        )
+
+    def get_schema(self, **args):
+        query = "&".join("{}={}".format(k, v) for k, v in args.items())
+        return self.make_request(
+            "get",
+            "/api/data_sources/{}/schema?{}".format(
+                self.factory.data_source.id, query
+            ),
+        )
+
+    def test_returns_whole_schema_without_search_arguments(self):
+        rv = self.get_schema()
+
+        self.assertEqual(rv.status_code, 200)
+        self.assertEqual(3, len(rv.json["schema"]))
+        self.assertNotIn("count", rv.json)
+
+    def test_searches_table_names_case_insensitively(self):
+        rv = self.get_schema(q="ORDER")
+
+        self.assertEqual(2, rv.json["count"])
+        self.assertEqual(
+            ["public.orders", "sales.Order_items"],
+            [t["name"] for t in rv.json["schema"]],
+        )
+
+    def test_searches_by_prefix(self):
+        rv = self.get_schema(q="public.", prefix="")
+
+        self.assertEqual(
+            ["public.customers", "public.orders"],
+            [t["name"] for t in rv.json["schema"]],
+        )
+
+    def test_searches_column_names(self):
+        rv = self.get_schema(q="customer", columns="")
+
+        self.assertEqual(
+            ["public.customers", "public.orders"],
+            [t["name"] for t in rv.json["schema"]],
+        )
+
+    def test_paginates(self):
+        rv = self.get_schema(page=2, page_size=2)
+
+        self.assertEqual(3, rv.json["count"])
+        self.assertEqual(["sales.Order_items"], [t["name"] for t in rv.json["schema"]])
+
+    def test_removed_tables_are_removed_from_index(self):
+        self.factory.data_source._store_schema(
+            [{"name": "public.customers", "columns": ["id", "name", "email"]}]
+        )
+
+        self.assertEqual(0, self.get_schema(q="order", columns="").json["count"])
+        rv = self.get_schema(q="email", columns="")
+        self.assertEqual(["public.customers"], [t["name"] for t in rv.json["schema"]])
+
+    def test_rejects_invalid_page_size(self):
+        rv = self.get_schema(page_size=0)
+
+        self.assertEqual(rv.status_code, 400)
+
+
 class TestDataSourceListGet(BaseTestCase):
     def test_returns_each_data_source_once(self):
         group = self.factory.create_group()
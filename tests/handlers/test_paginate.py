@@ -16,7 +16,9 @@ class TestPaginate(TestCase):
     def setUp(self):
         self.query_set = MagicMock()
         self.query_set.count = MagicMock(return_value=102)
-        self.query_set.paginate = MagicMock(return_value=dummy_results)
+        self.query_set.limit.return_value.offset.return_value.all.return_value = (
+            dummy_results.items
+        )
 
     def test_returns_paginated_results(self):
         page = paginate(self.query_set, 1, 25, lambda x: x)
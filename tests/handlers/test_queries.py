@@ -258,6 +258,38 @@ class TestQueryListResourceGet(BaseTestCase):
             [q1.id, q2.id]
         )
 
+    def test_paginates_with_cursor(self):
+        q1 = self.factory.create_query()
+        q2 = self.factory.create_query()
+        q3 = self.factory.create_query()
+
+        rv = self.make_request("get", "/api/queries?cursor=&page_size=2")
+        self.assertEqual([q3.id, q2.id], [q["id"] for q in rv.json["results"]])
+        self.assertNotIn("count", rv.json)
+
+        rv = self.make_request(
+            "get",
+            "/api/queries?page_size=2&count=exact&cursor={}".format(
+                rv.json["next_cursor"]
+            ),
+        )
+        self.assertEqual([q1.id], [q["id"] for q in rv.json["results"]])
+        self.assertIsNone(rv.json["next_cursor"])
+        self.assertEqual(3, rv.json["count"])
+
+    def test_cursor_requires_created_at_order(self):
+        rv = self.make_request("get", "/api/queries?cursor=&order=name")
+        self.assertEqual(400, rv.status_code)
+
+    def test_estimated_count(self):
+        self.factory.create_query()
+
+        rv = self.make_request("get", "/api/queries?count=estimate")
+
+        self.assertEqual(200, rv.status_code)
+        self.assertIsInstance(rv.json["count"], int)
+        self.assertEqual(1, len(rv.json["results"]))
+
 
 class TestQueryListResourcePost(BaseTestCase):
     def test_create_query(self):
@@ -22,6 +22,25 @@ class TestQueryResultsCacheHeaders(BaseTestCase):
         rv = self.make_request("get", "/api/queries/{}/results.json".format(query.id))
         self.assertNotIn("Cache-Control", rv.headers)
 
+    def test_returns_not_modified_for_matching_etag(self):
+        query_result = self.factory.create_query_result()
+        query = self.factory.create_query(latest_query_data=query_result)
+        path = "/api/queries/{}/results.json".format(query.id)
+
+        rv = self.make_request("get", path)
+        etag = rv.headers["ETag"]
+
+        rv = self.make_request("get", path, headers={"If-None-Match": etag})
+        self.assertEqual(304, rv.status_code)
+        self.assertEqual(b"", rv.data)
+
+        query.latest_query_data = self.factory.create_query_result()
+        db.session.commit()
+
+        rv = self.make_request("get", path, headers={"If-None-Match": etag})
+        self.assertEqual(200, rv.status_code)
+        self.assertNotEqual(etag, rv.headers["ETag"])
+
     def test_returns_404_if_no_cached_result_found(self):
         query = self.factory.create_query(latest_query_data=None)
 
@@ -28,3 +28,85 @@ class DashboardTest(BaseTestCase):
             list(Dashboard.all_tags(self.factory.org, self.factory.user)),
             [("tag1", 3), ("tag2", 2), ("tag3", 1)],
         )
+
+    def test_all_tags_counts_published_and_own_drafts(self):
+        self.factory.create_dashboard(tags=["tag1"], is_draft=True)
+        self.factory.create_dashboard(
+            tags=["tag1", "tag2"], is_draft=True, user=self.factory.create_user()
+        )
+        dashboard = self.factory.create_dashboard(tags=["tag2", "tag3"])
+        db.session.flush()
+
+        dashboard.is_archived = True
+        db.session.flush()
+
+        self.assertEqual(
+            list(Dashboard.all_tags(self.factory.org, self.factory.user)),
+            [("tag1", 1)],
+        )
+
+    def test_all_tags_leaves_out_dashboards_of_other_data_sources(self):
+        self.create_tagged_dashboard(tags=["tag1"])
+        other_user = self.factory.create_user()
+        self.factory.create_dashboard(tags=["tag1", "tag2"], user=other_user)
+        hidden = self.factory.create_dashboard(tags=["tag1", "tag3"], user=other_user)
+        data_source = self.factory.create_data_source(
+            group=self.factory.create_group()
+        )
+        query = self.factory.create_query(data_source=data_source)
+        self.factory.create_widget(
+            dashboard=hidden,
+            visualization=self.factory.create_visualization(query_rel=query),
+        )
+        db.session.commit()
+
+        user = self.factory.user
+        self.assertEqual(len(list(Dashboard.all(user.org, user.group_ids, user.id))), 1)
+        self.assertEqual(list(Dashboard.all_tags(user.org, user)), [("tag1", 1)])
+
+
+class DashboardSearchTest(BaseTestCase):
+    def search(self, term):
+        return list(
+            Dashboard.search(
+                self.factory.org,
+                self.factory.user.group_ids,
+                self.factory.user.id,
+                term,
+            )
+        )
+
+    def test_finds_by_name_prefix(self):
+        d1 = self.factory.create_dashboard(name="Sales overview")
+        self.factory.create_dashboard(name="Operations")
+
+        self.assertEqual([d1], self.search("sal"))
+
+    def test_finds_by_tags(self):
+        d1 = self.factory.create_dashboard(name="Overview", tags=["finance"])
+        self.factory.create_dashboard(name="Other", tags=["ops"])
+
+        self.assertEqual([d1], self.search("finance"))
+
+    def test_finds_by_widget_text(self):
+        d1 = self.factory.create_dashboard(name="Overview")
+        self.factory.create_widget(
+            dashboard=d1, visualization=None, text="Revenue by region"
+        )
+        self.factory.create_widget(dashboard=d1, visualization=None, text="Revenue")
+
+        self.assertEqual([d1], self.search("revenue region"))
+
+    def test_ranks_name_matches_first(self):
+        d1 = self.factory.create_dashboard(name="Overview")
+        self.factory.create_widget(dashboard=d1, visualization=None, text="Churn")
+        d2 = self.factory.create_dashboard(name="Other", tags=["churn"])
+        d3 = self.factory.create_dashboard(name="Churn")
+
+        self.assertEqual([d3, d2, d1], self.search("churn"))
+
+    def test_excludes_inaccessible_dashboards(self):
+        other_user = self.factory.create_user()
+        self.factory.create_dashboard(name="Sales", user=other_user, is_draft=True)
+
+        self.assertEqual([], self.search("sales"))
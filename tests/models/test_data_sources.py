@@ -2,7 +2,9 @@ import mock
 from mock import patch
 from tests import BaseTestCase
 
+from redash import redis_connection, settings
 from redash.models import DataSource, Query, QueryResult
+from redash.utils import json_dumps
 from redash.utils.configuration import ConfigurationContainer
 
 
@@ -32,7 +34,10 @@ class DataSourceTest(BaseTestCase):
             self.assertEqual(return_value, schema)
             self.assertEqual(patched_get_schema.call_count, 1)
 
-    def test_get_schema_skips_cache_with_refresh_true(self):
+    @patch(
+        "redash.query_runner.pg.PostgreSQL.get_schema_version", return_value=None
+    )
+    def test_get_schema_skips_cache_with_refresh_true(self, _):
         return_value = [{"name": "table", "columns": []}]
         with mock.patch(
             "redash.query_runner.pg.PostgreSQL.get_schema"
@@ -47,6 +52,134 @@ class DataSourceTest(BaseTestCase):
             self.assertEqual(new_return_value, schema)
             self.assertEqual(patched_get_schema.call_count, 2)
 
+    @patch(
+        "redash.query_runner.pg.PostgreSQL.get_schema_version", return_value="v1"
+    )
+    def test_get_schema_skips_refresh_when_version_is_unchanged(self, _):
+        return_value = [{"name": "table", "columns": []}]
+        with mock.patch(
+            "redash.query_runner.pg.PostgreSQL.get_schema"
+        ) as patched_get_schema:
+            patched_get_schema.return_value = return_value
+
+            self.factory.data_source.get_schema(refresh=True)
+            patched_get_schema.return_value = [{"name": "new_table", "columns": []}]
+            schema = self.factory.data_source.get_schema(refresh=True)
+
+            self.assertEqual(return_value, schema)
+            self.assertEqual(patched_get_schema.call_count, 1)
+
+    @patch(
+        "redash.query_runner.pg.PostgreSQL.get_schema_version", return_value=None
+    )
+    def test_get_schema_stores_only_changed_tables(self, _):
+        data_source = self.factory.data_source
+        with mock.patch(
+            "redash.query_runner.pg.PostgreSQL.get_schema"
+        ) as patched_get_schema:
+            patched_get_schema.return_value = [
+                {"name": "a", "columns": ["id"]},
+                {"name": "b", "columns": ["id"]},
+            ]
+            data_source.get_schema(refresh=True)
+
+            patched_get_schema.return_value = [
+                {"name": "b", "columns": ["id", "name"]},
+                {"name": "c", "columns": ["id"]},
+            ]
+            schema = data_source.get_schema(refresh=True)
+
+        self.assertEqual(schema, data_source.get_cached_schema())
+        self.assertEqual(
+            ["b", "c"], sorted(redis_connection.hkeys(data_source._schema_key))
+        )
+        self.assertEqual(
+            ["b", "c"], sorted(redis_connection.hkeys(data_source._schema_digests_key))
+        )
+
+    @patch(
+        "redash.query_runner.pg.PostgreSQL.get_schema_version", return_value=None
+    )
+    def test_get_cached_schema_returns_empty_schema(self, _):
+        with mock.patch(
+            "redash.query_runner.pg.PostgreSQL.get_schema"
+        ) as patched_get_schema:
+            patched_get_schema.return_value = []
+            self.factory.data_source.get_schema()
+
+        self.assertEqual([], self.factory.data_source.get_cached_schema())
+
+    def test_get_cached_schema_migrates_legacy_schema(self):
+        data_source = self.factory.data_source
+        schema = [
+            {"name": "b", "columns": ["id"]},
+            {"name": "a", "columns": ["name"]},
+        ]
+        redis_connection.set(data_source._legacy_schema_key, json_dumps(schema))
+
+        self.assertEqual(
+            ["a", "b"], [table["name"] for table in data_source.get_cached_schema()]
+        )
+        self.assertFalse(redis_connection.exists(data_source._legacy_schema_key))
+        self.assertEqual(
+            (1, [{"name": "b", "columns": ["id"]}]),
+            data_source.search_cached_schema("b"),
+        )
+
+    @patch(
+        "redash.query_runner.pg.PostgreSQL.get_schema_version", return_value=None
+    )
+    @patch("redash.query_runner.pg.PostgreSQL.get_table_sizes")
+    @patch("redash.query_runner.pg.PostgreSQL.get_schema")
+    def test_get_schema_caches_table_sizes_separately(
+        self, patched_get_schema, patched_get_table_sizes, _
+    ):
+        patched_get_schema.return_value = [{"name": "table", "columns": []}]
+        patched_get_table_sizes.return_value = {"table": 42}
+
+        with patch.object(settings, "SCHEMA_RUN_TABLE_SIZE_CALCULATIONS", True):
+            schema = self.factory.data_source.get_schema(refresh=True)
+            self.factory.data_source.get_schema(refresh=True)
+
+        expected = [{"name": "table", "columns": [], "size": 42}]
+        self.assertEqual(expected, schema)
+        self.assertEqual(expected, self.factory.data_source.get_cached_schema())
+        self.assertEqual(1, patched_get_table_sizes.call_count)
+
+    @patch(
+        "redash.query_runner.pg.PostgreSQL.get_schema_version", return_value=None
+    )
+    def test_search_cached_schema_follows_refreshes(self, _):
+        data_source = self.factory.data_source
+        with mock.patch(
+            "redash.query_runner.pg.PostgreSQL.get_schema"
+        ) as patched_get_schema:
+            patched_get_schema.return_value = [
+                {"name": "orders", "columns": ["id", "customer_id"]},
+                {"name": "customers", "columns": ["id"]},
+            ]
+            data_source.get_schema(refresh=True)
+
+            patched_get_schema.return_value = [
+                {"name": "customers", "columns": ["id", "email"]},
+                {"name": "Order_items", "columns": ["order_id"]},
+            ]
+            data_source.get_schema(refresh=True)
+
+        count, tables = data_source.search_cached_schema("order")
+        self.assertEqual(1, count)
+        self.assertEqual(["Order_items"], [t["name"] for t in tables])
+
+        count, tables = data_source.search_cached_schema(
+            "e", prefix=True, search_columns=True
+        )
+        self.assertEqual(["customers"], [t["name"] for t in tables])
+
+        self.assertEqual(
+            (0, []),
+            data_source.search_cached_schema("customer_id", search_columns=True),
+        )
+
     def test_schema_sorter(self):
         input_data = [
             {"name": "zoo", "columns": ["is_zebra", "is_snake", "is_cow"]},
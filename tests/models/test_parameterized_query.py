@@ -2,13 +2,19 @@ from unittest import TestCase
 from mock import patch
 from collections import namedtuple
 import pytest
+import pystache
 
+from redash import redis_connection
 from redash.models.parameterized_query import (
     ParameterizedQuery,
     InvalidParameterError,
     QueryDetachedFromDataSourceError,
+    DropdownValuesCache,
+    cached_dropdown_values,
     dropdown_values,
 )
+from redash.utils import json_dumps
+from tests import BaseTestCase
 
 
 class TestParameterizedQuery(TestCase):
@@ -44,6 +50,26 @@ class TestParameterizedQuery(TestCase):
         ).apply({"created_at": {"start": 1, "end": 2}})
         self.assertEqual(set([]), query.missing_params)
 
+    def test_reuses_parsed_template_across_instances(self):
+        template = "SELECT {{cached_param}} FROM cached_table"
+        with patch(
+            "redash.models.parameterized_query.pystache.parse",
+            wraps=pystache.parse,
+        ) as parse:
+            for value in ("a", "b", "c"):
+                query = ParameterizedQuery(template).apply({"cached_param": value})
+                self.assertEqual(set([]), query.missing_params)
+
+            self.assertEqual("SELECT c FROM cached_table", query.text)
+            self.assertEqual(1, parse.call_count)
+
+    def test_uses_first_definition_for_duplicate_parameter_names(self):
+        schema = [{"name": "bar", "type": "number"}, {"name": "bar", "type": "text"}]
+        query = ParameterizedQuery("foo {{bar}}", schema)
+
+        with pytest.raises(InvalidParameterError):
+            query.apply({"bar": "baz"})
+
     def test_raises_on_parameters_not_in_schema(self):
         schema = [{"name": "bar", "type": "text"}]
         query = ParameterizedQuery("foo", schema)
@@ -162,49 +188,6 @@ class TestParameterizedQuery(TestCase):
 
         self.assertEqual("foo 'qux','baz'", query.text)
 
-    @patch(
-        "redash.models.parameterized_query.dropdown_values",
-        return_value=[{"value": "1"}],
-    )
-    def test_validation_accepts_integer_values_for_dropdowns(self, _):
-        schema = [{"name": "bar", "type": "query", "queryId": 1}]
-        query = ParameterizedQuery("foo {{bar}}", schema)
-
-        query.apply({"bar": 1})
-
-        self.assertEqual("foo 1", query.text)
-
-    @patch("redash.models.parameterized_query.dropdown_values")
-    def test_raises_on_invalid_query_parameters(self, _):
-        schema = [{"name": "bar", "type": "query", "queryId": 1}]
-        query = ParameterizedQuery("foo", schema)
-
-        with pytest.raises(InvalidParameterError):
-            query.apply({"bar": 7})
-
-    @patch(
-        "redash.models.parameterized_query.dropdown_values",
-        return_value=[{"value": "baz"}],
-    )
-    def test_raises_on_unlisted_query_value_parameters(self, _):
-        schema = [{"name": "bar", "type": "query", "queryId": 1}]
-        query = ParameterizedQuery("foo", schema)
-
-        with pytest.raises(InvalidParameterError):
-            query.apply({"bar": "shlomo"})
-
-    @patch(
-        "redash.models.parameterized_query.dropdown_values",
-        return_value=[{"value": "baz"}],
-    )
-    def test_validates_query_parameters(self, _):
-        schema = [{"name": "bar", "type": "query", "queryId": 1}]
-        query = ParameterizedQuery("foo {{bar}}", schema)
-
-        query.apply({"bar": "baz"})
-
-        self.assertEqual("foo baz", query.text)
-
     def test_raises_on_invalid_date_range_parameters(self):
         schema = [{"name": "bar", "type": "date-range"}]
         query = ParameterizedQuery("foo", schema)
@@ -287,3 +270,102 @@ class TestParameterizedQuery(TestCase):
     def test_dropdown_values_raises_when_query_is_detached_from_data_source(self, _):
         with pytest.raises(QueryDetachedFromDataSourceError):
             dropdown_values(1, None)
+
+
+class TestDropdownParameters(BaseTestCase):
+    def _create_dropdown_query(self, values):
+        data = {
+            "columns": [{"name": "value"}],
+            "rows": [{"value": value} for value in values],
+        }
+        query_result = self.factory.create_query_result(data=json_dumps(data))
+        return self.factory.create_query(latest_query_data=query_result)
+
+    def _parameterized_query(self, dropdown_query, **definition):
+        definition.update(name="bar", type="query", queryId=dropdown_query.id)
+        schema = [definition]
+        return ParameterizedQuery("foo {{bar}}", schema, self.factory.org)
+
+    def test_validation_accepts_integer_values_for_dropdowns(self):
+        query = self._parameterized_query(self._create_dropdown_query([1]))
+
+        query.apply({"bar": 1})
+
+        self.assertEqual("foo 1", query.text)
+
+    def test_raises_on_invalid_query_parameters(self):
+        query = self._parameterized_query(self._create_dropdown_query(["baz"]))
+
+        with pytest.raises(InvalidParameterError):
+            query.apply({"bar": 7})
+
+    def test_raises_on_unlisted_query_value_parameters(self):
+        query = self._parameterized_query(self._create_dropdown_query(["baz"]))
+
+        with pytest.raises(InvalidParameterError):
+            query.apply({"bar": "shlomo"})
+
+    def test_validates_query_parameters(self):
+        query = self._parameterized_query(self._create_dropdown_query(["baz"]))
+
+        query.apply({"bar": "baz"})
+
+        self.assertEqual("foo baz", query.text)
+
+    def test_validates_query_list_value_parameters(self):
+        query = self._parameterized_query(
+            self._create_dropdown_query(["baz", "qux"]),
+            multiValuesOptions={"separator": ",", "prefix": "", "suffix": ""},
+        )
+
+        query.apply({"bar": ["qux", "baz"]})
+
+        self.assertEqual("foo qux,baz", query.text)
+
+    def test_raises_on_query_list_value_without_multiple_values(self):
+        query = self._parameterized_query(self._create_dropdown_query(["baz", "qux"]))
+
+        with pytest.raises(InvalidParameterError):
+            query.apply({"bar": ["qux", "baz"]})
+
+    def test_validation_uses_cached_option_set(self):
+        dropdown_query = self._create_dropdown_query(["baz"])
+        query = self._parameterized_query(dropdown_query)
+        query.apply({"bar": "baz"})
+
+        cache = DropdownValuesCache(dropdown_query.latest_query_data_id)
+        self.assertEqual({"baz"}, redis_connection.smembers(cache.values_key))
+
+        with patch.object(DropdownValuesCache, "_load") as load:
+            self._parameterized_query(dropdown_query).apply({"bar": "baz"})
+            load.assert_not_called()
+
+    def test_cached_dropdown_values_match_dropdown_values(self):
+        dropdown_query = self._create_dropdown_query(["baz", "qux"])
+        expected = dropdown_values(dropdown_query.id, self.factory.org)
+
+        self.assertEqual(
+            expected, cached_dropdown_values(dropdown_query.id, self.factory.org)
+        )
+        with patch.object(DropdownValuesCache, "_load") as load:
+            self.assertEqual(
+                expected, cached_dropdown_values(dropdown_query.id, self.factory.org)
+            )
+            load.assert_not_called()
+
+    def test_new_query_result_invalidates_cached_options(self):
+        dropdown_query = self._create_dropdown_query(["baz"])
+        cached_dropdown_values(dropdown_query.id, self.factory.org)
+
+        data = {"columns": [{"name": "value"}], "rows": [{"value": "qux"}]}
+        dropdown_query.latest_query_data = self.factory.create_query_result(
+            data=json_dumps(data)
+        )
+        self.db.session.flush()
+
+        self.assertEqual(
+            [{"name": "qux", "value": "qux"}],
+            cached_dropdown_values(dropdown_query.id, self.factory.org),
+        )
+        with pytest.raises(InvalidParameterError):
+            self._parameterized_query(dropdown_query).apply({"bar": "baz"})
@@ -1,6 +1,7 @@
 from tests import BaseTestCase
 import datetime
-from redash.models import Query, QueryResult, Group, Event, db
+import time
+from redash.models import Query, QueryActivity, QueryResult, Group, Event, db
 from redash.utils import utcnow, gen_query_hash
 import mock
 
@@ -29,6 +30,43 @@ class QueryTest(BaseTestCase):
             [("tag1", 3), ("tag2", 2), ("tag3", 1)],
         )
 
+    def test_all_tags_follows_changes(self):
+        q1 = self.create_tagged_query(tags=["tag1", "tag2"])
+        q2 = self.create_tagged_query(tags=["tag1"])
+        db.session.flush()
+
+        q1.tags = ["tag2", "tag3"]
+        q2.archive()
+        db.session.flush()
+
+        self.assertEqual(
+            sorted(Query.all_tags(self.factory.user)), [("tag2", 1), ("tag3", 1)]
+        )
+
+    def test_all_tags_follows_changes_in_place(self):
+        query = self.create_tagged_query(tags=["tag1"])
+        db.session.commit()
+
+        query.tags.append("tag2")
+        db.session.commit()
+        query.tags.remove("tag1")
+        db.session.commit()
+
+        self.assertEqual(list(Query.all_tags(self.factory.user)), [("tag2", 1)])
+
+    def test_all_tags_of_drafts(self):
+        self.create_tagged_query(tags=["tag1"])
+        q = self.create_tagged_query(tags=["tag1", "tag2"])
+        q.user = self.factory.create_user()
+        q.is_draft = True
+        db.session.flush()
+
+        self.assertEqual(list(Query.all_tags(self.factory.user)), [("tag1", 1)])
+        self.assertEqual(
+            list(Query.all_tags(self.factory.user, include_drafts=True)),
+            [("tag1", 2), ("tag2", 1)],
+        )
+
     def test_search_finds_in_name(self):
         q1 = self.factory.create_query(name="Testing seåřċħ")
         q2 = self.factory.create_query(name="Testing seåřċħing")
@@ -63,6 +101,29 @@ class QueryTest(BaseTestCase):
         self.assertIn(q2, queries)
         self.assertNotIn(q3, queries)
 
+    def test_multi_byte_search_finds_in_query_text(self):
+        q1 = self.factory.create_query(query_text="SELECT 'テスト'")
+        q2 = self.factory.create_query(query_text="SELECT 1")
+
+        queries = Query.search(
+            "テスト", [self.factory.default_group.id], multi_byte_search=True
+        )
+
+        self.assertIn(q1, queries)
+        self.assertNotIn(q2, queries)
+
+    def test_multi_byte_search_orders_by_relevance(self):
+        q1 = self.factory.create_query(description="説明文のテスト")
+        q2 = self.factory.create_query(name="名前のテスト")
+        q3 = self.factory.create_query(name="テストの名前")
+        q4 = self.factory.create_query(name="テスト")
+
+        queries = Query.search(
+            "テスト", [self.factory.default_group.id], multi_byte_search=True
+        )
+
+        self.assertEqual([q4, q3, q2, q1], list(queries))
+
     def test_search_by_id_returns_query(self):
         q1 = self.factory.create_query(description="Testing search")
         q2 = self.factory.create_query(description="Testing searching")
@@ -279,6 +340,46 @@ class QueryRecentTest(BaseTestCase):
         self.assertNotIn(q1, recent)
         self.assertNotIn(q2, recent)
 
+    def test_recent_orders_by_recorded_events(self):
+        q1 = self.factory.create_query()
+        q2 = self.factory.create_query()
+        db.session.flush()
+        Event.record_many(
+            [
+                {
+                    "org_id": self.factory.org.id,
+                    "user_id": self.factory.user.id,
+                    "action": "execute",
+                    "object_type": "query",
+                    "object_id": query.id,
+                    "timestamp": time.time(),
+                }
+                for query in [q2, q1, q2]
+            ]
+        )
+
+        recent = Query.recent([self.factory.default_group.id])
+
+        self.assertEqual([q2, q1], list(recent))
+
+    def test_prune_keeps_recent_activity(self):
+        q1 = self.factory.create_query()
+        q2 = self.factory.create_query()
+        db.session.add_all(
+            [
+                QueryActivity(query_id=q1.id, day=datetime.date.today(), count=1),
+                QueryActivity(
+                    query_id=q2.id,
+                    day=datetime.date.today() - datetime.timedelta(days=8),
+                    count=1,
+                ),
+            ]
+        )
+
+        QueryActivity.prune()
+
+        self.assertEqual([q1.id], [a.query_id for a in QueryActivity.query])
+
     def test_respects_groups(self):
         q1 = self.factory.create_query()
         ds = self.factory.create_data_source(group=self.factory.create_group())
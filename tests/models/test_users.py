@@ -1,7 +1,8 @@
+from mock import patch
 from tests import BaseTestCase, authenticated_user
 
 from redash import redis_connection
-from redash.models import User, db
+from redash.models import User, db, invalidate_permissions
 from redash.utils import dt_from_timestamp
 from redash.models.users import (
     sync_last_active_at,
@@ -79,6 +80,45 @@ class TestUserRegenerateApiKey(BaseTestCase):
         self.assertNotEqual(user.api_key, before_api_key)
 
 
+class TestUserPermissions(BaseTestCase):
+    def test_resolves_permissions_once(self):
+        user = self.factory.create_user()
+
+        with patch(
+            "redash.models.users._load_permissions", return_value=["view_query"]
+        ) as load_permissions:
+            with self.app.test_request_context("/"):
+                self.assertEqual(["view_query"], user.permissions)
+                self.assertEqual(["view_query"], user.permissions)
+            with self.app.test_request_context("/"):
+                self.assertEqual(["view_query"], user.permissions)
+
+        load_permissions.assert_called_once()
+
+    def test_resolves_permissions_again_after_group_changes(self):
+        group = self.factory.create_group(permissions=["view_query"])
+        db.session.flush()
+        user = self.factory.create_user(group_ids=[group.id])
+        self.assertEqual(["view_query"], user.permissions)
+
+        group.permissions = ["view_query", "edit_query"]
+        db.session.commit()
+        invalidate_permissions()
+
+        self.assertEqual(["view_query", "edit_query"], user.permissions)
+
+    def test_resolves_permissions_again_after_membership_changes(self):
+        group = self.factory.create_group(permissions=["admin"])
+        db.session.flush()
+        user = self.factory.create_user()
+        self.assertNotIn("admin", user.permissions)
+
+        user.group_ids.append(group.id)
+        db.session.commit()
+
+        self.assertIn("admin", user.permissions)
+
+
 class TestUserDetail(BaseTestCase):
     # def setUp(self):
     #     super(TestUserDetail, self).setUp()
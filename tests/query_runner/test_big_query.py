@@ -0,0 +1,129 @@
+import datetime
+import threading
+from unittest import TestCase
+
+from mock import patch
+
+from redash.query_runner.big_query import BigQuery, transform_row, transform_rows
+
+FIELDS = [
+    {"name": "id", "type": "INTEGER"},
+    {"name": "name", "type": "STRING"},
+    {"name": "active", "type": "BOOLEAN"},
+    {"name": "created_at", "type": "TIMESTAMP"},
+    {"name": "scores", "type": "FLOAT", "mode": "REPEATED"},
+]
+
+
+def make_row(i):
+    return {
+        "f": [
+            {"v": str(i)},
+            {"v": "row {}".format(i)},
+            {"v": "true" if i % 2 else None},
+            {"v": "1600000000.0"},
+            {"v": [{"v": "1.5"}, {"v": str(i)}]},
+        ]
+    }
+
+
+class FakeRequest(object):
+    def __init__(self, reply):
+        self.reply = reply
+
+    def execute(self, http=None):
+        return self.reply
+
+
+class FakeJobs(object):
+    """Stub of the jobs API that serves `total_rows` rows, in pages of at most
+    `page_size` rows."""
+
+    def __init__(self, total_rows, page_size):
+        self.rows = [make_row(i) for i in range(total_rows)]
+        self.page_size = page_size
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def insert(self, projectId, body):
+        return FakeRequest({"jobReference": {"jobId": "job"}})
+
+    def getQueryResults(self, projectId, jobId, startIndex, maxResults=None, **kw):
+        with self.lock:
+            self.requests.append((startIndex, maxResults))
+
+        size = min(maxResults or self.page_size, self.page_size)
+        reply = {
+            "jobComplete": True,
+            "jobReference": {"jobId": jobId},
+            "totalRows": str(len(self.rows)),
+            "totalBytesProcessed": "1024",
+            "schema": {"fields": FIELDS},
+        }
+        rows = self.rows[startIndex : startIndex + size]
+        if rows:
+            reply["rows"] = rows
+        return FakeRequest(reply)
+
+
+class TestTransformRows(TestCase):
+    def test_matches_transform_row(self):
+        rows = [make_row(i) for i in range(5)]
+
+        self.assertEqual(
+            [transform_row(row, FIELDS) for row in rows], transform_rows(rows, FIELDS)
+        )
+
+    def test_converts_values(self):
+        row = transform_rows([make_row(1)], FIELDS)[0]
+
+        self.assertEqual(1, row["id"])
+        self.assertEqual(True, row["active"])
+        self.assertEqual(
+            datetime.datetime.fromtimestamp(1600000000.0), row["created_at"]
+        )
+        self.assertEqual([1.5, 1.0], row["scores"])
+
+    def test_empty_page(self):
+        self.assertEqual([], transform_rows([], FIELDS))
+
+
+class TestBigQueryResults(TestCase):
+    def setUp(self):
+        self.runner = BigQuery({"projectId": "project", "jsonKeyFile": ""})
+        patcher = patch.object(BigQuery, "_get_http")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_fetches_all_pages_in_order(self):
+        jobs = FakeJobs(total_rows=95, page_size=10)
+
+        data = self.runner._get_query_result(jobs, "SELECT 1")
+
+        self.assertEqual(list(range(95)), [row["id"] for row in data["rows"]])
+        self.assertEqual(1024, data["metadata"]["data_scanned"])
+        self.assertEqual(10, len(jobs.requests))
+
+    def test_requests_the_rest_of_short_pages(self):
+        self.runner.current_job_id = "job"
+        jobs = FakeJobs(total_rows=30, page_size=10)
+        first = jobs.getQueryResults("project", "job", 0).execute()
+        jobs.requests = []
+
+        # Pages past the first one are capped at 4 rows by the server.
+        jobs.page_size = 4
+        rows = []
+        for page in self.runner._fetch_pages(jobs, first):
+            rows.extend(page)
+
+        self.assertEqual(jobs.rows, rows)
+        self.assertIn((14, 6), jobs.requests)
+
+    @patch("redash.settings.BIGQUERY_RESULT_FETCH_CONCURRENCY", 1)
+    def test_single_page(self):
+        jobs = FakeJobs(total_rows=5, page_size=10)
+
+        data = self.runner._get_query_result(jobs, "SELECT 1")
+
+        self.assertEqual(5, len(data["rows"]))
+        self.assertEqual([(0, None)], jobs.requests)
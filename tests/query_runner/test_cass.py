@@ -1,8 +1,13 @@
 import shutil
 import ssl
+from collections import namedtuple
 from unittest import TestCase
 
-from redash.query_runner.cass import generate_ssl_options_dict
+from mock import MagicMock, patch
+
+from redash.query_runner import cass
+from redash.query_runner.cass import Cassandra, generate_ssl_options_dict
+from redash.utils import json_loads
 
 
 class TestCassandra(TestCase):
@@ -20,3 +25,53 @@ class TestCassandra(TestCase):
         }
         actual = generate_ssl_options_dict("PROTOCOL_TLSv1_2", "some/path")
         self.assertDictEqual(expected, actual)
+
+
+class FakeResultSet(object):
+    def __init__(self, column_names, rows):
+        self.column_names = column_names
+        self.rows = rows
+
+    def __iter__(self):
+        Row = namedtuple("Row", self.column_names)
+        return (Row(*row) for row in self.rows)
+
+
+class TestCassandraRunQuery(TestCase):
+    def setUp(self):
+        self.cluster = MagicMock()
+        self.session = self.cluster.connect.return_value
+        for name, value in (
+            ("Cluster", MagicMock(return_value=self.cluster)),
+            ("SimpleStatement", MagicMock()),
+        ):
+            patcher = patch.object(cass, name, value, create=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.configuration = {"host": "localhost", "keyspace": "ks", "useSsl": False}
+
+    def test_pages_results(self):
+        runner = Cassandra(dict(self.configuration, fetchSize=2))
+        self.session.execute.return_value = FakeResultSet(
+            ["a", "b"], [(1, 2), (3, 4)]
+        )
+
+        data, error = runner.run_query("SELECT a, b FROM t", None)
+
+        cass.SimpleStatement.assert_called_with("SELECT a, b FROM t", fetch_size=2)
+        self.assertEqual(
+            [{"a": 1, "b": 2}, {"a": 3, "b": 4}], json_loads(data)["rows"]
+        )
+
+    @patch("redash.query_runner.cass.os.remove")
+    def test_shuts_down_cluster_and_removes_certificate_after_query(self, remove):
+        runner = Cassandra(self.configuration)
+        self.session.execute.side_effect = ValueError
+
+        with patch.object(runner, "_generate_cert_file", return_value="cert.pem"):
+            with self.assertRaises(ValueError):
+                runner.run_query("SELECT 1", None)
+
+        self.cluster.shutdown.assert_called_once()
+        remove.assert_called_once_with("cert.pem")
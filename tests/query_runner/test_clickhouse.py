@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from redash.query_runner import TYPE_INTEGER, TYPE_STRING
+from redash.query_runner.clickhouse import ClickHouse
+from redash.utils import json_loads
+
+
+def mock_response(lines):
+    response = Mock(status_code=200)
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+
+class TestClickHouseStreaming(TestCase):
+    def setUp(self):
+        self.runner = ClickHouse({"dbname": "default", "streaming": True})
+
+    @patch("requests.Session.post")
+    def test_parses_rows_incrementally(self, post):
+        post.return_value = mock_response(
+            [
+                b'["id","name","total"]',
+                b'["UInt64","String","Nullable(Int64)"]',
+                b'[1,"a","18446744073709"]',
+                b"",
+                b'["2","b",null]',
+            ]
+        )
+
+        data, error = self.runner.run_query("SELECT 1", None)
+
+        self.assertIsNone(error)
+        data = json_loads(data)
+        self.assertEqual(
+            [TYPE_INTEGER, TYPE_STRING, TYPE_INTEGER],
+            [c["type"] for c in data["columns"]],
+        )
+        self.assertEqual(
+            [
+                {"id": 1, "name": "a", "total": 18446744073709},
+                {"id": 2, "name": "b", "total": None},
+            ],
+            data["rows"],
+        )
+        self.assertTrue(post.call_args[1]["stream"])
+        self.assertIn(
+            b"FORMAT JSONCompactEachRowWithNamesAndTypes", post.call_args[1]["data"]
+        )
+        post.return_value.close.assert_called_once()
+
+    @patch("requests.Session.post")
+    def test_returns_error_appended_to_response(self, post):
+        post.return_value = mock_response(
+            [b'["id"]', b'["UInt8"]', b"[1]", b"Code: 241. DB::Exception: Memory limit"]
+        )
+
+        data, error = self.runner.run_query("SELECT 1", None)
+
+        self.assertIsNone(data)
+        self.assertIn("Memory limit", error)
+
+    @patch("requests.Session.post")
+    def test_handles_empty_response(self, post):
+        post.return_value = mock_response([])
+
+        data, error = self.runner.run_query("SELECT 1", None)
+
+        self.assertEqual({"columns": [], "rows": []}, json_loads(data))
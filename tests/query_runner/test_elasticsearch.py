@@ -0,0 +1,217 @@
+from unittest import TestCase
+
+import requests
+from mock import Mock, patch
+
+from redash.query_runner import elasticsearch
+from redash.query_runner.elasticsearch import ElasticSearch, Kibana
+from redash.utils import json_dumps, json_loads
+
+MAPPINGS = {
+    "logs": {
+        "mappings": {
+            "doc": {"properties": {"name": {"type": "string"}, "n": {"type": "long"}}}
+        }
+    }
+}
+
+
+def mock_response(data):
+    response = Mock(status_code=200)
+    response.json.return_value = data
+    return response
+
+
+def hits_page(values, scroll_id=None):
+    hits = [{"_source": {"n": n}, "sort": [n]} for n in values]
+    page = {"hits": {"total": 100, "hits": hits}}
+    if scroll_id:
+        page["_scroll_id"] = scroll_id
+    return page
+
+
+def rows(data):
+    return [row["n"] for row in json_loads(data)["rows"]]
+
+
+class ElasticSearchTestCase(TestCase):
+    def setUp(self):
+        elasticsearch._mappings_cache.clear()
+        get_patcher = patch("requests.Session.get")
+        self.get = get_patcher.start()
+        self.addCleanup(get_patcher.stop)
+
+        self.pages = []
+
+        def get(url, **kwargs):
+            if url.endswith("/_mapping"):
+                return mock_response(MAPPINGS)
+            return mock_response(self.pages.pop(0))
+
+        self.get.side_effect = get
+
+    def search_calls(self):
+        return [c for c in self.get.call_args_list if "_search" in c[0][0]]
+
+
+class TestQueryMappingsCache(ElasticSearchTestCase):
+    def test_reuses_mappings_of_an_index(self):
+        runner = ElasticSearch({"server": "http://es"})
+        self.pages = [hits_page([1]), hits_page([2])]
+
+        runner.run_query(json_dumps({"index": "logs"}), None)
+        runner.run_query(json_dumps({"index": "logs"}), None)
+
+        mapping_calls = [c for c in self.get.call_args_list if "_mapping" in c[0][0]]
+        self.assertEqual(1, len(mapping_calls))
+
+    def test_fetches_mappings_again_once_expired(self):
+        runner = ElasticSearch({"server": "http://es"})
+        self.pages = [hits_page([1]), hits_page([2])]
+
+        with patch.object(elasticsearch.time, "time", return_value=0):
+            runner.run_query(json_dumps({"index": "logs"}), None)
+        with patch.object(
+            elasticsearch.time, "time", return_value=elasticsearch.MAPPINGS_CACHE_TTL
+        ):
+            runner.run_query(json_dumps({"index": "logs"}), None)
+
+        mapping_calls = [c for c in self.get.call_args_list if "_mapping" in c[0][0]]
+        self.assertEqual(2, len(mapping_calls))
+
+    def test_does_not_share_mappings_between_credentials(self):
+        self.pages = [hits_page([1]), hits_page([2])]
+
+        for user in ("a", "b"):
+            runner = ElasticSearch(
+                {
+                    "server": "http://es",
+                    "basic_auth_user": user,
+                    "basic_auth_password": "secret",
+                }
+            )
+            runner.run_query(json_dumps({"index": "logs"}), None)
+
+        mapping_calls = [c for c in self.get.call_args_list if "_mapping" in c[0][0]]
+        self.assertEqual(2, len(mapping_calls))
+
+
+class TestElasticSearchPagination(ElasticSearchTestCase):
+    def setUp(self):
+        super(TestElasticSearchPagination, self).setUp()
+        self.runner = ElasticSearch({"server": "http://es"})
+
+    def test_single_search_without_limit(self):
+        self.pages = [hits_page([1, 2])]
+
+        data, error = self.runner.run_query(json_dumps({"index": "logs"}), None)
+
+        self.assertIsNone(error)
+        self.assertEqual([1, 2], rows(data))
+        self.assertEqual(1, len(self.search_calls()))
+
+    def patch_point_in_time(self, response):
+        post_patcher = patch("requests.Session.post", return_value=response)
+        delete_patcher = patch("requests.Session.delete")
+        post, delete = post_patcher.start(), delete_patcher.start()
+        self.addCleanup(post_patcher.stop)
+        self.addCleanup(delete_patcher.stop)
+        return post, delete
+
+    def test_pages_sorted_queries_with_search_after(self):
+        post, delete = self.patch_point_in_time(mock_response({"id": "p1"}))
+        self.pages = [hits_page([1, 2]), hits_page([3, 4]), hits_page([5])]
+        query = {"index": "logs", "sort": {"n": "desc"}, "size": 2, "limit": 10}
+
+        data, error = self.runner.run_query(json_dumps(query), None)
+
+        self.assertIsNone(error)
+        self.assertEqual([1, 2, 3, 4, 5], rows(data))
+        self.assertEqual("http://es/logs/_pit", post.call_args[0][0])
+        calls = self.search_calls()
+        self.assertEqual("http://es/_search", calls[0][0][0])
+        bodies = [c[1]["json"] for c in calls]
+        self.assertEqual({"n": "desc"}, bodies[0]["sort"])
+        self.assertEqual("p1", bodies[0]["pit"]["id"])
+        self.assertNotIn("search_after", bodies[0])
+        self.assertEqual([2], bodies[1]["search_after"])
+        self.assertEqual([4], bodies[2]["search_after"])
+        self.assertEqual({"id": "p1"}, delete.call_args[1]["json"])
+
+    def test_sorted_queries_scroll_without_point_in_time(self):
+        response = Mock(status_code=400)
+        response.raise_for_status.side_effect = requests.HTTPError(response=response)
+        post, delete = self.patch_point_in_time(response)
+        self.pages = [hits_page([1, 2], scroll_id="s1")]
+        query = {"index": "logs", "sort": ["n"], "size": 2, "limit": 2}
+
+        data, error = self.runner.run_query(json_dumps(query), None)
+
+        self.assertIsNone(error)
+        self.assertEqual([1, 2], rows(data))
+        call = self.search_calls()[0]
+        self.assertEqual("http://es/logs/_search", call[0][0])
+        self.assertEqual(["n"], call[1]["json"]["sort"])
+        self.assertEqual(elasticsearch.SCROLL_KEEP_ALIVE, call[1]["params"]["scroll"])
+
+    def test_search_after_stops_at_limit(self):
+        self.patch_point_in_time(mock_response({"id": "p1"}))
+        self.pages = [hits_page([1, 2]), hits_page([3])]
+        query = {"index": "logs", "sort": ["n"], "size": 2, "limit": 3}
+
+        data, error = self.runner.run_query(json_dumps(query), None)
+
+        self.assertEqual([1, 2, 3], rows(data))
+        self.assertEqual(1, self.search_calls()[1][1]["json"]["size"])
+
+    @patch("requests.Session.delete")
+    @patch("requests.Session.post")
+    def test_pages_unsorted_queries_with_scroll(self, post, delete):
+        self.pages = [hits_page([1, 2], scroll_id="s1")]
+        post.side_effect = [
+            mock_response(hits_page([3, 4], scroll_id="s2")),
+            mock_response(hits_page([5, 6], scroll_id="s2")),
+        ]
+        query = {"index": "logs", "size": 2, "limit": 5}
+
+        data, error = self.runner.run_query(json_dumps(query), None)
+
+        self.assertIsNone(error)
+        self.assertEqual([1, 2, 3, 4, 5], rows(data))
+        params = self.search_calls()[0][1]["params"]
+        self.assertEqual(elasticsearch.SCROLL_KEEP_ALIVE, params["scroll"])
+        self.assertEqual("s2", post.call_args[1]["json"]["scroll_id"])
+        delete.assert_called_once()
+        self.assertEqual(["s2"], delete.call_args[1]["json"]["scroll_id"])
+
+    def test_aggregations_are_not_paged(self):
+        self.pages = [
+            {"aggregations": {"n": {"buckets": [{"key": "a", "doc_count": 3}]}}}
+        ]
+        query = {"index": "logs", "aggs": {"n": {}}, "limit": 10}
+
+        data, error = self.runner.run_query(json_dumps(query), None)
+
+        self.assertIsNone(error)
+        self.assertEqual(1, len(self.search_calls()))
+        self.assertNotIn("scroll", self.search_calls()[0][1]["params"] or {})
+
+
+class TestKibanaPagination(ElasticSearchTestCase):
+    @patch("requests.Session.delete")
+    @patch("requests.Session.post")
+    def test_scrolls_up_to_limit(self, post, delete):
+        runner = Kibana({"server": "http://es/"})
+        self.pages = [hits_page([1, 2], scroll_id="s1")]
+        post.side_effect = [mock_response(hits_page([3, 4], scroll_id="s1"))]
+        query = {"index": "logs", "query": "n:*", "size": 2, "limit": 3}
+
+        data, error = runner.run_query(json_dumps(query), None)
+
+        self.assertIsNone(error)
+        self.assertEqual([1, 2, 3], rows(data))
+        params = self.search_calls()[0][1]["params"]
+        self.assertEqual("n:*", params["q"])
+        self.assertEqual(2, params["size"])
+        self.assertEqual(1, post.call_count)
+        delete.assert_called_once()
@@ -0,0 +1,57 @@
+from unittest import TestCase
+
+from redash.query_runner import TYPE_INTEGER, TYPE_STRING
+from redash.query_runner.flatten import DocumentFlattener, flatten_documents
+
+
+class TestFlattenDocuments(TestCase):
+    def test_flattens_a_single_level_by_default(self):
+        rows, columns = flatten_documents([{"a": 1, "b": {"c": 2, "d": {"e": 3}}}])
+
+        self.assertEqual([{"a": 1, "b.c": 2, "b.d": {"e": 3}}], rows)
+        self.assertEqual(["a", "b.c", "b.d"], [c["name"] for c in columns])
+
+    def test_flattens_up_to_max_depth(self):
+        document = {"a": {"b": {"c": {"d": 1}}}}
+
+        self.assertEqual([document], flatten_documents([document], max_depth=0)[0])
+        self.assertEqual(
+            [{"a.b.c": {"d": 1}}], flatten_documents([document], max_depth=2)[0]
+        )
+        self.assertEqual(
+            [{"a.b.c.d": 1}], flatten_documents([document], max_depth=5)[0]
+        )
+
+    def test_keeps_columns_in_order_of_appearance(self):
+        rows, columns = flatten_documents(
+            [{"b": 1, "a": "x"}, {"c": {"z": 1, "y": 2}, "a": "y"}]
+        )
+
+        self.assertEqual(["b", "a", "c.z", "c.y"], [c["name"] for c in columns])
+
+    def test_guesses_type_from_first_value(self):
+        _, columns = flatten_documents([{"a": 1}, {"a": "x"}, {"b": None}])
+
+        self.assertEqual([TYPE_INTEGER, TYPE_STRING], [c["type"] for c in columns])
+
+    def test_selects_fields_and_nested_values(self):
+        rows, columns = flatten_documents(
+            [{"a": 1, "b": {"c": 2, "d": 3}, "e": {"f": 4, "g": 5}}],
+            fields=["b", "e.g"],
+        )
+
+        self.assertEqual([{"b.c": 2, "b.d": 3, "e.g": 5}], rows)
+
+    def test_handles_wide_documents(self):
+        documents = [
+            {"column_{}".format(i): {"value": i + j} for i in range(1000)}
+            for j in range(50)
+        ]
+
+        flattener = DocumentFlattener()
+        rows = flattener.flatten_all(documents)
+
+        self.assertEqual(50, len(rows))
+        self.assertEqual(1000, len(flattener.columns))
+        self.assertEqual(1048, rows[-1]["column_999.value"])
+        self.assertIsNotNone(flattener.get_column("column_500.value"))
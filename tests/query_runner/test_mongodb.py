@@ -4,12 +4,14 @@ from unittest import TestCase
 from pytz import utc
 from freezegun import freeze_time
 
+from mock import MagicMock, patch
+
 from redash.query_runner.mongodb import (
+    MongoDB,
     parse_query_json,
     parse_results,
-    _get_column_by_name,
 )
-from redash.utils import json_dumps, parse_human_time
+from redash.utils import json_dumps, json_loads, parse_human_time
 
 
 class TestParseQueryJson(TestCase):
@@ -110,9 +112,7 @@ class TestMongoResults(TestCase):
         for i, row in enumerate(rows):
             self.assertDictEqual(row, raw_results[i])
 
-        self.assertIsNotNone(_get_column_by_name(columns, "column"))
-        self.assertIsNotNone(_get_column_by_name(columns, "column2"))
-        self.assertIsNotNone(_get_column_by_name(columns, "column3"))
+        self.assertEqual(["column", "column2", "column3"], [c["name"] for c in columns])
 
     def test_parses_nested_results(self):
         raw_results = [
@@ -142,9 +142,82 @@ class TestMongoResults(TestCase):
             },
         )
 
-        self.assertIsNotNone(_get_column_by_name(columns, "column"))
-        self.assertIsNotNone(_get_column_by_name(columns, "column2"))
-        self.assertIsNotNone(_get_column_by_name(columns, "column3"))
-        self.assertIsNotNone(_get_column_by_name(columns, "nested.a"))
-        self.assertIsNotNone(_get_column_by_name(columns, "nested.b"))
-        self.assertIsNotNone(_get_column_by_name(columns, "nested.c"))
+        self.assertEqual(
+            ["column", "column2", "nested.a", "nested.b", "column3", "nested.c"],
+            [c["name"] for c in columns],
+        )
+
+
+class FakeCursor(object):
+    def __init__(self, documents):
+        self.documents = documents
+        self.read = 0
+        self.closed = False
+
+    def __iter__(self):
+        for document in self.documents:
+            self.read += 1
+            yield document
+
+    def close(self):
+        self.closed = True
+
+
+class TestMongoCursor(TestCase):
+    def setUp(self):
+        self.runner = MongoDB(
+            {"connectionString": "mongodb://localhost", "dbName": "db", "maxRows": 2}
+        )
+        self.cursor = FakeCursor([{"a": i} for i in range(10)])
+        self.db = MagicMock()
+        self.db.__getitem__.return_value.aggregate.return_value = self.cursor
+
+        patcher = patch.object(MongoDB, "_get_db", return_value=self.db)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_stops_reading_cursor_at_max_rows(self):
+        query = {"collection": "test", "aggregate": [{"$match": {}}]}
+
+        data, error = self.runner.run_query(json_dumps(query), None)
+
+        self.assertIsNone(error)
+        self.assertEqual([{"a": 0}, {"a": 1}], json_loads(data)["rows"])
+        self.assertEqual(["Result truncated to 2 rows."], json_loads(data)["log"])
+        self.assertEqual(3, self.cursor.read)
+        self.assertTrue(self.cursor.closed)
+
+    def test_result_of_max_rows_documents_is_not_truncated(self):
+        self.cursor.documents = self.cursor.documents[:2]
+        query = {"collection": "test", "aggregate": [{"$match": {}}]}
+
+        data, error = self.runner.run_query(json_dumps(query), None)
+
+        self.assertEqual(2, len(json_loads(data)["rows"]))
+        self.assertNotIn("log", json_loads(data))
+
+    def test_closes_client_after_query(self):
+        query = {"collection": "test", "aggregate": [{"$match": {}}]}
+
+        self.runner.run_query(json_dumps(query), None)
+
+        self.db.client.close.assert_called_once_with()
+
+    def test_passes_batch_size_and_max_time_to_aggregate(self):
+        query = {
+            "collection": "test",
+            "aggregate": [{"$match": {}}],
+            "batchSize": 50,
+            "maxTimeMS": 1000,
+        }
+
+        self.runner.run_query(json_dumps(query), None)
+
+        self.db.__getitem__.return_value.aggregate.assert_called_with(
+            [{"$match": {}}], allowDiskUse=False, batchSize=50, maxTimeMS=1000
+        )
+
+    def test_query_max_rows_cannot_exceed_data_source(self):
+        self.assertEqual({"maxRows": 2}, self.runner._cursor_options({"maxRows": 5}))
+        self.assertEqual({"maxRows": 1}, self.runner._cursor_options({"maxRows": 1}))
+        self.assertEqual({"maxRows": 2}, self.runner._cursor_options({"maxRows": -1}))
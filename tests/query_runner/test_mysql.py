@@ -0,0 +1,111 @@
+import threading
+from unittest import TestCase
+
+from mock import Mock, patch
+
+from redash import settings
+from redash.query_runner import mysql
+from redash.query_runner.mysql import Mysql, Result
+from redash.utils import json_loads
+
+
+class FakeCursor(object):
+    """Serves result sets, each a (description, rows) tuple, like a MySQLdb
+    cursor does."""
+
+    def __init__(self, result_sets):
+        self.result_sets = list(result_sets)
+        self.fetched = []
+        self.closed = False
+
+    @property
+    def description(self):
+        return self.result_sets[0][0]
+
+    def execute(self, query):
+        pass
+
+    def fetchmany(self, size):
+        rows = self.result_sets[0][1]
+        batch, self.result_sets[0] = rows[:size], (self.description, rows[size:])
+        self.fetched.append(len(batch))
+        return batch
+
+    def nextset(self):
+        self.result_sets.pop(0)
+        return bool(self.result_sets) or None
+
+    def close(self):
+        self.closed = True
+
+
+class TestMysqlRunQuery(TestCase):
+    def run_query(self, cursor, configuration=None):
+        runner = Mysql(dict({"db": "test"}, **(configuration or {})))
+        connection = Mock()
+        connection.cursor.return_value = cursor
+        result = Result()
+
+        runner._run_query("SELECT 1", None, connection, result, threading.Event())
+
+        return connection, result
+
+    def test_fetches_rows_in_batches(self):
+        batch_size = settings.QUERY_RESULTS_FETCH_BATCH_SIZE
+        rows = [(i, "row {}".format(i)) for i in range(batch_size + 5)]
+        cursor = FakeCursor([((("id", 3), ("name", 253)), rows)])
+
+        connection, result = self.run_query(cursor)
+
+        self.assertIsNone(result.error)
+        data = json_loads(result.json_data)
+        self.assertEqual(["id", "name"], [c["name"] for c in data["columns"]])
+        self.assertEqual(len(rows), len(data["rows"]))
+        self.assertEqual({"id": 3, "name": "row 3"}, data["rows"][3])
+        self.assertEqual([batch_size, 5, 0], cursor.fetched)
+        self.assertTrue(cursor.closed)
+        connection.close.assert_called_once()
+
+    def test_returns_last_result_set(self):
+        cursor = FakeCursor(
+            [
+                ((("a", 3),), [(1,), (2,)]),
+                ((("b", 3),), [(3,)]),
+                (None, []),
+            ]
+        )
+
+        _, result = self.run_query(cursor)
+
+        self.assertEqual([{"b": 3}], json_loads(result.json_data)["rows"])
+
+    def test_no_result_set(self):
+        _, result = self.run_query(FakeCursor([(None, [])]))
+
+        self.assertIsNone(result.json_data)
+        self.assertEqual("No data was returned.", result.error)
+
+    def test_streaming_uses_unbuffered_cursor(self):
+        cursor = FakeCursor([((("a", 3),), [(1,)])])
+
+        with patch.object(mysql, "MySQLdb", create=True) as mysqldb:
+            connection, result = self.run_query(cursor, {"streaming": True})
+
+        connection.cursor.assert_called_once_with(mysqldb.cursors.SSCursor)
+        self.assertEqual([{"a": 1}], json_loads(result.json_data)["rows"])
+
+    @patch.object(settings, "QUERY_RESULTS_MAX_ROWS", 2)
+    def test_stops_at_truncated_result_set(self):
+        cursor = FakeCursor(
+            [((("a", 3),), [(1,), (2,), (3,)]), ((("b", 3),), [(4,)])]
+        )
+
+        with patch.object(Mysql, "_cancel") as cancel:
+            connection, result = self.run_query(cursor)
+
+        data = json_loads(result.json_data)
+        self.assertEqual([{"a": 1}, {"a": 2}], data["rows"])
+        self.assertEqual(["Result truncated to 2 rows."], data["log"])
+        self.assertEqual(2, len(cursor.result_sets))
+        cancel.assert_called_once_with(connection.thread_id.return_value)
+        self.assertTrue(cursor.closed)
@@ -1,5 +1,8 @@
 from unittest import TestCase
-from redash.query_runner.pg import build_schema
+
+from mock import patch
+
+from redash.query_runner.pg import PostgreSQL, build_schema
 
 
 class TestBuildSchema(TestCase):
@@ -24,3 +27,17 @@ class TestBuildSchema(TestCase):
         self.assertListEqual(schema["main.users"]["columns"], ["id", "name"])
         self.assertIn('public."main.users"', schema.keys())
         self.assertListEqual(schema['public."main.users"']["columns"], ["id"])
+
+
+class TestCountTableRow(TestCase):
+    def test_aborts_count_after_timeout(self):
+        runner = PostgreSQL({"dbname": "redash"})
+
+        with patch.object(
+            runner, "_run_query_internal", return_value=[{"cnt": 3}]
+        ) as run_query:
+            self.assertEqual(3, runner._count_table_row("events", 2.5))
+
+        run_query.assert_called_once_with(
+            "SET statement_timeout = 2500; select count(*) as cnt from events"
+        )
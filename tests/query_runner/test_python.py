@@ -0,0 +1,86 @@
+from unittest import TestCase
+
+from mock import patch
+
+from redash.query_runner.python import Python
+from redash.utils import json_loads
+
+
+class TestPythonQueryRunner(TestCase):
+    def setUp(self):
+        self.runner = Python({})
+
+    def run_script(self, script):
+        data, error = self.runner.run_query(script, None)
+        self.assertIsNone(error)
+        return json_loads(data)
+
+    def test_returns_result(self):
+        result = self.run_script(
+            'add_result_column(result, "a", "A", TYPE_INTEGER)\n'
+            'add_result_row(result, {"a": 1})\n'
+        )
+
+        self.assertEqual([{"a": 1}], result["rows"])
+
+    def test_memoizes_query_results_within_an_execution(self):
+        script = (
+            "a = get_query_result(1)\n"
+            "b = get_query_result(1)\n"
+            "c = get_query_result(2)\n"
+        )
+
+        with patch.object(
+            Python, "get_query_result", return_value={"rows": []}
+        ) as get_query_result:
+            result = self.run_script(script)
+            self.run_script(script)
+
+        self.assertEqual(4, get_query_result.call_count)
+        self.assertEqual(1, sum("(cached)" in line for line in result["log"]))
+
+    def test_memoizes_calls_with_keyword_arguments(self):
+        script = "a = get_query_result(query_id=1)\nb = get_query_result(query_id=1)\n"
+
+        with patch.object(
+            Python, "get_query_result", return_value={"rows": []}
+        ) as get_query_result:
+            self.run_script(script)
+
+        get_query_result.assert_called_once_with(query_id=1)
+
+    def test_calls_with_unhashable_arguments_are_not_memoized(self):
+        script = "a = get_query_result([1])\nb = get_query_result([1])\n"
+
+        with patch.object(
+            Python, "get_query_result", return_value={"rows": []}
+        ) as get_query_result:
+            self.run_script(script)
+
+        self.assertEqual(2, get_query_result.call_count)
+
+    def test_runs_each_execute_query_call(self):
+        script = (
+            "a = execute_query(data_source_name_or_id=1, query='SELECT 1')\n"
+            "b = execute_query(data_source_name_or_id=1, query='SELECT 1')\n"
+        )
+
+        with patch.object(
+            Python, "execute_query", return_value={"rows": []}
+        ) as execute_query:
+            self.run_script(script)
+
+        self.assertEqual(2, execute_query.call_count)
+
+    def test_logs_timings(self):
+        result = self.run_script("print('hello')\n")
+
+        self.assertIn("Compiled script in", result["log"][0])
+        self.assertIn("hello", result["log"][1])
+        self.assertIn("Executed script in", result["log"][2])
+
+    def test_disabling_print_log_silences_timings(self):
+        result = self.run_script("disable_print_log()\nprint('hello')\n")
+
+        self.assertEqual(1, len(result["log"]))
+        self.assertIn("Compiled script in", result["log"][0])
@@ -1,6 +1,11 @@
+import time
 from unittest import TestCase
 
+from mock import patch
+
+from redash import settings
 from redash.query_runner import (
+    BaseSQLQueryRunner,
     TYPE_DATETIME,
     TYPE_FLOAT,
     TYPE_INTEGER,
@@ -38,3 +43,110 @@ class TestGuessType(TestCase):
 
     def test_detects_date(self):
         self.assertEqual(guess_type("2018-10-31"), TYPE_DATETIME)
+
+
+class FakeSQLQueryRunner(BaseSQLQueryRunner):
+    def __init__(self, estimates=None, counts=None, delays=None):
+        super(FakeSQLQueryRunner, self).__init__({})
+        self.estimates = estimates or {}
+        self.counts = counts or {}
+        self.delays = delays or {}
+        self.timeouts = {}
+
+    def _get_table_size_estimates(self):
+        return self.estimates
+
+    def _count_table_row(self, table, timeout):
+        self.timeouts[table] = timeout
+        time.sleep(self.delays.get(table, 0))
+        if table not in self.counts:
+            raise Exception("Failed counting rows.")
+        return self.counts[table]
+
+
+class TestGetTableSizes(TestCase):
+    def test_prefers_catalog_estimates(self):
+        runner = FakeSQLQueryRunner(estimates={"a": 10}, counts={"a": 11, "b": 20})
+
+        self.assertEqual({"a": 10, "b": 20}, runner.get_table_sizes(["a", "b"]))
+
+    def test_skips_tables_that_failed(self):
+        runner = FakeSQLQueryRunner(counts={"a": 11})
+
+        self.assertEqual({"a": 11}, runner.get_table_sizes(["a", "b"]))
+
+    def test_stops_counting_after_time_budget(self):
+        runner = FakeSQLQueryRunner(counts={"a": 1, "b": 2}, delays={"b": 0.5})
+
+        with patch.object(settings, "SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT", 0.1):
+            self.assertEqual({"a": 1}, runner.get_table_sizes(["a", "b"]))
+
+    def test_passes_remaining_time_budget_to_counts(self):
+        runner = FakeSQLQueryRunner(counts={"a": 1})
+
+        with patch.object(settings, "SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT", 5):
+            runner.get_table_sizes(["a"])
+
+        self.assertTrue(0 < runner.timeouts["a"] <= 5)
+
+
+class FakeCursor(object):
+    def __init__(self, rows):
+        self.rows = rows
+        self.sizes = []
+
+    def fetchmany(self, size):
+        self.sizes.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class TestFetchRows(TestCase):
+    def setUp(self):
+        self.runner = FakeSQLQueryRunner()
+        self.columns = self.runner.fetch_columns([("a", None), ("a", None)])
+
+    def test_reads_in_batches(self):
+        cursor = FakeCursor([(i, -i) for i in range(5)])
+
+        rows, truncated = self.runner.fetch_rows(cursor, self.columns, batch_size=2)
+
+        self.assertEqual({"a": 3, "a1": -3}, rows[3])
+        self.assertEqual(5, len(rows))
+        self.assertFalse(truncated)
+        self.assertEqual([2, 2, 2, 2], cursor.sizes)
+
+    def test_stops_at_max_rows(self):
+        cursor = FakeCursor([(i, i) for i in range(10)])
+
+        rows, truncated = self.runner.fetch_rows(
+            cursor, self.columns, batch_size=4, max_rows=6
+        )
+
+        self.assertEqual(6, len(rows))
+        self.assertTrue(truncated)
+        self.assertEqual([4, 2, 1], cursor.sizes)
+
+    @patch.object(settings, "QUERY_RESULTS_MAX_ROWS", 3)
+    def test_max_rows_defaults_to_setting(self):
+        cursor = FakeCursor([(i, i) for i in range(10)])
+
+        rows, truncated = self.runner.fetch_rows(cursor, self.columns)
+
+        self.assertEqual(3, len(rows))
+
+    def test_result_of_truncated_rows_says_so(self):
+        cursor = FakeCursor([(i, i) for i in range(10)])
+
+        data = self.runner.fetch_result(cursor, self.columns, max_rows=4)
+
+        self.assertEqual(4, len(data["rows"]))
+        self.assertEqual(["Result truncated to 4 rows."], data["log"])
+
+    def test_result_of_all_rows_has_no_log(self):
+        cursor = FakeCursor([(i, i) for i in range(3)])
+
+        data = self.runner.fetch_result(cursor, self.columns, max_rows=4)
+
+        self.assertEqual(self.columns, data["columns"])
+        self.assertNotIn("log", data)
@@ -0,0 +1,165 @@
+import time
+
+from mock import patch
+from redis.exceptions import LockNotOwnedError
+from sqlalchemy.exc import OperationalError
+
+from redash import models, redis_connection
+from redash.tasks.general import (
+    EVENTS_BUFFER_KEY,
+    EVENTS_DEAD_LETTER_KEY,
+    EVENTS_FLUSH_LOCK_KEY,
+    EVENTS_PROCESSING_KEY,
+    buffer_event,
+    flush_events,
+    forward_events,
+)
+from redash.utils import json_loads
+from tests import BaseTestCase
+
+
+class TestFlushEvents(BaseTestCase):
+    def buffer_events(self, count):
+        for i in range(count):
+            buffer_event(
+                {
+                    "org_id": self.factory.org.id,
+                    "user_id": self.factory.user.id,
+                    "action": "view",
+                    "object_type": "dashboard",
+                    "object_id": i,
+                    "timestamp": int(time.time()),
+                }
+            )
+
+    def test_records_buffered_events_in_batches(self):
+        self.buffer_events(5)
+
+        with patch("redash.settings.EVENTS_BATCH_SIZE", 2), patch.object(
+            models.Event, "record_many", wraps=models.Event.record_many
+        ) as record_many:
+            flush_events()
+
+        self.assertEqual(3, record_many.call_count)
+        self.assertEqual(5, models.Event.query.count())
+        self.assertEqual(0, redis_connection.llen(EVENTS_BUFFER_KEY))
+
+    def test_dead_letters_events_that_fail_on_their_own(self):
+        self.buffer_events(3)
+        record_many = models.Event.record_many
+
+        def fail_on_second_event(events):
+            if any(event["object_id"] == 1 for event in events):
+                raise ValueError
+            return record_many(events)
+
+        with patch.object(
+            models.Event, "record_many", side_effect=fail_on_second_event
+        ):
+            flush_events()
+
+        self.assertEqual(["0", "2"], sorted(e.object_id for e in models.Event.query))
+        dead_letters = redis_connection.lrange(EVENTS_DEAD_LETTER_KEY, 0, -1)
+        self.assertEqual([1], [json_loads(e)["object_id"] for e in dead_letters])
+        self.assertEqual(0, redis_connection.llen(EVENTS_PROCESSING_KEY))
+
+    def test_keeps_events_when_database_is_unavailable(self):
+        self.buffer_events(3)
+
+        with patch.object(
+            models.Event,
+            "record_many",
+            side_effect=OperationalError("INSERT", {}, Exception()),
+        ):
+            with self.assertRaises(OperationalError):
+                flush_events()
+
+        self.assertEqual(3, redis_connection.llen(EVENTS_PROCESSING_KEY))
+        flush_events()
+        self.assertEqual(
+            ["0", "1", "2"], sorted(e.object_id for e in models.Event.query)
+        )
+        self.assertEqual(0, redis_connection.llen(EVENTS_PROCESSING_KEY))
+
+    def test_skips_flush_while_another_is_running(self):
+        self.buffer_events(3)
+
+        lock = redis_connection.lock(EVENTS_FLUSH_LOCK_KEY)
+        lock.acquire()
+        try:
+            flush_events()
+        finally:
+            lock.release()
+
+        self.assertEqual(0, models.Event.query.count())
+        self.assertEqual(3, redis_connection.llen(EVENTS_BUFFER_KEY))
+
+    def test_leaves_batches_past_the_cap_for_the_next_flush(self):
+        self.buffer_events(5)
+
+        with patch("redash.settings.EVENTS_BATCH_SIZE", 2), patch(
+            "redash.settings.EVENTS_MAX_BATCHES_PER_FLUSH", 2
+        ):
+            flush_events()
+
+        self.assertEqual(4, models.Event.query.count())
+        self.assertEqual(1, redis_connection.llen(EVENTS_BUFFER_KEY))
+
+    def test_survives_losing_its_lock(self):
+        self.buffer_events(1)
+
+        with patch("redash.tasks.general.redis_connection.lock") as lock:
+            lock.return_value.release.side_effect = LockNotOwnedError
+            flush_events()
+
+        self.assertEqual(1, models.Event.query.count())
+
+    @patch("redash.tasks.general.forward_events.delay")
+    def test_queues_a_webhook_job_per_batch(self, delay):
+        self.buffer_events(3)
+
+        with patch("redash.settings.EVENT_REPORTING_WEBHOOKS", ["http://hook"]), patch(
+            "redash.settings.EVENTS_BATCH_SIZE", 2
+        ):
+            flush_events()
+
+        self.assertEqual(2, delay.call_count)
+        forwarded = [event for c in delay.call_args_list for event in c[0][0]]
+        self.assertEqual(
+            ["0", "1", "2"], sorted(event["object_id"] for event in forwarded)
+        )
+
+    @patch("redash.tasks.general.forward_events.delay")
+    def test_queues_no_webhook_jobs_without_webhooks(self, delay):
+        self.buffer_events(3)
+
+        flush_events()
+
+        delay.assert_not_called()
+
+
+class TestForwardEvents(BaseTestCase):
+    events = [{"action": "view", "object_id": str(i)} for i in range(3)]
+
+    @patch("redash.tasks.general.get_session")
+    def test_forwards_events_to_webhooks(self, get_session):
+        post = get_session.return_value.post
+        post.return_value.status_code = 200
+
+        with patch("redash.settings.EVENT_REPORTING_WEBHOOKS", ["http://hook"]):
+            forward_events(self.events)
+
+        self.assertEqual(3, post.call_count)
+
+    @patch("redash.tasks.general.get_session")
+    def test_batches_webhook_deliveries(self, get_session):
+        post = get_session.return_value.post
+        post.return_value.status_code = 200
+
+        with patch("redash.settings.EVENT_REPORTING_WEBHOOKS", ["http://hook"]), patch(
+            "redash.settings.EVENT_REPORTING_WEBHOOKS_BATCH", True
+        ):
+            forward_events(self.events)
+
+        post.assert_called_once()
+        self.assertEqual(self.events, post.call_args[1]["json"]["data"])
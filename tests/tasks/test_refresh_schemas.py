@@ -1,7 +1,10 @@
 from mock import patch
 from tests import BaseTestCase
 
+from redash import settings
 from redash.tasks import refresh_schemas
+from redash.tasks.queries.maintenance import refresh_schema
+from redash.tasks.worker import Queue
 
 
 class TestRefreshSchemas(BaseTestCase):
@@ -29,3 +32,12 @@ class TestRefreshSchemas(BaseTestCase):
         ) as refresh_job:
             refresh_schemas()
             refresh_job.assert_called()
+
+    def test_job_timeout_outlasts_table_size_budget(self):
+        with patch.object(Queue, "enqueue_call") as enqueue_call:
+            refresh_schema.delay(self.factory.data_source.id)
+
+        self.assertGreater(
+            enqueue_call.call_args[1]["timeout"],
+            settings.SCHEMA_TABLE_SIZE_CALCULATIONS_TIMEOUT,
+        )
@@ -2,9 +2,9 @@ import importlib
 import os
 import time
 
-from flask import request
+from flask import g, request
 from mock import patch
-from redash import models, settings
+from redash import models, redis_connection, settings
 from redash.authentication import (
     api_key_load_user_from_request,
     get_login_url,
@@ -88,6 +88,69 @@ class TestApiKeyAuthentication(BaseTestCase):
             )
             self.assertEqual(404, rv.status_code)
 
+    def test_caches_resolved_principal(self):
+        dashboard = self.factory.create_dashboard()
+        api_key = self.factory.create_api_key(object=dashboard)
+        models.db.session.flush()
+
+        with self.app.test_client() as c:
+            c.get(self.queries_url, query_string={"api_key": api_key.api_key})
+            g.queries_count = 0
+            user = api_key_load_user_from_request(request)
+
+            self.assertEqual(0, g.queries_count)
+            self.assertEqual(api_key.api_key, user.id)
+            self.assertEqual(self.factory.org, user.org)
+            self.assertEqual(dashboard, user.object)
+
+    def test_regenerated_user_api_key(self):
+        user = self.factory.create_user(api_key="user_key")
+        models.db.session.flush()
+        with self.app.test_client() as c:
+            c.get(self.queries_url, query_string={"api_key": "user_key"})
+            user.regenerate_api_key()
+            models.db.session.flush()
+
+            self.assertIsNone(api_key_load_user_from_request(request))
+
+    def test_regenerated_query_api_key_is_dropped_once_committed(self):
+        cache_key = models.api_key_principal_key(self.api_key)
+        with self.app.test_client() as c:
+            c.get(self.query_url, query_string={"api_key": self.api_key})
+        self.assertTrue(redis_connection.exists(cache_key))
+
+        self.query.regenerate_api_key()
+        # Until the commit the old key is still the one in the database.
+        self.assertTrue(redis_connection.exists(cache_key))
+
+        models.db.session.commit()
+        self.assertFalse(redis_connection.exists(cache_key))
+
+    def test_deactivated_dashboard_api_key(self):
+        dashboard = self.factory.create_dashboard()
+        api_key = self.factory.create_api_key(object=dashboard)
+        models.db.session.flush()
+        with self.app.test_client() as c:
+            c.get(self.queries_url, query_string={"api_key": api_key.api_key})
+
+        self.make_request("delete", "/api/dashboards/{}/share".format(dashboard.id))
+
+        with self.app.test_client() as c:
+            c.get(self.queries_url, query_string={"api_key": api_key.api_key})
+            self.assertIsNone(api_key_load_user_from_request(request))
+
+    def test_query_api_key_is_only_cached_for_its_query(self):
+        other_query = self.factory.create_query()
+        models.db.session.flush()
+        with self.app.test_client() as c:
+            c.get(self.query_url, query_string={"api_key": self.api_key})
+            c.get(
+                "/{}/api/queries/{}".format(self.factory.org.slug, other_query.id),
+                query_string={"api_key": self.api_key},
+            )
+
+            self.assertIsNone(api_key_load_user_from_request(request))
+
 
 class TestHMACAuthentication(BaseTestCase):
     #
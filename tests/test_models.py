@@ -559,6 +559,19 @@ class TestEvents(BaseTestCase):
 
         self.assertDictEqual(event.additional_properties, additional_properties)
 
+    def test_records_many(self):
+        raw_event, user, created_at = self.raw_event()
+        other_event = dict(raw_event, action="edit", extra="value")
+
+        events = models.Event.record_many([raw_event, other_event])
+
+        self.assertEqual(2, models.Event.query.count())
+        self.assertEqual(["view", "edit"], [e.action for e in events])
+        self.assertTrue(all(e.id for e in events))
+        self.assertEqual("1", events[0].object_id)
+        self.assertEqual({"extra": "value"}, events[1].additional_properties)
+        self.assertEqual("view", raw_event["action"])
+
 
 def _set_up_dashboard_test(d):
     d.g1 = d.factory.create_group(name="First", permissions=["create", "view"])
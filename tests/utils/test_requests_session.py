@@ -0,0 +1,107 @@
+from unittest import TestCase
+
+from mock import Mock, patch
+from requests.cookies import extract_cookies_to_jar
+
+from redash.utils import requests_session
+from redash.utils.requests_session import (
+    ConfiguredSession,
+    PooledAdapter,
+    connection_stats,
+    get_session,
+    requests,
+    resolve_hostname,
+)
+
+
+class TestGetSession(TestCase):
+    def setUp(self):
+        requests_session._sessions.clear()
+
+    def test_reuses_session_of_same_key(self):
+        session = get_session("http://a")
+
+        self.assertIs(session, get_session("http://a"))
+        self.assertIsNot(session, get_session("http://b"))
+        self.assertIsInstance(session.get_adapter("https://a"), PooledAdapter)
+
+    def test_drops_least_recently_used_session(self):
+        with patch.object(requests_session.settings, "REQUESTS_SESSIONS_CACHE_SIZE", 2):
+            session = get_session("http://a")
+            get_session("http://b")
+            get_session("http://a")
+            get_session("http://c")
+
+            self.assertIs(session, get_session("http://a"))
+            self.assertEqual(
+                ["http://a", "http://c"],
+                sorted(key for _, _, key in requests_session._sessions),
+            )
+
+    def test_does_not_keep_cookies(self):
+        session = get_session("http://a")
+        headers = {"Set-Cookie": ["session=secret"]}
+        response = Mock()
+        response._original_response.msg.get_all.side_effect = headers.get
+
+        extract_cookies_to_jar(
+            session.cookies, requests.Request("GET", "http://a/").prepare(), response
+        )
+
+        self.assertEqual(0, len(session.cookies))
+
+    def test_does_not_retry_reads(self):
+        retries = get_session("http://a").get_adapter("http://a").max_retries
+
+        self.assertEqual(0, retries.read)
+        self.assertEqual((502, 503, 504), retries.status_forcelist)
+
+    def test_session_class(self):
+        session = get_session("http://a", ConfiguredSession)
+
+        self.assertIsInstance(session, ConfiguredSession)
+        self.assertIsNot(session, get_session("http://a"))
+
+    def test_counts_reused_connections(self):
+        session = get_session("http://a")
+        adapter = session.get_adapter("http://a")
+        pool = Mock(num_connections=0)
+
+        def send(request, **kwargs):
+            pool.num_connections = 1
+            return Mock()
+
+        with patch.object(adapter, "get_connection", return_value=pool), patch.object(
+            requests.adapters.HTTPAdapter, "send", side_effect=send
+        ), patch("redash.statsd_client"):
+            adapter.send(Mock(url="http://a"))
+            adapter.send(Mock(url="http://a"))
+
+        self.assertEqual({"http://a": {"new": 1, "reused": 1}}, connection_stats())
+
+
+class TestResolveHostname(TestCase):
+    def setUp(self):
+        requests_session._addresses.clear()
+
+    @patch("socket.gethostbyname", return_value="10.0.0.1")
+    def test_caches_addresses(self, gethostbyname):
+        with patch.object(requests_session.time, "time", return_value=0):
+            self.assertEqual("10.0.0.1", resolve_hostname("example.com"))
+            self.assertEqual("10.0.0.1", resolve_hostname("example.com"))
+
+        self.assertEqual(1, gethostbyname.call_count)
+
+    @patch("socket.gethostbyname", return_value="10.0.0.1")
+    def test_expires_addresses(self, gethostbyname):
+        with patch.object(requests_session.time, "time", return_value=0):
+            resolve_hostname("example.com")
+
+        with patch.object(
+            requests_session.time,
+            "time",
+            return_value=requests_session.settings.REQUESTS_DNS_CACHE_TTL,
+        ):
+            resolve_hostname("example.com")
+
+        self.assertEqual(2, gethostbyname.call_count)